@@ -8,6 +8,11 @@ let allSeeds = []; // Todas as seeds salvas
 let currentSortColumn = null;
 let currentSortDirection = 'asc';
 
+// Índice de pesquisa (data/ativos_pesquisa.json, gerado com o ativos.json)
+let searchIndex = null;
+let procedurePositions = new Map(); // procedimento -> posição no ativos.json
+let detailFiles = new Map(); // ficheiro de data/ativos_detalhes/ -> Promise com o conteúdo
+
 function loadProcedimentos() {
     const loading = document.getElementById('loading');
     const error = document.getElementById('error');
@@ -17,7 +22,9 @@ function loadProcedimentos() {
     error.style.display = 'none';
     tableContainer.style.display = 'none';
 
-    fetch('data/ativos.json')
+    // Listagem leve (sem detalhes_completos); ativos.json se ainda não existir
+    fetch('data/ativos_lista.json')
+        .then(response => response.ok ? response : fetch('data/ativos.json'))
         .then(response => {
             if (!response.ok) {
                 throw new Error('Arquivo não encontrado');
@@ -28,6 +35,8 @@ function loadProcedimentos() {
             loading.style.display = 'none';
             allProcedimentos = data; // Armazenar todos os procedimentos
             filteredProcedimentos = data; // Inicialmente, mostrar todos
+            procedurePositions = new Map(data.map((proc, index) => [proc, index]));
+            loadSearchIndex(data);
             
             // Aplicar ordenação padrão por data de publicação (mais recente primeiro)
             currentSortColumn = 'publicacao';
@@ -43,6 +52,70 @@ function loadProcedimentos() {
         });
 }
 
+function activeSetVersion(procedimentos) {
+    // FNV-1a (32 bits) dos links pela ordem carregada, como indice_pesquisa.versao_ativos
+    const text = procedimentos.map(proc => proc.link || '').join('\n');
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return (hash >>> 0).toString(16).padStart(8, '0');
+}
+
+function loadSearchIndex(procedimentos) {
+    searchIndex = null;
+    const version = activeSetVersion(procedimentos);
+    fetch('data/ativos_pesquisa.json')
+        .then(response => response.ok ? response.json() : null)
+        .then(index => {
+            // Só serve se tiver sido gerado com os procedimentos carregados
+            if (index && index.versao_ativos === version) {
+                searchIndex = index;
+                console.log('🔎 Índice de pesquisa carregado:', index.vocabulario.length, 'tokens');
+            }
+        })
+        .catch(err => console.warn('Índice de pesquisa indisponível, a pesquisar nos registos:', err));
+}
+
+function foldText(text) {
+    // Minúsculas e sem acentos, como indice_pesquisa.dobrar_texto
+    return text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+}
+
+function searchTokens(text) {
+    return foldText(text).match(/[\p{L}\p{N}]+/gu) || [];
+}
+
+function positionsWithPrefix(prefix) {
+    // Vocabulário ordenado: os tokens com o prefixo são contíguos
+    const vocabulary = searchIndex.vocabulario;
+    let low = 0, high = vocabulary.length;
+    while (low < high) {
+        const middle = (low + high) >> 1;
+        if (vocabulary[middle] < prefix) low = middle + 1;
+        else high = middle;
+    }
+    const positions = new Set();
+    for (let i = low; i < vocabulary.length && vocabulary[i].startsWith(prefix); i++) {
+        searchIndex.posicoes[i].forEach(position => positions.add(position));
+    }
+    return positions;
+}
+
+function searchWithIndex(searchTerm) {
+    // Procedimentos com todas as palavras do termo (no início de uma palavra, sem acentos)
+    const tokens = searchTokens(searchTerm);
+    if (tokens.length === 0) return allProcedimentos;
+    let matches = null;
+    for (const token of tokens) {
+        const positions = positionsWithPrefix(token);
+        matches = matches ? new Set([...matches].filter(position => positions.has(position))) : positions;
+        if (matches.size === 0) break;
+    }
+    return [...matches].sort((a, b) => a - b).map(position => allProcedimentos[position]);
+}
+
 function filterProcedimentos() {
     const searchTerm = document.getElementById('searchInput').value.toLowerCase().trim();
     
@@ -53,7 +126,10 @@ function filterProcedimentos() {
     // Primeiro filtrar por termo de pesquisa
     let filtered = allProcedimentos;
     
-    if (searchTerm !== '') {
+    if (searchTerm !== '' && searchIndex) {
+        filtered = searchWithIndex(searchTerm);
+        console.log('📊 Após pesquisa por termo (índice):', filtered.length, 'procedimentos');
+    } else if (searchTerm !== '') {
         filtered = allProcedimentos.filter(proc => {
             // Criar uma string com todos os campos para pesquisa
             const searchableText = [
@@ -75,7 +151,7 @@ function filterProcedimentos() {
                 proc.fundos_eu || '',
                 proc.autor_nome || '',
                 proc.autor_cargo || '',
-                extractPublicationDate(proc.detalhes_completos) || ''
+                publicationDate(proc)
             ].join(' ').toLowerCase();
             
             return searchableText.includes(searchTerm);
@@ -117,7 +193,16 @@ function clearSearch() {
     }
 }
 
-function formatDeadline(deadlineStr) {
+function formatDeadline(deadlineStr, deadlineIso) {
+    // Prazo já normalizado pelo extrator (AAAA-MM-DDTHH:MM), incluindo prazos em dias
+    if (deadlineIso) {
+        const [date, time] = deadlineIso.split('T');
+        return `
+            <span class="deadline-date">${date.split('-').reverse().join('/')}</span>
+            <span class="deadline-time">${time}</span>
+        `;
+    }
+    
     if (!deadlineStr || deadlineStr === 'N/A') return 'N/A';
     
     // Procurar por padrões de data e hora
@@ -155,53 +240,76 @@ function extractPublicationDate(detalhesCompletos) {
     return 'N/A';
 }
 
+function publicationDate(proc) {
+    // data_publicacao_iso (AAAA-MM-DD) é gravada pelo extrator; os registos antigos não a têm
+    if (proc.data_publicacao_iso) return proc.data_publicacao_iso.split('-').reverse().join('/');
+    return extractPublicationDate(proc.detalhes_completos);
+}
+
+function publicationSortKey(proc) {
+    if (proc.data_publicacao_iso) return proc.data_publicacao_iso;
+    const date = extractPublicationDate(proc.detalhes_completos);
+    if (date === 'N/A') return '';
+    const [day, month, year] = date.split('/');
+    return `${year}-${month.padStart(2, '0')}-${day.padStart(2, '0')}`;
+}
+
+function deadlineSortKey(proc) {
+    if (proc.prazo_apresentacao_propostas_iso) return proc.prazo_apresentacao_propostas_iso;
+    const match = (proc.prazo_apresentacao_propostas || '').match(/(\d{1,2})-(\d{1,2})-(\d{4})(?:\s+(\d{1,2}):(\d{2}))?/);
+    if (!match) return '';
+    const [, day, month, year, hour = '23', minute = '59'] = match;
+    return `${year}-${month.padStart(2, '0')}-${day.padStart(2, '0')}T${hour.padStart(2, '0')}:${minute}`;
+}
+
+function priceSortKey(proc) {
+    // preco_base_centimos é gravado pelo extrator; os registos antigos só têm o texto
+    if (typeof proc.preco_base_centimos === 'number') return proc.preco_base_centimos;
+    const price = parseFloat((proc.preco_base || '0').replace(/[^\d,]/g, '').replace(',', '.'));
+    return isNaN(price) ? 0 : Math.round(price * 100);
+}
+
 function sortProcedimentos(procedimentos, column, direction) {
     const sortedProcedimentos = [...procedimentos];
+    // Ranks pré-calculados no índice de pesquisa: comparar inteiros
+    const ranks = searchIndex && searchIndex.ordenacao[column];
     
     sortedProcedimentos.sort((a, b) => {
         let valueA, valueB;
         
-        switch (column) {
-            case 'descricao':
-                valueA = (a.descricao || a.designacao_contrato || '').toLowerCase();
-                valueB = (b.descricao || b.designacao_contrato || '').toLowerCase();
-                break;
-            case 'entidade':
-                valueA = (a.entidade || a.entidade_adjudicante || '').toLowerCase();
-                valueB = (b.entidade || b.entidade_adjudicante || '').toLowerCase();
-                break;
-            case 'plataforma':
-                valueA = (a.plataforma_eletronica || '').toLowerCase();
-                valueB = (b.plataforma_eletronica || '').toLowerCase();
-                break;
-            case 'publicacao':
-                valueA = extractPublicationDate(a.detalhes_completos);
-                valueB = extractPublicationDate(b.detalhes_completos);
-                // Converter datas para comparação
-                if (valueA !== 'N/A' && valueB !== 'N/A') {
-                    const dateA = new Date(valueA.split('/').reverse().join('-'));
-                    const dateB = new Date(valueB.split('/').reverse().join('-'));
-                    valueA = dateA.getTime();
-                    valueB = dateB.getTime();
-                }
-                break;
-            case 'prazo':
-                valueA = a.prazo_apresentacao_propostas || '';
-                valueB = b.prazo_apresentacao_propostas || '';
-                // Converter datas para comparação
-                if (valueA && valueB) {
-                    const dateA = new Date(valueA.split(' ')[0].split('-').reverse().join('-'));
-                    const dateB = new Date(valueB.split(' ')[0].split('-').reverse().join('-'));
-                    valueA = dateA.getTime();
-                    valueB = dateB.getTime();
-                }
-                break;
-            case 'preco':
-                valueA = parseFloat((a.preco_base || '0').replace(/[^\d,]/g, '').replace(',', '.'));
-                valueB = parseFloat((b.preco_base || '0').replace(/[^\d,]/g, '').replace(',', '.'));
-                break;
-            default:
-                return 0;
+        if (ranks) {
+            valueA = ranks[procedurePositions.get(a)];
+            valueB = ranks[procedurePositions.get(b)];
+        } else {
+            switch (column) {
+                case 'descricao':
+                    valueA = (a.descricao || a.designacao_contrato || '').toLowerCase();
+                    valueB = (b.descricao || b.designacao_contrato || '').toLowerCase();
+                    break;
+                case 'entidade':
+                    valueA = (a.entidade || a.entidade_adjudicante || '').toLowerCase();
+                    valueB = (b.entidade || b.entidade_adjudicante || '').toLowerCase();
+                    break;
+                case 'plataforma':
+                    valueA = (a.plataforma_eletronica || '').toLowerCase();
+                    valueB = (b.plataforma_eletronica || '').toLowerCase();
+                    break;
+                case 'publicacao':
+                    // Datas ISO: a ordem do texto é a ordem cronológica
+                    valueA = publicationSortKey(a);
+                    valueB = publicationSortKey(b);
+                    break;
+                case 'prazo':
+                    valueA = deadlineSortKey(a);
+                    valueB = deadlineSortKey(b);
+                    break;
+                case 'preco':
+                    valueA = priceSortKey(a);
+                    valueB = priceSortKey(b);
+                    break;
+                default:
+                    return 0;
+            }
         }
         
         if (valueA < valueB) return direction === 'asc' ? -1 : 1;
@@ -263,7 +371,7 @@ function displayProcedimentos(procedimentos) {
         // Linha principal do procedimento
         const mainRow = document.createElement('tr');
         mainRow.className = 'procedure-row';
-        mainRow.onclick = () => toggleRow(index);
+        mainRow.onclick = () => toggleRow(index, proc);
         
         mainRow.innerHTML = `
             <td style="text-align: center; width: 50px;">
@@ -279,10 +387,10 @@ function displayProcedimentos(procedimentos) {
                 <div class="procedure-platform">${proc.plataforma_eletronica || 'N/A'}</div>
             </td>
             <td style="text-align: center;">
-                <div class="publication-date">${extractPublicationDate(proc.detalhes_completos)}</div>
+                <div class="publication-date">${publicationDate(proc)}</div>
             </td>
             <td style="text-align: center;">
-                <div class="deadline">${formatDeadline(proc.prazo_apresentacao_propostas)}</div>
+                <div class="deadline">${formatDeadline(proc.prazo_apresentacao_propostas, proc.prazo_apresentacao_propostas_iso)}</div>
             </td>
             <td style="text-align: left;">
                 <div class="price">${formatPrice(proc.preco_base)}</div>
@@ -373,6 +481,11 @@ function displayProcedimentos(procedimentos) {
                         </span>
                     </div>
                 </div>
+                
+                <div class="detail-group detail-group-full">
+                    <h4>Anúncio Completo</h4>
+                    <div class="detail-value full-details" id="full-details-${index}">A carregar...</div>
+                </div>
             </div>
         `;
         
@@ -388,7 +501,37 @@ function displayProcedimentos(procedimentos) {
     updateSortIndicators();
 }
 
-function toggleRow(index) {
+function loadFullDetails(proc) {
+    // Registos do ativos.json já trazem o texto; os da listagem levam o ficheiro de detalhe
+    if (proc.detalhes_completos !== undefined || !proc.detalhe) {
+        return Promise.resolve(proc.detalhes_completos || 'N/A');
+    }
+    if (!detailFiles.has(proc.detalhe)) {
+        detailFiles.set(proc.detalhe, fetch(`data/ativos_detalhes/${proc.detalhe}.json`)
+            .then(response => {
+                if (!response.ok) throw new Error('Detalhes não encontrados');
+                return response.json();
+            })
+            .catch(err => {
+                detailFiles.delete(proc.detalhe);
+                throw err;
+            }));
+    }
+    return detailFiles.get(proc.detalhe)
+        .then(details => (details[proc.link] || {}).detalhes_completos || 'N/A');
+}
+
+function showFullDetails(index, proc) {
+    const container = document.getElementById(`full-details-${index}`);
+    loadFullDetails(proc)
+        .then(text => { container.textContent = text; })
+        .catch(err => {
+            container.textContent = 'Não foi possível carregar o anúncio completo.';
+            console.error('Erro:', err);
+        });
+}
+
+function toggleRow(index, proc) {
     const detailsRow = document.getElementById(`details-${index}`);
     const mainRow = detailsRow.previousElementSibling;
     
@@ -407,6 +550,7 @@ function toggleRow(index) {
         // Abrir o selecionado
         detailsRow.classList.add('show');
         mainRow.classList.add('expanded');
+        showFullDetails(index, proc);
     }
 }
 
@@ -675,7 +819,7 @@ function procedureMatchesSeed(procedure) {
         procedure.fundos_eu || '',
         procedure.autor_nome || '',
         procedure.autor_cargo || '',
-        extractPublicationDate(procedure.detalhes_completos) || ''
+        publicationDate(procedure)
     ].join(' ').toLowerCase();
     
     console.log('📝 Texto do procedimento (primeiros 200 chars):', procedureText.substring(0, 200));
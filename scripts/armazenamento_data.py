@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazenamento dos ficheiros diários de data/ em snapshots comprimidos.
+
+Cada ficheiro diário pode estar em dois formatos:
+- DD-MM-YYYY.jsonl.gz: JSON Lines comprimido com gzip, um procedimento por linha (formato atual);
+- DD-MM-YYYY.json: lista JSON indentada (formato antigo, continua a ser lido).
+
+Cada registo guarda uma única vez o texto da página de detalhe (detalhes_completos) e,
+ao lado, os campos extraídos. Os scripts leem os ficheiros diários com ler_procedimentos,
+que aceita os dois formatos; se existirem os dois para o mesmo dia, o snapshot tem prioridade.
+
+Migração dos ficheiros existentes (cada snapshot é relido e comparado com o original
+antes de o original ser apagado):
+
+    cd scripts
+    python armazenamento_data.py migrar [--data-dir ../data] [--apagar-originais]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+FORMATO_JSON = 'json'
+FORMATO_SNAPSHOT = 'jsonl.gz'
+FORMATOS_DATA = [FORMATO_SNAPSHOT, FORMATO_JSON]
+
+# Ficheiros diários com o formato DD-MM-YYYY.json ou DD-MM-YYYY.jsonl.gz
+PADRAO_FICHEIRO_DATA = re.compile(r'^(\d{2})-(\d{2})-(\d{4})\.(json|jsonl\.gz)$')
+
+def e_snapshot(filename: str) -> bool:
+    return filename.endswith('.' + FORMATO_SNAPSHOT)
+
+def data_do_ficheiro(filename: str) -> Optional[datetime]:
+    """
+    Devolve a data de um ficheiro diário (ou None se não seguir o formato)
+    """
+    match = PADRAO_FICHEIRO_DATA.match(os.path.basename(filename))
+    if not match:
+        return None
+    dia, mes, ano, _ = match.groups()
+    try:
+        return datetime(int(ano), int(mes), int(dia))
+    except ValueError:
+        return None
+
+def nome_ficheiro_data(data: datetime, formato: str = FORMATO_SNAPSHOT) -> str:
+    return f"{data.strftime('%d-%m-%Y')}.{formato}"
+
+def listar_ficheiros_data(data_dir: str) -> List[str]:
+    """
+    Lista os ficheiros diários de data_dir, do mais antigo para o mais recente
+    (um por dia: o snapshot, se existir, senão o .json)
+    """
+    if not os.path.exists(data_dir):
+        return []
+    por_dia = {}
+    for filename in os.listdir(data_dir):
+        data = data_do_ficheiro(filename)
+        if data and (data not in por_dia or e_snapshot(filename)):
+            por_dia[data] = filename
+    return [por_dia[data] for data in sorted(por_dia)]
+
+def iter_procedimentos(filepath: str) -> Iterator[Dict]:
+    """
+    Procedimentos de um ficheiro diário (ou de qualquer lista JSON, como o ativos.json)
+    """
+    if e_snapshot(filepath):
+        with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+            for linha in f:
+                if linha.strip():
+                    yield json.loads(linha)
+    else:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+
+def ler_procedimentos(filepath: str) -> List[Dict]:
+    return list(iter_procedimentos(filepath))
+
+def iter_procedimentos_com_deslocamento(filepath: str) -> Iterator[Tuple[Optional[int], Dict]]:
+    """
+    (deslocamento, procedimento) de um ficheiro diário: num snapshot, o deslocamento é a
+    posição (em bytes, no conteúdo descomprimido) da linha do procedimento; None no formato antigo
+    """
+    if not e_snapshot(filepath):
+        for proc in iter_procedimentos(filepath):
+            yield None, proc
+        return
+    deslocamento = 0
+    with gzip.open(filepath, 'rb') as f:
+        for linha in f:
+            if linha.strip():
+                yield deslocamento, json.loads(linha)
+            deslocamento += len(linha)
+
+def ler_procedimentos_em(filepath: str, deslocamentos: Iterable[int]) -> Dict[int, Dict]:
+    """
+    Procedimentos de um snapshot nos deslocamentos dados por iter_procedimentos_com_deslocamento,
+    lidos numa única passagem (as linhas entre eles são descomprimidas mas não descodificadas)
+    """
+    procedimentos = {}
+    with gzip.open(filepath, 'rb') as f:
+        for deslocamento in sorted(set(deslocamentos)):
+            f.seek(deslocamento)
+            procedimentos[deslocamento] = json.loads(f.readline())
+    return procedimentos
+
+class EscritorSnapshot:
+    """
+    Escreve um snapshot .jsonl.gz procedimento a procedimento (mesma interface de
+    pipeline_async.EscritorJSONIncremental). O ficheiro só substitui o anterior em fechar().
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.tmp_path = filepath + '.tmp'
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        # mtime=0: o mesmo conteúdo produz sempre os mesmos bytes (sem diferenças no git)
+        self._bruto = open(self.tmp_path, 'wb')
+        self._f = gzip.GzipFile(fileobj=self._bruto, mode='wb', mtime=0)
+        self.escritos = 0
+
+    def escrever(self, item: Dict):
+        self._f.write((json.dumps(item, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8'))
+        self.escritos += 1
+
+    def _fechar_ficheiros(self):
+        self._f.close()
+        self._bruto.close()
+
+    def fechar(self) -> str:
+        self._fechar_ficheiros()
+        os.replace(self.tmp_path, self.filepath)
+        print(f"Dados salvos com sucesso em {self.filepath}")
+        return self.filepath
+
+    def descartar(self):
+        self._fechar_ficheiros()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+def escrever_procedimentos(procedimentos: Iterable[Dict], filepath: str) -> str:
+    """
+    Escreve um ficheiro diário no formato indicado pela extensão de filepath
+    """
+    if e_snapshot(filepath):
+        escritor = EscritorSnapshot(filepath)
+        for proc in procedimentos:
+            escritor.escrever(proc)
+        return escritor.fechar()
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(list(procedimentos), f, ensure_ascii=False, indent=2)
+    print(f"Dados salvos com sucesso em {filepath}")
+    return filepath
+
+def _atualizar_indice_links(data_dir: str, renomeados: Dict[str, str]):
+    # O índice de links guarda o nome do ficheiro de cada link
+    index_file = os.path.join(data_dir, 'indice_links.json')
+    if not renomeados or not os.path.exists(index_file):
+        return
+    with open(index_file, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    dados['ficheiros'] = [renomeados.get(nome, nome) for nome in dados.get('ficheiros', [])]
+    dados['links'] = {link: renomeados.get(nome, nome) for link, nome in dados.get('links', {}).items()}
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False)
+
+def migrar(data_dir: str = '../data', apagar_originais: bool = False) -> Dict[str, int]:
+    """
+    Converte os ficheiros DD-MM-YYYY.json de data_dir em snapshots .jsonl.gz
+    (os dias que já têm snapshot não são alterados)
+    """
+    estatisticas = {'ficheiros': 0, 'procedimentos': 0, 'bytes_antes': 0, 'bytes_depois': 0, 'erros': 0,
+                    'ignorados': 0}
+    renomeados = {}
+    for filename in sorted(os.listdir(data_dir), key=lambda f: data_do_ficheiro(f) or datetime.min):
+        data = data_do_ficheiro(filename)
+        if not data or e_snapshot(filename):
+            continue
+        original = os.path.join(data_dir, filename)
+        snapshot = os.path.join(data_dir, nome_ficheiro_data(data))
+        if os.path.exists(snapshot):
+            # O snapshot do mesmo dia pode ter sido escrito pelo extrator depois do .json: não o substituir
+            print(f"⚠️ {os.path.basename(snapshot)} já existe, {filename} não foi migrado")
+            estatisticas['ignorados'] += 1
+            continue
+        try:
+            procedimentos = ler_procedimentos(original)
+            escritor = EscritorSnapshot(snapshot)
+            for proc in procedimentos:
+                escritor.escrever(proc)
+            escritor._fechar_ficheiros()
+            os.replace(escritor.tmp_path, snapshot)
+            # Confirmar que o snapshot tem exatamente os mesmos procedimentos
+            if ler_procedimentos(snapshot) != procedimentos:
+                raise ValueError("o snapshot não corresponde ao original")
+        except Exception as e:
+            print(f"❌ Erro ao migrar {original}: {e}")
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
+            estatisticas['erros'] += 1
+            continue
+
+        estatisticas['ficheiros'] += 1
+        estatisticas['procedimentos'] += len(procedimentos)
+        estatisticas['bytes_antes'] += os.path.getsize(original)
+        estatisticas['bytes_depois'] += os.path.getsize(snapshot)
+        renomeados[filename] = os.path.basename(snapshot)
+        if apagar_originais:
+            os.remove(original)
+
+    _atualizar_indice_links(data_dir, renomeados)
+    return estatisticas
+
+def main():
+    parser = argparse.ArgumentParser(description="Armazenamento dos ficheiros diários de data/")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    migracao = subparsers.add_parser('migrar', help="converter os ficheiros DD-MM-YYYY.json em .jsonl.gz")
+    migracao.add_argument("--data-dir", default="../data")
+    migracao.add_argument("--apagar-originais", action="store_true",
+                          help="apagar cada .json depois de o snapshot ser verificado")
+    args = parser.parse_args()
+
+    e = migrar(args.data_dir, args.apagar_originais)
+    mb = 1024 * 1024
+    print(f"✅ {e['ficheiros']} ficheiros migrados ({e['procedimentos']} procedimentos): "
+          f"{e['bytes_antes'] / mb:.1f} MB -> {e['bytes_depois'] / mb:.1f} MB")
+    if e['ignorados']:
+        print(f"⚠️ {e['ignorados']} ficheiros não migrados porque o snapshot do mesmo dia já existe")
+    if e['erros']:
+        print(f"❌ {e['erros']} ficheiros com erros (os originais foram mantidos)")
+
+if __name__ == "__main__":
+    main()
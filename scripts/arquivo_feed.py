@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Feeds RSS paginados e arquivados (RFC 5005, "Archived Feeds") a partir do histórico
+data/DD-MM-YYYY.jsonl.gz.
+
+- RSS/arquivo/feed.xml: documento de subscrição, com os procedimentos da semana atual
+  (limitado a MAX_ITENS_ATUAL) e um link prev-archive para a semana anterior;
+- RSS/arquivo/AAAA-Wss.xml: uma página de arquivo por semana ISO terminada, marcada com
+  <fh:archive/> e ligada às semanas vizinhas (prev-archive/next-archive) e ao
+  documento de subscrição (current).
+
+As páginas de arquivo são escritas quando a semana termina (todas as semanas entre a
+primeira e a atual têm página, mesmo que vazia). A página mais recente não tem link
+next-archive, porque a página seguinte ainda não existe (RFC 5005, secção 4): é reescrita
+uma única vez, com o mesmo conteúdo e o link next-archive, quando a semana seguinte é
+arquivada. Em cada execução só o documento de subscrição, as semanas acabadas de terminar
+e a página que as antecede são gerados.
+
+Cada procedimento aparece na semana do primeiro ficheiro diário em que surge: como o mesmo
+procedimento pode repetir-se em dias seguidos, os links da semana anterior são excluídos.
+
+Uso:
+    cd scripts
+    python arquivo_feed.py [--data-dir ../data] [--rss-dir ../RSS] [--max-itens 1000] [--reconstruir]
+"""
+
+import argparse
+import os
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from armazenamento_data import data_do_ficheiro, ler_procedimentos, listar_ficheiros_data
+from json_to_rss_converter import (CANAL_DESCRICAO, CANAL_LINK, CANAL_TITULO, EscritorRSS,
+                                   formatar_data_rss, parse_procedimento)
+
+SUBDIR_ARQUIVO = 'arquivo'
+FEED_ATUAL = 'feed.xml'
+URL_ARQUIVO = CANAL_LINK + 'RSS/arquivo/'
+
+# Máximo de procedimentos no documento de subscrição
+MAX_ITENS_ATUAL = 1000
+
+Semana = Tuple[int, int]
+
+def semana_do_ficheiro(filename: str) -> Semana:
+    """
+    Semana ISO (ano, número) de um ficheiro diário
+    """
+    ano, semana, _ = data_do_ficheiro(filename).isocalendar()
+    return ano, semana
+
+def semana_seguinte(semana: Semana) -> Semana:
+    ano, numero, _ = (date.fromisocalendar(*semana, 1) + timedelta(days=7)).isocalendar()
+    return ano, numero
+
+def semana_anterior(semana: Semana) -> Semana:
+    ano, numero, _ = (date.fromisocalendar(*semana, 1) - timedelta(days=7)).isocalendar()
+    return ano, numero
+
+def nome_pagina(semana: Semana) -> str:
+    return f"{semana[0]}-W{semana[1]:02d}.xml"
+
+class ArquivoFeed:
+    def __init__(self, data_dir: str = '../data', rss_dir: str = '../RSS',
+                 url_base: str = URL_ARQUIVO, max_itens_atual: int = MAX_ITENS_ATUAL):
+        self.data_dir = data_dir
+        self.arquivo_dir = os.path.join(rss_dir, SUBDIR_ARQUIVO)
+        self.url_base = url_base
+        self.max_itens_atual = max_itens_atual
+        self.semanas = self._agrupar_por_semana()
+
+    def _agrupar_por_semana(self) -> Dict[Semana, List[str]]:
+        semanas = {}
+        for filename in listar_ficheiros_data(self.data_dir):
+            semanas.setdefault(semana_do_ficheiro(filename), []).append(filename)
+        return semanas
+
+    def _url(self, nome: str) -> str:
+        return self.url_base + nome
+
+    def _ler(self, filename: str) -> List[Dict]:
+        filepath = os.path.join(self.data_dir, filename)
+        try:
+            return ler_procedimentos(filepath)
+        except Exception as e:
+            print(f"Erro ao carregar {filepath}: {e}")
+            return []
+
+    def _links_da_semana(self, semana: Semana) -> Set[str]:
+        return {proc.get('link') for filename in self.semanas.get(semana, [])
+                for proc in self._ler(filename)}
+
+    def procedimentos_da_semana(self, semana: Semana) -> List[Tuple[str, Dict]]:
+        """
+        (pubDate, procedimento) da semana, do dia mais recente para o mais antigo,
+        sem repetições nem procedimentos já publicados na semana anterior
+        """
+        vistos = self._links_da_semana(semana_anterior(semana))
+        por_dia = []
+        for filename in self.semanas.get(semana, []):
+            pub_date = formatar_data_rss(data_do_ficheiro(filename))
+            itens = []
+            for proc in self._ler(filename):
+                link = proc.get('link')
+                if link in vistos:
+                    continue
+                vistos.add(link)
+                itens.append((pub_date, proc))
+            por_dia.append(itens)
+        return [item for itens in reversed(por_dia) for item in itens]
+
+    def _escrever(self, nome: str, titulo: str, links_atom: List[Dict[str, str]],
+                  itens: List[Tuple[str, Dict]], arquivo: bool):
+        filepath = os.path.join(self.arquivo_dir, nome)
+        tmp_file = filepath + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            escritor = EscritorRSS(f)
+            escritor.iniciar_feed(titulo, CANAL_DESCRICAO, CANAL_LINK, links_atom, arquivo=arquivo)
+            for i, (pub_date, proc) in enumerate(itens):
+                escritor.escrever_item(parse_procedimento(proc), i + 1, pub_date)
+            escritor.terminar_feed()
+        os.replace(tmp_file, filepath)
+
+    def escrever_pagina_arquivo(self, semana: Semana, primeira: Semana, ultima: Semana):
+        nome = nome_pagina(semana)
+        links = [
+            {'href': self._url(nome), 'rel': 'self', 'type': 'application/rss+xml'},
+            {'href': self._url(FEED_ATUAL), 'rel': 'current', 'type': 'application/rss+xml'},
+        ]
+        # A página mais recente só ganha o link next-archive quando a semana seguinte for arquivada
+        if semana != ultima:
+            links.append({'href': self._url(nome_pagina(semana_seguinte(semana))), 'rel': 'next-archive',
+                          'type': 'application/rss+xml'})
+        if semana != primeira:
+            links.insert(2, {'href': self._url(nome_pagina(semana_anterior(semana))), 'rel': 'prev-archive',
+                             'type': 'application/rss+xml'})
+        titulo = f"{CANAL_TITULO} - arquivo {semana[0]}, semana {semana[1]}"
+        self._escrever(nome, titulo, links, self.procedimentos_da_semana(semana), arquivo=True)
+
+    def escrever_feed_atual(self, semana: Semana, primeira: Semana) -> int:
+        links = [{'href': self._url(FEED_ATUAL), 'rel': 'self', 'type': 'application/rss+xml'}]
+        if semana != primeira:
+            links.append({'href': self._url(nome_pagina(semana_anterior(semana))), 'rel': 'prev-archive',
+                          'type': 'application/rss+xml'})
+        itens = self.procedimentos_da_semana(semana)[:self.max_itens_atual]
+        self._escrever(FEED_ATUAL, CANAL_TITULO, links, itens, arquivo=False)
+        return len(itens)
+
+    def atualizar(self, reconstruir: bool = False) -> Optional[Dict[str, int]]:
+        """
+        Escreve as páginas de arquivo em falta e o documento de subscrição
+        """
+        if not self.semanas:
+            print("Nenhum ficheiro em data/ para arquivar")
+            return None
+
+        os.makedirs(self.arquivo_dir, exist_ok=True)
+        primeira, atual = min(self.semanas), max(self.semanas)
+
+        ultima = semana_anterior(atual)
+        escritas = set()
+        semana = primeira
+        while semana != atual:
+            # Páginas de semanas terminadas só são escritas uma vez
+            if reconstruir or not os.path.exists(os.path.join(self.arquivo_dir, nome_pagina(semana))):
+                self.escrever_pagina_arquivo(semana, primeira, ultima)
+                escritas.add(semana)
+            semana = semana_seguinte(semana)
+        novas = len(escritas)
+
+        # A página que era a mais recente passa a ter o link next-archive para a semana arquivada agora
+        for semana in sorted(escritas):
+            anterior = semana_anterior(semana)
+            if semana != primeira and anterior not in escritas:
+                self.escrever_pagina_arquivo(anterior, primeira, ultima)
+                escritas.add(anterior)
+
+        itens_atual = self.escrever_feed_atual(atual, primeira)
+        print(f"🗄️ Arquivo do feed: {novas} páginas novas, {itens_atual} procedimentos em "
+              f"{os.path.join(self.arquivo_dir, FEED_ATUAL)}")
+        return {'paginas_novas': novas, 'itens_atual': itens_atual}
+
+def atualizar_arquivo_feed(data_dir: str = '../data', rss_dir: str = '../RSS') -> Optional[Dict[str, int]]:
+    """
+    Atualiza o arquivo paginado do feed (chamado no fim de cada execução do extrator)
+    """
+    try:
+        return ArquivoFeed(data_dir, rss_dir).atualizar()
+    except Exception as e:
+        print(f"❌ Erro ao atualizar o arquivo do feed: {e}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o feed RSS paginado e arquivado (RFC 5005) a partir de data/")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--rss-dir", default="../RSS")
+    parser.add_argument("--url-base", default=URL_ARQUIVO, help="URL público do diretório RSS/arquivo/")
+    parser.add_argument("--max-itens", type=int, default=MAX_ITENS_ATUAL,
+                        help="máximo de procedimentos no documento de subscrição")
+    parser.add_argument("--reconstruir", action="store_true",
+                        help="reescrever também as páginas de arquivo já existentes")
+    args = parser.parse_args()
+
+    ArquivoFeed(args.data_dir, args.rss_dir, args.url_base, args.max_itens).atualizar(args.reconstruir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Base SQLite dos procedimentos ativos, indexada pelo link e pelo prazo de apresentação
+das propostas (já convertido para AAAA-MM-DD HH:MM:SS, que ordena como texto).
+
+Substitui o merge de gerir_ativos.merge_with_existing_ativos, que lia o ativos.json
+inteiro, voltava a verificar o prazo de todos os registos e o reescrevia em cada
+execução: aqui cada procedimento novo é inserido com um upsert pelo link (O(log n)) e
+os expirados são removidos por uma pesquisa no índice do prazo, pelo que o custo é
+proporcional aos procedimentos novos e expirados e não ao histórico.
+
+O ativos.json continua a ser o ficheiro lido pela interface web: é exportado da base
+(pela ordem em que os procedimentos entraram) só quando esta muda.
+
+A base não é versionada (no GitHub Actions é guardada na cache entre execuções) e regista
+o SHA-1 do ativos.json a que corresponde. Se o ativos.json mudar por outra via (um git
+pull com o ativos.json do GitHub Actions, uma base de uma execução antiga, ou nenhuma
+base), a base é reconstruída a partir dele antes de ser usada, pelo que nunca exporta um
+ativos.json que perca procedimentos acrescentados noutro lado.
+
+Uso:
+    cd scripts
+    python base_ativos.py [--data-dir ../data] [--rss-dir ../RSS] [--exportar | --refrescar]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from gerir_ativos import exportar_listagem_ativos, load_existing_ativos, update_ativos_from_date_file
+from indice_pesquisa import guardar_indice_pesquisa
+from normalizacao_datas import prazo_do_procedimento
+
+BASE_ATIVOS_FILE = 'ativos.sqlite'
+FORMATO_PRAZO = '%Y-%m-%d %H:%M:%S'
+
+def prazo_normalizado(proc: Dict) -> Optional[str]:
+    """
+    Prazo de apresentação das propostas em AAAA-MM-DD HH:MM:SS (None se não existir
+    ou não for reconhecido: o procedimento é tratado como expirado)
+    """
+    prazo = prazo_do_procedimento(proc)
+    return prazo.strftime(FORMATO_PRAZO) if prazo else None
+
+def item_ativos_json(proc: Dict) -> str:
+    """
+    Texto de um procedimento tal como aparece no ativos.json (json.dump com indent=2)
+    """
+    return json.dumps(proc, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+
+class BaseAtivos:
+    def __init__(self, data_dir: str = '../data'):
+        self.data_dir = data_dir
+        self.db_file = os.path.join(data_dir, BASE_ATIVOS_FILE)
+        self.ativos_file = os.path.join(data_dir, 'ativos.json')
+        os.makedirs(data_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_file)
+        # ordem: ordem de entrada dos procedimentos, mantida no ativos.json exportado;
+        # dados: o procedimento já formatado como no ativos.json, para a exportação só juntar texto
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS procedimentos (
+                ordem INTEGER PRIMARY KEY AUTOINCREMENT,
+                link TEXT NOT NULL UNIQUE,
+                prazo TEXT,
+                dados TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_procedimentos_prazo ON procedimentos (prazo);
+            CREATE TABLE IF NOT EXISTS meta (
+                chave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self.conn.close()
+
+    def total(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM procedimentos").fetchone()[0]
+
+    def _hash_ativos_json(self) -> Optional[str]:
+        if not os.path.exists(self.ativos_file):
+            return None
+        with open(self.ativos_file, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def _guardar_hash_ativos_json(self, hash_ativos: Optional[str]):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('hash_ativos_json', ?)", (hash_ativos,))
+
+    def sincronizar(self) -> Optional[int]:
+        """
+        Reconstrói a base a partir do ativos.json se este não for o último exportado da base
+        (ou a base estiver vazia); devolve o número de procedimentos carregados ou None se
+        a base já estava sincronizada
+        """
+        hash_ativos = self._hash_ativos_json()
+        if hash_ativos is None:
+            return None
+        linha = self.conn.execute("SELECT valor FROM meta WHERE chave = 'hash_ativos_json'").fetchone()
+        if linha and linha[0] == hash_ativos and self.total():
+            return None
+        with self.conn:
+            self.conn.execute("DELETE FROM procedimentos")
+        carregados = self.inserir(load_existing_ativos(self.data_dir))
+        self._guardar_hash_ativos_json(hash_ativos)
+        print(f"Base de ativos sincronizada com o ativos.json ({carregados} procedimentos)")
+        return carregados
+
+    def inserir(self, procedimentos: Iterable[Dict]) -> int:
+        """
+        Insere os procedimentos cujo link ainda não está na base; devolve quantos entraram
+        """
+        antes = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO procedimentos (link, prazo, dados) VALUES (?, ?, ?) ON CONFLICT (link) DO NOTHING",
+                ((proc.get('link', ''), prazo_normalizado(proc), item_ativos_json(proc))
+                 for proc in procedimentos))
+        return self.conn.total_changes - antes
+
+    def remover_expirados(self, agora: Optional[datetime] = None) -> int:
+        """
+        Remove os procedimentos com prazo anterior a agora (ou sem prazo)
+        """
+        agora = (agora or datetime.now()).strftime(FORMATO_PRAZO)
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM procedimentos WHERE prazo IS NULL OR prazo < ?", (agora,))
+        return cursor.rowcount
+
+    def _itens_ativos(self, agora: Optional[datetime] = None) -> List[str]:
+        agora = (agora or datetime.now()).strftime(FORMATO_PRAZO)
+        cursor = self.conn.execute("SELECT dados FROM procedimentos WHERE prazo >= ? ORDER BY ordem", (agora,))
+        return [dados for dados, in cursor]
+
+    def ativos(self, agora: Optional[datetime] = None) -> List[Dict]:
+        """
+        Procedimentos com prazo >= agora, pela ordem de entrada na base
+        """
+        return [json.loads(dados) for dados in self._itens_ativos(agora)]
+
+    def proximo_prazo(self) -> Optional[str]:
+        return self.conn.execute("SELECT MIN(prazo) FROM procedimentos").fetchone()[0]
+
+    def proxima_expiracao(self) -> Optional[datetime]:
+        """
+        Momento em que o conjunto de ativos volta a mudar (primeiro prazo da base)
+        """
+        prazo = self.proximo_prazo()
+        return datetime.strptime(prazo, FORMATO_PRAZO) if prazo else None
+
+    def exportar_ativos(self, agora: Optional[datetime] = None) -> int:
+        """
+        Escreve o ativos.json (mesmo formato de gerir_ativos.save_ativos), o índice de pesquisa e a
+        listagem da interface web a partir da base
+        """
+        itens = self._itens_ativos(agora)
+        conteudo = ('[\n  ' + ',\n  '.join(itens) + '\n]' if itens else '[]').encode('utf-8')
+        tmp_file = self.ativos_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(conteudo)
+        os.replace(tmp_file, self.ativos_file)
+        self._guardar_hash_ativos_json(hashlib.sha1(conteudo).hexdigest())
+        print(f"Arquivo ativos.json atualizado: {self.ativos_file}")
+        procedimentos = [json.loads(item) for item in itens]
+        guardar_indice_pesquisa(procedimentos, self.data_dir)
+        exportar_listagem_ativos(procedimentos, self.data_dir)
+        return len(itens)
+
+def atualizar_base_ativos(date_file_path: str, data_dir: str = '../data') -> Optional[int]:
+    """
+    Junta à base os procedimentos ativos do ficheiro de data, remove os expirados e
+    exporta o ativos.json se algo mudou; devolve o número de procedimentos ativos
+    """
+    with BaseAtivos(data_dir) as base:
+        base.sincronizar()
+        novos = base.inserir(update_ativos_from_date_file(date_file_path))
+        expirados = base.remover_expirados()
+        print(f"📈 Novos procedimentos adicionados: {novos} | expirados removidos: {expirados}")
+
+        if novos or expirados or not os.path.exists(base.ativos_file):
+            base.exportar_ativos()
+        else:
+            print("ativos.json sem alterações")
+        return base.total()
+
+def refrescar_ativos(data_dir: str = '../data', rss_dir: str = '../RSS') -> Optional[datetime]:
+    """
+    Remove os expirados e reexporta o ativos.json e os feeds das seeds só se algum prazo
+    já passou (para correr de hora a hora); devolve a próxima expiração
+    """
+    with BaseAtivos(data_dir) as base:
+        base.sincronizar()
+        proxima = base.proxima_expiracao()
+        if proxima and proxima < datetime.now():
+            expirados = base.remover_expirados()
+            print(f"⏰ {expirados} procedimentos expiraram desde a última atualização")
+            base.exportar_ativos()
+            # Os feeds das seeds são filtrados do ativos.json: retirar-lhes também os expirados
+            from feeds_seeds import gerar_feeds_seeds
+            gerar_feeds_seeds(data_dir, rss_dir)
+            proxima = base.proxima_expiracao()
+        print(f"Próxima expiração: {proxima.strftime('%d-%m-%Y %H:%M') if proxima else 'N/A'}")
+        return proxima
+
+def main():
+    parser = argparse.ArgumentParser(description="Base SQLite dos procedimentos ativos")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--rss-dir", default="../RSS")
+    parser.add_argument("--exportar", action="store_true", help="remover os expirados e reescrever o ativos.json")
+    parser.add_argument("--refrescar", action="store_true",
+                        help="reescrever o ativos.json só se algum procedimento expirou")
+    args = parser.parse_args()
+
+    if args.refrescar:
+        refrescar_ativos(args.data_dir, args.rss_dir)
+        return
+
+    with BaseAtivos(args.data_dir) as base:
+        base.sincronizar()
+        if args.exportar:
+            base.remover_expirados()
+            base.exportar_ativos()
+        print(f"📊 Procedimentos na base: {base.total()} | ativos agora: {len(base.ativos())} | "
+              f"próximo prazo: {base.proximo_prazo() or 'N/A'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da normalização dos prazos sobre todos os procedimentos de data/.
+
+Compara o parse antigo de gerir_ativos.parse_date (datetime.strptime com o formato
+'%d-%m-%Y %H:%M' em cada chamada) com normalizacao_datas, sem cache (primeira passagem)
+e com a cache já preenchida, e conta os prazos reconhecidos por cada um.
+
+Uso:
+    cd scripts
+    python benchmark_datas.py [--data-dir ../data] [--repeticoes 3]
+"""
+
+import argparse
+import os
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from armazenamento_data import data_do_ficheiro, iter_procedimentos, listar_ficheiros_data
+from normalizacao_datas import CAMPO_PRAZO_ISO, normalizar_datas_procedimento, normalizar_prazo
+
+def parse_date_antigo(date_str: str) -> datetime:
+    """
+    Cópia da implementação anterior de gerir_ativos.parse_date
+    """
+    try:
+        return datetime.strptime(date_str, '%d-%m-%Y %H:%M')
+    except ValueError:
+        return datetime(1900, 1, 1)
+
+def prazo_antigo(proc: Dict, data_feed: Optional[date] = None) -> Optional[datetime]:
+    prazo_str = proc.get('prazo_apresentacao_propostas')
+    if not prazo_str or prazo_str == 'N/A':
+        return None
+    prazo = parse_date_antigo(prazo_str)
+    return None if prazo.year == 1900 else prazo
+
+def prazo_novo(proc: Dict, data_feed: date) -> Optional[str]:
+    return normalizar_datas_procedimento(proc, data_feed)[CAMPO_PRAZO_ISO]
+
+def carregar_procedimentos(data_dir: str) -> List[Tuple[Dict, date]]:
+    """
+    (procedimento, data do ficheiro diário) de todos os ficheiros
+    """
+    return [(proc, data_do_ficheiro(filename).date()) for filename in listar_ficheiros_data(data_dir)
+            for proc in iter_procedimentos(os.path.join(data_dir, filename))]
+
+def medir(funcao: Callable[[Dict, date], object], procedimentos: List[Tuple[Dict, date]],
+          repeticoes: int) -> float:
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for proc, data_feed in procedimentos:
+            funcao(proc, data_feed)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da normalização dos prazos")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    procedimentos = carregar_procedimentos(args.data_dir)
+    print(f"📚 {len(procedimentos)} procedimentos")
+    if not procedimentos:
+        return
+
+    reconhecidos_antigo = sum(1 for proc, _ in procedimentos if prazo_antigo(proc))
+    normalizar_prazo.cache_clear()
+    inicio = time.perf_counter()
+    reconhecidos_novo = sum(1 for proc, data_feed in procedimentos if prazo_novo(proc, data_feed))
+    tempo_frio = time.perf_counter() - inicio
+    cache = normalizar_prazo.cache_info()
+    print(f"🔍 Prazos reconhecidos: strptime {reconhecidos_antigo} | normalizacao_datas {reconhecidos_novo}")
+    print(f"🗂️ Textos de prazo distintos em cache: {cache.currsize}")
+
+    tempo_antigo = medir(prazo_antigo, procedimentos, args.repeticoes)
+    tempo_quente = medir(prazo_novo, procedimentos, args.repeticoes)
+    # Só o prazo, como em gerir_ativos.parse_date (sem procurar a data de publicação)
+    tempo_prazo = medir(lambda proc, _: normalizar_prazo(proc.get('prazo_apresentacao_propostas')),
+                        procedimentos, args.repeticoes)
+
+    for nome, tempo in [("strptime (antigo)", tempo_antigo), ("normalizar_prazo (cache)", tempo_prazo),
+                        ("procedimento completo, 1.ª passagem", tempo_frio),
+                        ("procedimento completo (cache)", tempo_quente)]:
+        print(f"⏱️ {nome:<37} {tempo:.3f}s ({len(procedimentos) / tempo:,.0f} procedimentos/s)")
+    print(f"🚀 Speedup do prazo com cache: {tempo_antigo / tempo_prazo:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark da extração de campos sobre os ficheiros diários de data/.
+
+Compara a abordagem antiga (um `re.search` por campo, com o dicionário de padrões
+reconstruído em cada chamada) com extracao_campos.extrair_campos, e confirma que
+ambas produzem exatamente os mesmos valores.
+
+Uso:
+    cd scripts
+    python benchmark_extracao.py [--data-dir ../data] [--ficheiros N] [--repeticoes N]
+"""
+
+import argparse
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+from extracao_campos import NOMES_CAMPOS, extrair_campos
+from armazenamento_data import iter_procedimentos, listar_ficheiros_data
+
+def extract_field_antigo(details_text: str, field_name: str) -> Optional[str]:
+    """
+    Cópia da implementação anterior de json_to_rss_converter.extract_field_from_details
+    """
+    patterns = {
+        'entidade_adjudicante': r'Designação da entidade adjudicante:\s*(.+?)(?:\n|$)',
+        'nipc': r'NIPC:\s*(\d+)',
+        'distrito': r'Distrito:\s*(.+?)(?:\n|$)',
+        'concelho': r'Concelho:\s*(.+?)(?:\n|$)',
+        'freguesia': r'Freguesia:\s*(.+?)(?:\n|$)',
+        'site': r'Endereço da Entidade \(URL\):\s*(.+?)(?:\n|$)',
+        'email': r'Endereço Eletrónico:\s*(.+?)(?:\n|$)',
+        'designacao_contrato': r'Designação do contrato:\s*(.+?)(?:\n|$)',
+        'descricao': r'Descrição:\s*(.+?)(?:\n|$)',
+        'preco_base': r'Preço base s/IVA:\s*(.+?)(?:\n|$)',
+        'prazo_execucao': r'Prazo de execução do contrato:\s*(.+?)(?:\n|$)',
+        'prazo_apresentacao_propostas': r'Prazo para apresentação das propostas:\s*(.+?)(?:\n|$)',
+        'fundos_eu': r'Têm fundos EU\?\s*(.+?)(?:\n|$)',
+        'plataforma_eletronica': r'Plataforma eletrónica utilizada pela entidade adjudicante:\s*(.+?)(?:\n|$)',
+        'url_procedimento': r'URL para Apresentação:\s*(.+?)(?:\n|$)',
+        'autor_nome': r'28 - IDENTIFICAÇÃO DO\(S\) AUTOR\(ES\) DE ANÚNCIO\nNome:\s*(.+?)(?:\n|$)',
+        'autor_cargo': r'Cargo:\s*(.+?)(?:\n|$)'
+    }
+
+    match = re.search(patterns[field_name], details_text, re.MULTILINE | re.DOTALL)
+    if match:
+        value = match.group(1).strip()
+        value = re.sub(r'\s+', ' ', value)
+        value = value.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
+        return value
+    return None
+
+def extrair_antigo(details_text: str) -> Dict[str, Optional[str]]:
+    return {field: extract_field_antigo(details_text, field) for field in NOMES_CAMPOS}
+
+def carregar_textos(data_dir: str, max_ficheiros: int = 0) -> List[str]:
+    """
+    Lê o texto detalhes_completos de todos os procedimentos dos ficheiros diários
+    """
+    ficheiros = listar_ficheiros_data(data_dir)
+    if max_ficheiros:
+        ficheiros = ficheiros[-max_ficheiros:]
+
+    textos = []
+    for filename in ficheiros:
+        for proc in iter_procedimentos(os.path.join(data_dir, filename)):
+            if proc.get('detalhes_completos'):
+                textos.append(proc['detalhes_completos'])
+    return textos
+
+def medir(funcao, textos: List[str], repeticoes: int) -> float:
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for texto in textos:
+            funcao(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da extração de campos de detalhes_completos")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--ficheiros", type=int, default=0, help="usar só os N ficheiros mais recentes (0 = todos)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    textos = carregar_textos(args.data_dir, args.ficheiros)
+    print(f"📚 {len(textos)} procedimentos com detalhes_completos")
+    if not textos:
+        return
+
+    # Verificar que os resultados são idênticos antes de medir
+    diferencas = 0
+    for texto in textos:
+        if extrair_antigo(texto) != extrair_campos(texto, desescapar_html=True):
+            diferencas += 1
+    print(f"🔍 Procedimentos com resultados diferentes: {diferencas}")
+
+    tempo_antigo = medir(extrair_antigo, textos, args.repeticoes)
+    tempo_novo = medir(lambda texto: extrair_campos(texto, desescapar_html=True), textos, args.repeticoes)
+
+    print(f"⏱️ re.search por campo:   {tempo_antigo:.3f}s ({tempo_antigo / len(textos) * 1e6:.1f} µs/procedimento)")
+    print(f"⏱️ extrair_campos:        {tempo_novo:.3f}s ({tempo_novo / len(textos) * 1e6:.1f} µs/procedimento)")
+    print(f"🚀 Speedup: {tempo_antigo / tempo_novo:.1f}x")
+
+if __name__ == "__main__":
+    main()
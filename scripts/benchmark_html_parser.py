@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do parsing das páginas de detalhe: BeautifulSoup ('html.parser') vs lxml.
+
+Usa páginas HTML guardadas (--html-dir, ficheiros .html ou .html.gz) ou, por omissão,
+páginas sintéticas geradas a partir de detalhes_completos dos ficheiros de data/, com
+o mesmo tipo de estrutura da página renderizada do DRE (scripts, estilos, menus,
+comentários e a secção do procedimento dentro de divs aninhados). Confirma que os dois
+parsers produzem exatamente o mesmo resultado.
+
+Uso:
+    cd scripts
+    python benchmark_html_parser.py [--data-dir ../data] [--paginas N] [--html-dir DIR]
+"""
+
+import argparse
+import gzip
+import os
+import time
+from typing import Dict, List, Tuple
+
+from armazenamento_data import iter_procedimentos, listar_ficheiros_data
+from replay import gerar_pagina_sintetica
+from rss_dre_extractor import extract_details_from_html
+
+def carregar_paginas(args: argparse.Namespace) -> List[str]:
+    if args.html_dir:
+        paginas = []
+        for filename in sorted(os.listdir(args.html_dir)):
+            filepath = os.path.join(args.html_dir, filename)
+            if filename.endswith('.html.gz'):
+                with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+                    paginas.append(f.read())
+            elif filename.endswith('.html'):
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    paginas.append(f.read())
+        return paginas[:args.paginas] if args.paginas else paginas
+
+    paginas = []
+    for filename in reversed(listar_ficheiros_data(args.data_dir)):
+        for proc in iter_procedimentos(os.path.join(args.data_dir, filename)):
+            if proc.get('detalhes_completos'):
+                paginas.append(gerar_pagina_sintetica(proc['detalhes_completos']))
+                if len(paginas) >= args.paginas:
+                    return paginas
+    return paginas
+
+def medir(paginas: List[str], parser: str) -> Tuple[float, List[Dict]]:
+    inicio = time.perf_counter()
+    resultados = [extract_details_from_html(pagina, parser=parser) for pagina in paginas]
+    return time.perf_counter() - inicio, resultados
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark html.parser vs lxml nas páginas de detalhe")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--html-dir", help="diretório com páginas .html/.html.gz guardadas")
+    parser.add_argument("--paginas", type=int, default=500, help="número máximo de páginas (0 = todas)")
+    args = parser.parse_args()
+
+    paginas = carregar_paginas(args)
+    if not paginas:
+        print("Nenhuma página para analisar")
+        return
+    tamanho_medio = sum(len(p) for p in paginas) / len(paginas)
+    print(f"📄 {len(paginas)} páginas, {tamanho_medio / 1024:.0f} KB em média")
+
+    tempo_bs4, resultados_bs4 = medir(paginas, 'html.parser')
+    tempo_lxml, resultados_lxml = medir(paginas, 'lxml')
+
+    diferencas = sum(1 for a, b in zip(resultados_bs4, resultados_lxml) if a != b)
+    encontrados = sum(1 for r in resultados_lxml if r)
+    print(f"🔍 Secção encontrada: {encontrados}/{len(paginas)} | resultados diferentes: {diferencas}")
+    print(f"⏱️ BeautifulSoup (html.parser): {tempo_bs4:.2f}s ({tempo_bs4 / len(paginas) * 1000:.1f} ms/página)")
+    print(f"⏱️ lxml:                        {tempo_lxml:.2f}s ({tempo_lxml / len(paginas) * 1000:.1f} ms/página)")
+    print(f"🚀 Speedup: {tempo_bs4 / tempo_lxml:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da escrita do feed RSS: ElementTree + minidom.toprettyxml (implementação
+anterior de create_rss_feed) vs escrita incremental com EscritorRSS (XMLGenerator).
+
+Os procedimentos são lidos dos ficheiros diários de data/ mais recentes (repetidos
+se necessário até chegar a --itens). Mede o tempo e o pico de memória de cada versão e
+confirma que os dois feeds têm os mesmos itens (na versão nova os valores da descrição
+são escapados para HTML, pelo que a descrição é comparada depois de html.unescape).
+
+Uso:
+    cd scripts
+    python benchmark_rss_writer.py [--data-dir ../data] [--itens 10000]
+"""
+
+import argparse
+import html
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+from xml.dom import minidom
+
+from armazenamento_data import iter_procedimentos, listar_ficheiros_data
+from json_to_rss_converter import escrever_rss_feed, parse_procedimento
+
+def create_rss_feed_antigo(procedimentos: List[Dict]) -> str:
+    """
+    Cópia da implementação anterior de json_to_rss_converter.create_rss_feed
+    """
+    rss = ET.Element('rss', version='2.0')
+    rss.set('xmlns:atom', 'http://www.w3.org/2005/Atom')
+    channel = ET.SubElement(rss, 'channel')
+    ET.SubElement(channel, 'title').text = 'Feed RSS - Procedimentos DRE'
+    ET.SubElement(channel, 'description').text = 'Feed RSS com procedimentos do Diário da República - Série II - Parte L'
+    ET.SubElement(channel, 'link').text = 'https://joaodamiao.github.io/RSS-DRE/'
+    atom_link = ET.SubElement(channel, '{http://www.w3.org/2005/Atom}link')
+    atom_link.set('href', 'https://joaodamiao.github.io/RSS-DRE/feed_rss_procedimentos.xml')
+    atom_link.set('rel', 'self')
+    atom_link.set('type', 'application/rss+xml')
+    ET.SubElement(channel, 'language').text = 'pt-PT'
+    ET.SubElement(channel, 'lastBuildDate').text = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
+
+    for i, proc in enumerate(procedimentos):
+        item = ET.SubElement(channel, 'item')
+        ET.SubElement(item, 'title').text = f"Procedimento {i+1}: {proc.get('designacao_contrato', proc.get('entidade', 'N/A'))}"
+        ET.SubElement(item, 'link').text = proc.get('link', '')
+        guid = ET.SubElement(item, 'guid')
+        guid.text = proc.get('link', f"proc_{proc.get('numero_procedimento', i)}")
+        guid.set('isPermaLink', 'true')
+        ET.SubElement(item, 'pubDate').text = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
+        ET.SubElement(item, 'description').text = f"""
+        <h3>Informações do Procedimento</h3>
+        <table border="1" cellpadding="5" cellspacing="0" style="border-collapse: collapse; width: 100%;">
+            <tr><td><strong>Entidade Adjudicante:</strong></td><td>{proc.get('entidade_adjudicante', proc.get('entidade', 'N/A'))}</td></tr>
+            <tr><td><strong>NIPC:</strong></td><td>{proc.get('nipc', 'N/A')}</td></tr>
+            <tr><td><strong>Distrito:</strong></td><td>{proc.get('distrito', 'N/A')}</td></tr>
+            <tr><td><strong>Concelho:</strong></td><td>{proc.get('concelho', 'N/A')}</td></tr>
+            <tr><td><strong>Freguesia:</strong></td><td>{proc.get('freguesia', 'N/A')}</td></tr>
+            <tr><td><strong>Site:</strong></td><td><a href="{proc.get('site', '')}">{proc.get('site', 'N/A')}</a></td></tr>
+            <tr><td><strong>E-mail:</strong></td><td><a href="mailto:{proc.get('email', '')}">{proc.get('email', 'N/A')}</a></td></tr>
+            <tr><td><strong>Designação do contrato:</strong></td><td>{proc.get('designacao_contrato', 'N/A')}</td></tr>
+            <tr><td><strong>Descrição:</strong></td><td>{proc.get('descricao', 'N/A')}</td></tr>
+            <tr><td><strong>Preço base s/IVA:</strong></td><td>{proc.get('preco_base', 'N/A')}</td></tr>
+            <tr><td><strong>Prazo de execução:</strong></td><td>{proc.get('prazo_execucao', 'N/A')}</td></tr>
+            <tr><td><strong>Prazo para apresentação das propostas:</strong></td><td>{proc.get('prazo_apresentacao_propostas', 'N/A')}</td></tr>
+            <tr><td><strong>Tem fundos EU:</strong></td><td>{proc.get('fundos_eu', 'N/A')}</td></tr>
+            <tr><td><strong>Plataforma eletrónica:</strong></td><td>{proc.get('plataforma_eletronica', 'N/A')}</td></tr>
+            <tr><td><strong>URL procedimento:</strong></td><td><a href="{proc.get('url_procedimento', '')}">{proc.get('url_procedimento', 'N/A')}</a></td></tr>
+            <tr><td><strong>Autor do anúncio - Nome:</strong></td><td>{proc.get('autor_nome', 'N/A')}</td></tr>
+            <tr><td><strong>Autor do anúncio - Cargo:</strong></td><td>{proc.get('autor_cargo', 'N/A')}</td></tr>
+        </table>
+        """
+
+    rough_string = ET.tostring(rss, encoding='unicode')
+    reparsed = minidom.parseString(rough_string)
+    return reparsed.toprettyxml(indent="  ")
+
+def carregar_procedimentos(data_dir: str, itens: int) -> List[Dict]:
+    procedimentos = []
+    for filename in reversed(listar_ficheiros_data(data_dir)):
+        procedimentos.extend(parse_procedimento(proc)
+                             for proc in iter_procedimentos(os.path.join(data_dir, filename)))
+        if len(procedimentos) >= itens:
+            break
+    if not procedimentos:
+        return []
+    # Repetir os procedimentos se data/ não tiver itens suficientes
+    return list(itertools.islice(itertools.cycle(procedimentos), itens))
+
+def medir(funcao: Callable[[str], None], saida: str) -> Tuple[float, float]:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcao(saida)
+    duracao = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return duracao, pico
+
+def itens_do_feed(filepath: str) -> List[Tuple[str, str, str, str]]:
+    return [(item.findtext('title'), item.findtext('link'), item.findtext('guid'),
+             html.unescape(item.findtext('description')))
+            for item in ET.parse(filepath).getroot().iter('item')]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da escrita do feed RSS (minidom vs XMLGenerator)")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--itens", type=int, default=10000)
+    args = parser.parse_args()
+
+    procedimentos = carregar_procedimentos(args.data_dir, args.itens)
+    if not procedimentos:
+        print("Nenhum procedimento em data/")
+        return
+    print(f"📚 {len(procedimentos)} itens")
+
+    def antigo(saida: str):
+        with open(saida, 'w', encoding='utf-8') as f:
+            f.write(create_rss_feed_antigo(procedimentos))
+
+    def novo(saida: str):
+        with open(saida, 'w', encoding='utf-8') as f:
+            escrever_rss_feed(procedimentos, f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        saida_antiga = os.path.join(tmp, 'antigo.xml')
+        saida_nova = os.path.join(tmp, 'novo.xml')
+        tempo_antigo, memoria_antiga = medir(antigo, saida_antiga)
+        tempo_novo, memoria_nova = medir(novo, saida_nova)
+
+        diferencas = sum(1 for a, b in zip(itens_do_feed(saida_antiga), itens_do_feed(saida_nova)) if a != b)
+        print(f"🔍 Itens diferentes: {diferencas}")
+        print(f"⏱️ ElementTree + minidom: {tempo_antigo:.2f}s, pico de memória {memoria_antiga:.0f} MB, "
+              f"{os.path.getsize(saida_antiga) / (1024 * 1024):.1f} MB")
+        print(f"⏱️ EscritorRSS:           {tempo_novo:.2f}s, pico de memória {memoria_nova:.1f} MB, "
+              f"{os.path.getsize(saida_nova) / (1024 * 1024):.1f} MB")
+        print(f"🚀 Speedup: {tempo_antigo / tempo_novo:.1f}x")
+
+if __name__ == "__main__":
+    main()
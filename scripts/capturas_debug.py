@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capturas de debug das páginas de detalhe cuja extração falhou ou ficou incompleta.
+
+Cada página é guardada comprimida (gzip) num ficheiro com o nome derivado do link do
+procedimento, com um índice JSON (link, motivo, tamanho, data). Quando o total
+ultrapassa o limite configurado, as capturas mais antigas são removidas.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Sem estes campos a extração é considerada parcial e a página é capturada
+CAMPOS_ESSENCIAIS = ('entidade', 'nipc', 'designacao_contrato', 'prazo_apresentacao_propostas')
+
+MAX_MB_CAPTURAS = 50
+
+def chave_captura(link: str) -> str:
+    """
+    Nome (sem extensão) do ficheiro de captura de um procedimento
+    """
+    return hashlib.sha1(link.encode('utf-8')).hexdigest()[:16]
+
+def campos_em_falta(details: Optional[Dict]) -> List[str]:
+    """
+    Campos essenciais que não foram extraídos
+    """
+    if not details:
+        return list(CAMPOS_ESSENCIAIS)
+    return [campo for campo in CAMPOS_ESSENCIAIS if not details.get(campo)]
+
+class DebugCaptureStore:
+    """
+    Com `todas=True` guarda todas as páginas (para o replay.py) e `max_mb=0` desliga o limite
+    """
+
+    def __init__(self, diretorio: str, max_mb: float = MAX_MB_CAPTURAS, todas: bool = False):
+        self.diretorio = diretorio
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.todas = todas
+        self.index_file = os.path.join(diretorio, "indice.json")
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+        self.capturas = self._carregar_indice()
+
+    def _carregar_indice(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return {}
+
+    def _guardar_indice(self):
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump(self.capturas, f, ensure_ascii=False, indent=2)
+
+    def caminho(self, link: str) -> str:
+        return os.path.join(self.diretorio, f"{chave_captura(link)}.html.gz")
+
+    def guardar(self, link: str, page_source: str, motivo: str):
+        """Guardar (ou substituir) a captura de um procedimento"""
+        chave = chave_captura(link)
+        filepath = self.caminho(link)
+        try:
+            with self._lock:
+                with gzip.open(filepath, 'wt', encoding='utf-8') as f:
+                    f.write(page_source)
+                self.capturas[chave] = {
+                    'link': link,
+                    'motivo': motivo,
+                    'tamanho': os.path.getsize(filepath),
+                    'data': datetime.now().isoformat(timespec='seconds'),
+                }
+                self._remover_antigas()
+                self._guardar_indice()
+            print(f"🐞 Captura de debug guardada ({motivo}): {filepath}")
+        except Exception as e:
+            print(f"Erro ao guardar captura de debug: {e}")
+
+    def _remover_antigas(self):
+        if not self.max_bytes:
+            return
+        total = sum(captura['tamanho'] for captura in self.capturas.values())
+        # Remover as capturas mais antigas até o total caber no limite
+        for chave in sorted(self.capturas, key=lambda c: self.capturas[c]['data']):
+            if total <= self.max_bytes:
+                break
+            total -= self.capturas.pop(chave)['tamanho']
+            try:
+                os.remove(os.path.join(self.diretorio, f"{chave}.html.gz"))
+            except FileNotFoundError:
+                pass
+
+    def capturar_se_incompleto(self, link: str, page_source: str, details: Optional[Dict]):
+        """Guardar a página só se a extração falhou ou ficou sem campos essenciais"""
+        if self.todas:
+            self.guardar(link, page_source, 'ok' if details and not campos_em_falta(details) else 'incompleto')
+            return
+
+        if not details:
+            self.guardar(link, page_source, 'falhou')
+            return
+
+        em_falta = campos_em_falta(details)
+        if em_falta:
+            self.guardar(link, page_source, f"parcial: {', '.join(em_falta)}")
+
+    def carregar(self, link: str) -> Optional[str]:
+        """Ler o HTML capturado de um procedimento"""
+        filepath = self.caminho(link)
+        if not os.path.exists(filepath):
+            return None
+        with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+            return f.read()
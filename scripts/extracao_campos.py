@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extração dos campos de um procedimento a partir do texto de detalhes_completos.
+
+Os padrões são compilados uma única vez. Cada campo é localizado pelo seu rótulo
+literal com `str.find` (sem passar pelo motor de expressões regulares) e só nessa
+posição é aplicado o padrão completo do campo. O resultado é o mesmo de aplicar
+`re.search` com cada padrão ao texto inteiro.
+"""
+
+import re
+from typing import Dict, Optional
+
+# Padrão do valor que se segue a cada rótulo
+_VALOR_LINHA = r'\s*(.+?)(?:\n|$)'
+
+# (campo, rótulo literal, valor) pela ordem em que os campos são guardados
+CAMPOS = [
+    ('entidade_adjudicante', 'Designação da entidade adjudicante:', _VALOR_LINHA),
+    ('nipc', 'NIPC:', r'\s*(\d+)'),
+    ('distrito', 'Distrito:', _VALOR_LINHA),
+    ('concelho', 'Concelho:', _VALOR_LINHA),
+    ('freguesia', 'Freguesia:', _VALOR_LINHA),
+    ('site', 'Endereço da Entidade (URL):', _VALOR_LINHA),
+    ('email', 'Endereço Eletrónico:', _VALOR_LINHA),
+    ('designacao_contrato', 'Designação do contrato:', _VALOR_LINHA),
+    ('descricao', 'Descrição:', _VALOR_LINHA),
+    ('preco_base', 'Preço base s/IVA:', _VALOR_LINHA),
+    ('prazo_execucao', 'Prazo de execução do contrato:', _VALOR_LINHA),
+    ('prazo_apresentacao_propostas', 'Prazo para apresentação das propostas:', _VALOR_LINHA),
+    ('fundos_eu', 'Têm fundos EU?', _VALOR_LINHA),
+    ('plataforma_eletronica', 'Plataforma eletrónica utilizada pela entidade adjudicante:', _VALOR_LINHA),
+    ('url_procedimento', 'URL para Apresentação:', _VALOR_LINHA),
+    ('autor_nome', '28 - IDENTIFICAÇÃO DO(S) AUTOR(ES) DE ANÚNCIO\nNome:', _VALOR_LINHA),
+    ('autor_cargo', 'Cargo:', _VALOR_LINHA),
+]
+
+NOMES_CAMPOS = [campo for campo, _, _ in CAMPOS]
+
+# Padrão completo de cada campo (rótulo + valor)
+PADROES = {
+    campo: re.compile(re.escape(rotulo) + valor, re.MULTILINE | re.DOTALL)
+    for campo, rotulo, valor in CAMPOS
+}
+
+_ROTULOS = [(campo, rotulo, PADROES[campo]) for campo, rotulo, _ in CAMPOS]
+
+def _limpar(value: str, desescapar_html: bool) -> str:
+    # Equivalente a re.sub(r'\s+', ' ', value.strip()): split() usa os mesmos espaços Unicode
+    value = ' '.join(value.split())
+    if desescapar_html and '&' in value:
+        # Remover caracteres especiais HTML
+        value = value.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
+    return value
+
+def extrair_campos(details_text: str, desescapar_html: bool = False) -> Dict[str, Optional[str]]:
+    """
+    Extrai todos os campos de uma só vez; campos não encontrados ficam a None
+    """
+    extracted_info = dict.fromkeys(NOMES_CAMPOS)
+    if not details_text:
+        return extracted_info
+
+    for campo, rotulo, pattern in _ROTULOS:
+        pos = details_text.find(rotulo)
+        while pos != -1:
+            # Se o valor não corresponder, procurar a próxima ocorrência do rótulo
+            match = pattern.match(details_text, pos)
+            if match:
+                extracted_info[campo] = _limpar(match.group(1), desescapar_html)
+                break
+            pos = details_text.find(rotulo, pos + 1)
+
+    return extracted_info
+
+def extrair_campo(details_text: str, field_name: str, desescapar_html: bool = False) -> Optional[str]:
+    """
+    Extrai um único campo com o padrão pré-compilado
+    """
+    pattern = PADROES.get(field_name)
+    if pattern is None or not details_text:
+        return None
+
+    match = pattern.search(details_text)
+    if match:
+        return _limpar(match.group(1), desescapar_html)
+    return None
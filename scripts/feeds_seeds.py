@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Feeds RSS/JSON por seed, gerados a partir do ativos.json numa única passagem.
+
+As seeds (data/seeds.json, geridas com manage_seeds.SeedManager) filtram os procedimentos
+ativos pelas suas tags e, opcionalmente, pelo distrito, com as mesmas regras de
+procedureMatchesSeed em scripts.js. Em vez de percorrer os procedimentos uma vez por
+seed, as tags de todas as seeds são reunidas num autómato Aho–Corasick: o texto de cada
+procedimento é percorrido uma única vez e devolve logo todas as tags encontradas.
+
+Para cada seed são escritos RSS/seeds/<código>.xml e RSS/seeds/<código>.json. Cada item
+mantém a pubDate da sua primeira publicação: o dia do primeiro ficheiro de data/ em que
+apareceu (como no arquivo do feed) ou, para links sem ficheiro diário, a pubDate da
+cache dos itens do feed principal.
+
+Uso:
+    cd scripts
+    python feeds_seeds.py [--data-dir ../data] [--rss-dir ../RSS]
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+from indice_links import IndiceLinks
+from json_to_rss_converter import (CACHE_ITENS_FILE, CANAL_DESCRICAO, CANAL_LINK, CANAL_TITULO, CacheItensRSS,
+                                   EscritorRSS, formatar_data_rss, parse_procedimento)
+from manage_seeds import SeedManager
+
+SUBDIR_SEEDS = 'seeds'
+URL_SEEDS = CANAL_LINK + 'RSS/seeds/'
+
+# Campos usados na pesquisa das tags, pela ordem de procedureMatchesSeed (scripts.js)
+CAMPOS_PESQUISA = [
+    'descricao', 'designacao_contrato', 'entidade', 'entidade_adjudicante', 'plataforma_eletronica',
+    'preco_base', 'prazo_apresentacao_propostas', 'nipc', 'distrito', 'concelho', 'freguesia',
+    'site', 'email', 'numero_procedimento', 'prazo_execucao', 'fundos_eu', 'autor_nome', 'autor_cargo',
+]
+
+_DATA_ENVIO = re.compile(r'Data de Envio do Anúncio:\s*(\d{1,2}-\d{1,2}-\d{4})')
+
+def extrair_data_publicacao(detalhes_completos: Optional[str]) -> str:
+    """
+    Equivalente a extractPublicationDate (scripts.js): DD/MM/YYYY ou 'N/A'
+    """
+    if not detalhes_completos:
+        return 'N/A'
+    match = _DATA_ENVIO.search(detalhes_completos)
+    return match.group(1).replace('-', '/') if match else 'N/A'
+
+def texto_pesquisa(proc: Dict) -> str:
+    """
+    Texto (em minúsculas) em que as tags das seeds são procuradas
+    """
+    partes = [proc.get(campo) or '' for campo in CAMPOS_PESQUISA]
+    partes.append(extrair_data_publicacao(proc.get('detalhes_completos')))
+    return ' '.join(partes).lower()
+
+class AhoCorasick:
+    """
+    Autómato Aho–Corasick: encontra todos os padrões presentes num texto numa só passagem
+    """
+
+    def __init__(self, padroes: Iterable[str]):
+        self.padroes = list(padroes)
+        self._transicoes = [{}]
+        self._falha = [0]
+        self._saidas = [set()]
+        # Um padrão vazio está contido em qualquer texto (como ''.includes em JavaScript)
+        self._vazios = {i for i, padrao in enumerate(self.padroes) if not padrao}
+
+        for i, padrao in enumerate(self.padroes):
+            estado = 0
+            for caracter in padrao:
+                seguinte = self._transicoes[estado].get(caracter)
+                if seguinte is None:
+                    seguinte = len(self._transicoes)
+                    self._transicoes[estado][caracter] = seguinte
+                    self._transicoes.append({})
+                    self._falha.append(0)
+                    self._saidas.append(set())
+                estado = seguinte
+            if padrao:
+                self._saidas[estado].add(i)
+
+        # Ligações de falha por largura, juntando as saídas dos sufixos
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for caracter, seguinte in self._transicoes[estado].items():
+                fila.append(seguinte)
+                falha = self._falha[estado]
+                while falha and caracter not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                self._falha[seguinte] = self._transicoes[falha].get(caracter, 0)
+                self._saidas[seguinte] |= self._saidas[self._falha[seguinte]]
+
+    def encontrar(self, texto: str) -> Set[int]:
+        """
+        Índices dos padrões que ocorrem em texto
+        """
+        encontrados = set(self._vazios)
+        transicoes, falha, saidas = self._transicoes, self._falha, self._saidas
+        estado = 0
+        for caracter in texto:
+            while estado and caracter not in transicoes[estado]:
+                estado = falha[estado]
+            estado = transicoes[estado].get(caracter, 0)
+            if saidas[estado]:
+                encontrados |= saidas[estado]
+        return encontrados
+
+def nome_ficheiro_seed(code: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_-]', '_', code)
+
+class FiltroSeeds:
+    """
+    Filtra procedimentos por todas as seeds de uma vez
+    """
+
+    def __init__(self, seeds: List[Dict]):
+        self.seeds = seeds
+        padroes = sorted({tag.lower() for seed in seeds for tag in seed.get('tags', [])})
+        self._matcher = AhoCorasick(padroes)
+        # Índice do padrão -> seeds com essa tag
+        indice = {padrao: i for i, padrao in enumerate(padroes)}
+        self._seeds_por_padrao = [[] for _ in padroes]
+        for n, seed in enumerate(seeds):
+            for tag in set(tag.lower() for tag in seed.get('tags', [])):
+                self._seeds_por_padrao[indice[tag]].append(n)
+
+    def seeds_do_procedimento(self, proc: Dict) -> Set[int]:
+        """
+        Índices das seeds a que o procedimento corresponde
+        """
+        candidatas = set()
+        for padrao in self._matcher.encontrar(texto_pesquisa(proc)):
+            candidatas.update(self._seeds_por_padrao[padrao])
+
+        distrito = (proc.get('distrito') or '').lower()
+        return {n for n in candidatas
+                if not self.seeds[n].get('district') or self.seeds[n]['district'].lower() == distrito}
+
+    def filtrar(self, procedimentos: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """
+        Procedimentos de cada seed (pelo código), numa única passagem
+        """
+        por_seed = [[] for _ in self.seeds]
+        for proc in procedimentos:
+            for n in self.seeds_do_procedimento(proc):
+                por_seed[n].append(proc)
+        return {seed['code']: procs for seed, procs in zip(self.seeds, por_seed)}
+
+def pub_dates_originais(procedimentos: Iterable[Dict], data_dir: str, rss_dir: str) -> Dict[str, str]:
+    """
+    pubDate da primeira publicação de cada link: o dia do primeiro ficheiro diário em que
+    apareceu (indice_links.json) ou, se não houver, a pubDate guardada na cache do feed principal
+    """
+    indice = IndiceLinks(data_dir)
+    cache = CacheItensRSS(os.path.join(rss_dir, CACHE_ITENS_FILE)).itens
+    pub_dates_cache = {chave.split('\n')[0]: registo['pub_date'] for chave, registo in cache.items()}
+
+    pub_dates = {}
+    for proc in procedimentos:
+        link = proc.get('link')
+        if not link or link in pub_dates:
+            continue
+        data_ficheiro = indice.data_primeiro_ficheiro(link)
+        if data_ficheiro:
+            pub_dates[link] = formatar_data_rss(data_ficheiro)
+        elif link in pub_dates_cache:
+            pub_dates[link] = pub_dates_cache[link]
+    return pub_dates
+
+def escrever_feeds_seeds(seeds: List[Dict], por_seed: Dict[str, List[Dict]], seeds_dir: str,
+                         url_base: str = URL_SEEDS, pub_dates: Optional[Dict[str, str]] = None):
+    """
+    Escreve os feeds de cada seed; pub_dates: pubDate de cada link (por omissão, a hora atual)
+    """
+    pub_dates = pub_dates or {}
+    os.makedirs(seeds_dir, exist_ok=True)
+    nomes = set()
+    for seed in seeds:
+        nome = nome_ficheiro_seed(seed['code'])
+        nomes.add(nome)
+        procedimentos = por_seed.get(seed['code'], [])
+
+        with open(os.path.join(seeds_dir, f"{nome}.json"), 'w', encoding='utf-8') as f:
+            json.dump(procedimentos, f, ensure_ascii=False)
+
+        links = [{'href': f"{url_base}{nome}.xml", 'rel': 'self', 'type': 'application/rss+xml'}]
+        with open(os.path.join(seeds_dir, f"{nome}.xml"), 'w', encoding='utf-8') as f:
+            escritor = EscritorRSS(f)
+            escritor.iniciar_feed(f"{CANAL_TITULO} - {seed.get('name') or seed['code']}", CANAL_DESCRICAO,
+                                  CANAL_LINK, links)
+            for i, proc in enumerate(procedimentos):
+                escritor.escrever_item(parse_procedimento(proc), i + 1, pub_dates.get(proc.get('link')))
+            escritor.terminar_feed()
+
+    # Remover os feeds de seeds que já não existem
+    for filename in os.listdir(seeds_dir):
+        nome, extensao = os.path.splitext(filename)
+        if extensao in ('.xml', '.json') and nome not in nomes:
+            os.remove(os.path.join(seeds_dir, filename))
+
+def gerar_feeds_seeds(data_dir: str = '../data', rss_dir: str = '../RSS') -> Optional[Dict[str, int]]:
+    """
+    Gera os feeds de todas as seeds a partir do ativos.json; devolve o número de procedimentos por seed
+    """
+    seeds = SeedManager(data_dir).load_seeds()
+    if not seeds:
+        return None
+
+    ativos_file = os.path.join(data_dir, 'ativos.json')
+    try:
+        with open(ativos_file, 'r', encoding='utf-8') as f:
+            ativos = json.load(f)
+    except Exception as e:
+        print(f"❌ Erro ao carregar {ativos_file}: {e}")
+        return None
+
+    por_seed = FiltroSeeds(seeds).filtrar(ativos)
+    escrever_feeds_seeds(seeds, por_seed, os.path.join(rss_dir, SUBDIR_SEEDS),
+                         pub_dates=pub_dates_originais(ativos, data_dir, rss_dir))
+    contagens = {code: len(procs) for code, procs in por_seed.items()}
+    print(f"🌱 Feeds de {len(seeds)} seeds gerados em {os.path.join(rss_dir, SUBDIR_SEEDS)} "
+          f"({sum(contagens.values())} procedimentos no total)")
+    return contagens
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um feed RSS/JSON por seed a partir do ativos.json")
+    parser.add_argument("--data-dir", default="../data")
+    parser.add_argument("--rss-dir", default="../RSS")
+    args = parser.parse_args()
+
+    contagens = gerar_feeds_seeds(args.data_dir, args.rss_dir)
+    if contagens is None:
+        print("Nenhuma seed ou ativos.json para processar")
+        return
+    for code, total in contagens.items():
+        print(f"  {code}: {total} procedimentos")
+
+if __name__ == "__main__":
+    main()
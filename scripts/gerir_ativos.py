@@ -1,36 +1,45 @@
+import hashlib
 import json
 import os
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from armazenamento_data import ler_procedimentos
+from indice_pesquisa import data_publicacao, guardar_indice_pesquisa
+from normalizacao_datas import CAMPO_PRAZO_ISO, CAMPO_PUBLICACAO_ISO, normalizar_prazo, prazo_do_procedimento
+from normalizacao_valores import CAMPO_PRECO_CENTIMOS
+
+LISTAGEM_ATIVOS_FILE = 'ativos_lista.json'
+DETALHES_ATIVOS_DIR = 'ativos_detalhes'
+
+# Campos mostrados (ou pesquisados) na interface web; os restantes, sobretudo o
+# detalhes_completos, vão para os ficheiros de ativos_detalhes/ carregados a pedido
+CAMPOS_LISTAGEM = [
+    'link', 'descricao', 'designacao_contrato', 'entidade', 'entidade_adjudicante',
+    'plataforma_eletronica', 'preco_base', CAMPO_PRECO_CENTIMOS, 'prazo_apresentacao_propostas',
+    CAMPO_PRAZO_ISO, 'nipc', 'distrito', 'concelho', 'freguesia', 'site', 'email',
+    'numero_procedimento', 'prazo_execucao', 'fundos_eu', 'url_procedimento', 'autor_nome', 'autor_cargo',
+]
 
 def parse_date(date_str: str) -> datetime:
     """
-    Converte string de data no formato DD-MM-YYYY HH:MM para datetime
+    Converte uma string de prazo (ex.: "08-08-2025 18:00", ver normalizacao_datas) para datetime
     """
-    try:
-        # Formato esperado: "08-08-2025 18:00"
-        return datetime.strptime(date_str, '%d-%m-%Y %H:%M')
-    except ValueError:
-        # Se não conseguir fazer parse, retornar uma data muito antiga
-        return datetime(1900, 1, 1)
+    prazo = normalizar_prazo(date_str)
+    # Se não conseguir fazer parse, retornar uma data muito antiga
+    return datetime.fromisoformat(prazo) if prazo else datetime(1900, 1, 1)
 
 def is_procedure_active(procedure: Dict) -> bool:
     """
     Verifica se um procedimento está ativo (prazo de apresentação ainda válido)
     """
-    prazo_str = procedure.get('prazo_apresentacao_propostas')
-    
-    if not prazo_str or prazo_str == 'N/A':
+    # Prazo já normalizado na extração (prazo_apresentacao_propostas_iso)
+    prazo_date = prazo_do_procedimento(procedure)
+    if prazo_date is None:
         return False
     
-    try:
-        prazo_date = parse_date(prazo_str)
-        current_date = datetime.now()
-        
-        # Procedimento está ativo se o prazo for >= data atual
-        return prazo_date >= current_date
-    except:
-        return False
+    # Procedimento está ativo se o prazo for >= data atual
+    return prazo_date >= datetime.now()
 
 def get_data_dir():
     """
@@ -75,11 +84,11 @@ def get_data_dir():
     os.makedirs('data', exist_ok=True)
     return 'data'
 
-def load_existing_ativos() -> List[Dict]:
+def load_existing_ativos(data_dir: Optional[str] = None) -> List[Dict]:
     """
     Carrega o arquivo ativos.json existente se existir
     """
-    data_dir = get_data_dir()
+    data_dir = data_dir or get_data_dir()
     ativos_file = os.path.join(data_dir, 'ativos.json')
     
     if os.path.exists(ativos_file):
@@ -91,12 +100,12 @@ def load_existing_ativos() -> List[Dict]:
             return []
     return []
 
-def save_ativos(procedimentos_ativos: List[Dict]) -> str:
+def save_ativos(procedimentos_ativos: List[Dict], data_dir: Optional[str] = None) -> str:
     """
     Salva a lista de procedimentos ativos no arquivo ativos.json
     """
     try:
-        data_dir = get_data_dir()
+        data_dir = data_dir or get_data_dir()
         # Garantir que o diretório data existe
         os.makedirs(data_dir, exist_ok=True)
         
@@ -106,11 +115,72 @@ def save_ativos(procedimentos_ativos: List[Dict]) -> str:
             json.dump(procedimentos_ativos, f, ensure_ascii=False, indent=2)
         
         print(f"Arquivo ativos.json atualizado: {ativos_file}")
+        guardar_indice_pesquisa(procedimentos_ativos, data_dir)
+        exportar_listagem_ativos(procedimentos_ativos, data_dir)
         return ativos_file
     except Exception as e:
         print(f"Erro ao salvar ativos.json: {e}")
         return None
 
+def ficheiro_detalhe(link: str) -> str:
+    """
+    Nome do ficheiro de ativos_detalhes/ de um procedimento (2 primeiros dígitos do SHA-1 do link):
+    estável enquanto o procedimento estiver ativo, pelo que só mudam os ficheiros com entradas ou saídas
+    """
+    return hashlib.sha1(link.encode('utf-8')).hexdigest()[:2]
+
+def _escrever_se_mudou(filepath: str, conteudo: str) -> bool:
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            if f.read() == conteudo:
+                return False
+    tmp_file = filepath + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+    os.replace(tmp_file, filepath)
+    return True
+
+def exportar_listagem_ativos(procedimentos_ativos: List[Dict], data_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Escreve a listagem leve dos ativos para a interface web (ativos_lista.json: campos
+    mostrados, data de publicação já calculada e ficheiro de detalhe, pela ordem do
+    ativos.json) e os restantes campos em ativos_detalhes/XX.json ({link: campos})
+    """
+    try:
+        data_dir = data_dir or get_data_dir()
+        detalhes_dir = os.path.join(data_dir, DETALHES_ATIVOS_DIR)
+        os.makedirs(detalhes_dir, exist_ok=True)
+
+        listagem = []
+        detalhes = {}
+        for proc in procedimentos_ativos:
+            link = proc.get('link', '')
+            item = {campo: proc[campo] for campo in CAMPOS_LISTAGEM if campo in proc}
+            item[CAMPO_PUBLICACAO_ISO] = data_publicacao(proc)
+            item['detalhe'] = ficheiro_detalhe(link)
+            listagem.append(item)
+            detalhes.setdefault(item['detalhe'], {})[link] = {
+                campo: valor for campo, valor in proc.items() if campo not in item}
+
+        listagem_file = os.path.join(data_dir, LISTAGEM_ATIVOS_FILE)
+        _escrever_se_mudou(listagem_file, json.dumps(listagem, ensure_ascii=False, separators=(',', ':')))
+
+        alterados = sum(_escrever_se_mudou(os.path.join(detalhes_dir, f"{nome}.json"),
+                                           json.dumps(conteudo, ensure_ascii=False, separators=(',', ':')))
+                        for nome, conteudo in detalhes.items())
+        removidos = 0
+        for filename in os.listdir(detalhes_dir):
+            if filename.endswith('.json') and filename[:-len('.json')] not in detalhes:
+                os.remove(os.path.join(detalhes_dir, filename))
+                removidos += 1
+
+        print(f"📦 Listagem dos ativos: {listagem_file} ({os.path.getsize(listagem_file) // 1024} KB) | "
+              f"ficheiros de detalhe: {len(detalhes)} ({alterados} alterados, {removidos} removidos)")
+        return listagem_file
+    except Exception as e:
+        print(f"Erro ao exportar {LISTAGEM_ATIVOS_FILE}: {e}")
+        return None
+
 def update_ativos_from_date_file(date_file_path: str) -> List[Dict]:
     """
     Atualiza o arquivo ativos.json baseado no arquivo de data específico
@@ -119,8 +189,7 @@ def update_ativos_from_date_file(date_file_path: str) -> List[Dict]:
     
     # Carregar procedimentos do arquivo de data
     try:
-        with open(date_file_path, 'r', encoding='utf-8') as f:
-            procedimentos = json.load(f)
+        procedimentos = ler_procedimentos(date_file_path)
     except Exception as e:
         print(f"❌ Erro ao carregar {date_file_path}: {e}")
         return []
@@ -142,11 +211,11 @@ def update_ativos_from_date_file(date_file_path: str) -> List[Dict]:
     
     return procedimentos_ativos
 
-def merge_with_existing_ativos(procedimentos_ativos: List[Dict]) -> List[Dict]:
+def merge_with_existing_ativos(procedimentos_ativos: List[Dict], data_dir: Optional[str] = None) -> List[Dict]:
     """
     Combina novos procedimentos ativos com os existentes, removendo duplicados
     """
-    existing_ativos = load_existing_ativos()
+    existing_ativos = load_existing_ativos(data_dir)
     
     if not existing_ativos:
         return procedimentos_ativos
@@ -224,7 +293,7 @@ def main():
         if os.path.exists(data_dir):
             print(f"\n📂 Arquivos disponíveis em {data_dir}:")
             for file in os.listdir(data_dir):
-                if file.endswith('.json'):
+                if file.endswith(('.json', '.jsonl.gz')):
                     print(f"  - {file}")
 
 if __name__ == "__main__":
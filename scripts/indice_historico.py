@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice histórico (SQLite) dos procedimentos de todos os ficheiros diários de data/.
+
+Para cada procedimento guarda o NIPC, a entidade, o distrito, o concelho, a plataforma
+eletrónica e a data de publicação, e onde está o registo completo (ficheiro, posição no
+ficheiro e, nos snapshots, o deslocamento da linha). Perguntas como "todos os
+procedimentos do NIPC X" ou "quando publicou esta entidade pela última vez" são
+respondidas pelo índice, sem abrir os ficheiros. Um procedimento que aparece em vários
+ficheiros diários é devolvido uma só vez, com o registo do ficheiro mais recente.
+
+O índice regista o mtime de cada ficheiro diário: cada atualização só (re)indexa os
+ficheiros novos ou alterados e esquece os que deixaram de existir. As pesquisas pela
+linha de comandos atualizam o índice antes de pesquisar.
+
+Uso:
+    cd scripts
+    python indice_historico.py atualizar [--reconstruir]
+    python indice_historico.py procurar --nipc 501222634
+    python indice_historico.py procurar --entidade "Município das Caldas da Rainha" --limite 1
+    python indice_historico.py procurar --distrito Leiria --desde 2025-09-01 --completo
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from armazenamento_data import (data_do_ficheiro, iter_procedimentos, iter_procedimentos_com_deslocamento,
+                                ler_procedimentos_em, listar_ficheiros_data)
+from normalizacao_datas import CAMPO_PUBLICACAO_ISO, normalizar_data_publicacao
+
+INDICE_HISTORICO_FILE = 'indice_historico.sqlite'
+# Versão do esquema (PRAGMA user_version): um índice de outra versão é reconstruído
+VERSAO_ESQUEMA = 2
+
+# Colunas do índice pesquisáveis por igualdade (campo do procedimento)
+CAMPOS_INDICE = {
+    'nipc': 'nipc',
+    'entidade': 'entidade',
+    'distrito': 'distrito',
+    'concelho': 'concelho',
+    'plataforma': 'plataforma_eletronica',
+}
+
+def data_publicacao_iso(proc: Dict, filename: str) -> str:
+    """
+    Data de envio do anúncio (AAAA-MM-DD); se não existir, a data do ficheiro diário
+    """
+    return (proc.get(CAMPO_PUBLICACAO_ISO) or normalizar_data_publicacao(proc.get('detalhes_completos'))
+            or data_do_ficheiro(filename).strftime('%Y-%m-%d'))
+
+def normalizar(valor: Optional[str]) -> Optional[str]:
+    if not valor or valor == 'N/A':
+        return None
+    return valor.strip().lower()
+
+class IndiceHistorico:
+    def __init__(self, data_dir: str = '../data'):
+        self.data_dir = data_dir
+        self.db_file = os.path.join(data_dir, INDICE_HISTORICO_FILE)
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.row_factory = sqlite3.Row
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != VERSAO_ESQUEMA:
+            self.conn.executescript("DROP TABLE IF EXISTS registos; DROP TABLE IF EXISTS ficheiros;")
+            self.conn.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+        # Os valores pesquisáveis ficam em minúsculas; os originais vêm do ficheiro (--completo)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ficheiros (
+                nome TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                procedimentos INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS registos (
+                ficheiro TEXT NOT NULL,
+                posicao INTEGER NOT NULL,
+                deslocamento INTEGER,
+                data_ficheiro TEXT NOT NULL,
+                link TEXT,
+                nipc TEXT,
+                entidade TEXT,
+                distrito TEXT,
+                concelho TEXT,
+                plataforma TEXT,
+                data_publicacao TEXT NOT NULL,
+                PRIMARY KEY (ficheiro, posicao)
+            );
+            CREATE INDEX IF NOT EXISTS idx_registos_nipc ON registos (nipc, data_publicacao);
+            CREATE INDEX IF NOT EXISTS idx_registos_entidade ON registos (entidade, data_publicacao);
+            CREATE INDEX IF NOT EXISTS idx_registos_distrito ON registos (distrito, data_publicacao);
+            CREATE INDEX IF NOT EXISTS idx_registos_concelho ON registos (concelho, data_publicacao);
+            CREATE INDEX IF NOT EXISTS idx_registos_plataforma ON registos (plataforma, data_publicacao);
+            CREATE INDEX IF NOT EXISTS idx_registos_data ON registos (data_publicacao);
+            CREATE INDEX IF NOT EXISTS idx_registos_link ON registos (link);
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self.conn.close()
+
+    def _indexar_ficheiro(self, filename: str, mtime: float):
+        filepath = os.path.join(self.data_dir, filename)
+        try:
+            procedimentos = list(iter_procedimentos_com_deslocamento(filepath))
+        except Exception as e:
+            print(f"Erro ao carregar {filepath}: {e}")
+            return
+        data_ficheiro = data_do_ficheiro(filename).strftime('%Y-%m-%d')
+        self.conn.execute("DELETE FROM registos WHERE ficheiro = ?", (filename,))
+        self.conn.executemany(
+            "INSERT INTO registos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((filename, posicao, deslocamento, data_ficheiro, proc.get('link'),
+              *(normalizar(proc.get(campo)) for campo in CAMPOS_INDICE.values()),
+              data_publicacao_iso(proc, filename))
+             for posicao, (deslocamento, proc) in enumerate(procedimentos)))
+        self.conn.execute("INSERT OR REPLACE INTO ficheiros VALUES (?, ?, ?)", (filename, mtime, len(procedimentos)))
+
+    def atualizar(self, reconstruir: bool = False) -> Dict[str, int]:
+        """
+        Indexa os ficheiros diários novos ou alterados (pelo mtime) e remove os que desapareceram
+        """
+        indexados = {nome: mtime for nome, mtime in self.conn.execute("SELECT nome, mtime FROM ficheiros")}
+        atuais = listar_ficheiros_data(self.data_dir)
+        novos = removidos = 0
+        with self.conn:
+            for filename in set(indexados) - set(atuais):
+                self.conn.execute("DELETE FROM registos WHERE ficheiro = ?", (filename,))
+                self.conn.execute("DELETE FROM ficheiros WHERE nome = ?", (filename,))
+                removidos += 1
+            for filename in atuais:
+                mtime = os.path.getmtime(os.path.join(self.data_dir, filename))
+                if reconstruir or indexados.get(filename) != mtime:
+                    self._indexar_ficheiro(filename, mtime)
+                    novos += 1
+        if novos or removidos:
+            print(f"Índice histórico: {novos} ficheiros indexados, {removidos} removidos")
+        return {'indexados': novos, 'removidos': removidos}
+
+    def procurar(self, nipc: Optional[str] = None, entidade: Optional[str] = None,
+                 distrito: Optional[str] = None, concelho: Optional[str] = None,
+                 plataforma: Optional[str] = None, desde: Optional[str] = None,
+                 ate: Optional[str] = None, limite: Optional[int] = None) -> List[Dict]:
+        """
+        Procedimentos que correspondem a todos os filtros (sem distinguir maiúsculas),
+        do mais recente para o mais antigo, um por link (o do ficheiro diário mais recente).
+        desde/ate: datas de publicação AAAA-MM-DD.
+        """
+        filtros = {'nipc': nipc, 'entidade': entidade, 'distrito': distrito,
+                   'concelho': concelho, 'plataforma': plataforma}
+        condicoes, parametros = [], []
+        for coluna, valor in filtros.items():
+            if valor:
+                condicoes.append(f"{coluna} = ?")
+                parametros.append(normalizar(valor))
+        if desde:
+            condicoes.append("data_publicacao >= ?")
+            parametros.append(desde)
+        if ate:
+            condicoes.append("data_publicacao <= ?")
+            parametros.append(ate)
+
+        # Registos sem link não são agrupados
+        sql = ("SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY COALESCE(link, ficheiro || '#' || posicao) "
+               "ORDER BY data_ficheiro DESC) AS copia FROM registos")
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += ") WHERE copia = 1 ORDER BY data_publicacao DESC, data_ficheiro DESC, posicao"
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        return [{coluna: row[coluna] for coluna in row.keys() if coluna != 'copia'}
+                for row in self.conn.execute(sql, parametros)]
+
+    def carregar_registos(self, resultados: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Registos completos dos resultados de procurar, lendo cada ficheiro uma única vez:
+        nos snapshots só as linhas dos resultados são descodificadas (pelo deslocamento)
+        """
+        por_ficheiro = defaultdict(list)
+        for resultado in resultados:
+            por_ficheiro[resultado['ficheiro']].append(resultado)
+
+        registos = {}
+        for ficheiro, do_ficheiro in por_ficheiro.items():
+            filepath = os.path.join(self.data_dir, ficheiro)
+            if all(r['deslocamento'] is not None for r in do_ficheiro):
+                lidos = ler_procedimentos_em(filepath, (r['deslocamento'] for r in do_ficheiro))
+                for r in do_ficheiro:
+                    registos[(ficheiro, r['posicao'])] = lidos.get(r['deslocamento'])
+            else:
+                posicoes = {r['posicao'] for r in do_ficheiro}
+                for posicao, proc in enumerate(iter_procedimentos(filepath)):
+                    if posicao in posicoes:
+                        registos[(ficheiro, posicao)] = proc
+        return [registos.get((r['ficheiro'], r['posicao'])) for r in resultados]
+
+    def carregar_registo(self, resultado: Dict) -> Optional[Dict]:
+        """
+        Registo completo de um resultado de procurar
+        """
+        return self.carregar_registos([resultado])[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice histórico dos procedimentos de data/")
+    parser.add_argument("--data-dir", default="../data")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    atualizar = subparsers.add_parser('atualizar', help="indexar os ficheiros diários novos ou alterados")
+    atualizar.add_argument("--reconstruir", action="store_true", help="reindexar todos os ficheiros")
+
+    procurar = subparsers.add_parser('procurar', help="pesquisar o histórico")
+    for coluna in CAMPOS_INDICE:
+        procurar.add_argument(f"--{coluna}")
+    procurar.add_argument("--desde", metavar="AAAA-MM-DD", help="data de publicação mínima")
+    procurar.add_argument("--ate", metavar="AAAA-MM-DD", help="data de publicação máxima")
+    procurar.add_argument("--limite", type=int)
+    procurar.add_argument("--completo", action="store_true", help="mostrar os registos completos em JSON")
+    args = parser.parse_args()
+
+    with IndiceHistorico(args.data_dir) as indice:
+        indice.atualizar(getattr(args, 'reconstruir', False))
+        if args.comando == 'atualizar':
+            return
+
+        inicio = time.perf_counter()
+        resultados = indice.procurar(args.nipc, args.entidade, args.distrito, args.concelho,
+                                     args.plataforma, args.desde, args.ate, args.limite)
+        duracao = (time.perf_counter() - inicio) * 1000
+
+        if args.completo:
+            registos = indice.carregar_registos(resultados)
+            print(json.dumps(registos, ensure_ascii=False, indent=2))
+        else:
+            for r in resultados:
+                print(f"{r['data_publicacao']}  {r['ficheiro']:<20} {r['nipc'] or '-':<10} "
+                      f"{r['entidade'] or '-'}  {r['link']}")
+        print(f"🔍 {len(resultados)} procedimentos encontrados em {duracao:.1f} ms")
+
+if __name__ == "__main__":
+    main()
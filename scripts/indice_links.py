@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice persistente dos procedimentos já extraídos, indexados pelo link.
+
+Permite ao extrator saber que procedimentos do RSS feed já têm detalhes
+guardados num ficheiro data/DD-MM-YYYY.jsonl.gz (ou no ativos.json) e reaproveitá-los
+em vez de voltar a abrir a página de detalhe.
+
+Guarda também o primeiro ficheiro diário em que cada link apareceu (primeiro_ficheiro),
+que não muda quando o procedimento volta a aparecer em dias seguintes.
+"""
+
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from armazenamento_data import data_do_ficheiro, ler_procedimentos, listar_ficheiros_data
+
+# Versão do formato do indice_links.json: um índice de outra versão é reconstruído
+VERSAO_INDICE_LINKS = 2
+
+class IndiceLinks:
+    def __init__(self, data_dir: str = "../data"):
+        self.data_dir = data_dir
+        self.index_file = os.path.join(data_dir, "indice_links.json")
+        self.ficheiros = []
+        self.links = {}
+        self.primeiro_ficheiro = {}
+        self._cache_ficheiros = {}
+        self.carregar()
+
+    def carregar(self):
+        """Carregar o índice do disco (se existir)"""
+        if not os.path.exists(self.index_file):
+            return
+
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Erro ao carregar {self.index_file}, o índice será reconstruído: {e}")
+            return
+        # Índices antigos não têm primeiro_ficheiro: todos os ficheiros são indexados de novo
+        if dados.get('versao') != VERSAO_INDICE_LINKS:
+            return
+        self.ficheiros = dados.get('ficheiros', [])
+        self.links = dados.get('links', {})
+        self.primeiro_ficheiro = dados.get('primeiro_ficheiro', {})
+
+    def guardar(self):
+        """Guardar o índice no disco"""
+        try:
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump({'versao': VERSAO_INDICE_LINKS, 'ficheiros': self.ficheiros, 'links': self.links,
+                           'primeiro_ficheiro': self.primeiro_ficheiro}, f, ensure_ascii=False)
+            print(f"Índice de links atualizado: {self.index_file} ({len(self.links)} links)")
+        except Exception as e:
+            print(f"Erro ao guardar índice de links: {e}")
+
+    def _ler_ficheiro(self, filename: str) -> List[Dict]:
+        filepath = os.path.join(self.data_dir, filename)
+        try:
+            return ler_procedimentos(filepath)
+        except Exception as e:
+            print(f"Erro ao carregar {filepath}: {e}")
+            return []
+
+    def _carregar_ficheiro(self, filename: str) -> List[Dict]:
+        # Só os ficheiros de onde se reaproveitam registos ficam em memória
+        if filename not in self._cache_ficheiros:
+            self._cache_ficheiros[filename] = self._ler_ficheiro(filename)
+        return self._cache_ficheiros[filename]
+
+    def registar(self, procedimentos: List[Dict], filename: str):
+        """Indexar os procedimentos com detalhes extraídos que estão guardados em filename"""
+        data_ficheiro = data_do_ficheiro(filename)
+        for proc in procedimentos:
+            link = proc.get('link')
+            if link and proc.get('detalhes_completos'):
+                self.links[link] = filename
+            # O primeiro dia só muda para um ficheiro mais antigo (os ficheiros podem ser indexados fora de ordem)
+            if link and data_ficheiro:
+                primeiro = data_do_ficheiro(self.primeiro_ficheiro.get(link) or '')
+                if primeiro is None or data_ficheiro < primeiro:
+                    self.primeiro_ficheiro[link] = filename
+
+        if filename != 'ativos.json' and filename not in self.ficheiros:
+            self.ficheiros.append(filename)
+        # O conteúdo do ficheiro pode ter mudado desde que foi lido
+        self._cache_ficheiros.pop(filename, None)
+
+    def atualizar(self):
+        """Indexar os ficheiros diários que ainda não estão no índice e o ativos.json atual"""
+        # O ativos.json é reescrito todas as execuções: só serve para links sem ficheiro diário
+        ativos_file = os.path.join(self.data_dir, 'ativos.json')
+        ativos = self._ler_ficheiro('ativos.json') if os.path.exists(ativos_file) else []
+        for proc in ativos:
+            if proc.get('link') and proc.get('detalhes_completos'):
+                self.links.setdefault(proc['link'], 'ativos.json')
+
+        novos = [f for f in listar_ficheiros_data(self.data_dir) if f not in self.ficheiros]
+        for filename in novos:
+            self.registar(self._ler_ficheiro(filename), filename)
+
+        if novos:
+            print(f"Índice de links: {len(novos)} ficheiros novos indexados")
+
+    def contem(self, link: str) -> bool:
+        return link in self.links
+
+    def obter_registo(self, link: str) -> Optional[Dict]:
+        """Devolver o registo guardado de um procedimento já extraído"""
+        filename = self.links.get(link)
+        if not filename:
+            return None
+
+        for proc in self._carregar_ficheiro(filename):
+            if proc.get('link') == link and proc.get('detalhes_completos'):
+                return proc
+        return None
+
+    def data_feed(self, link: str) -> date:
+        """Data do feed em que o procedimento apareceu pela primeira vez (hoje se não estiver em nenhum ficheiro diário)"""
+        data_ficheiro = self.data_primeiro_ficheiro(link)
+        return data_ficheiro.date() if data_ficheiro else date.today()
+
+    def data_primeiro_ficheiro(self, link: str) -> Optional[datetime]:
+        """Data do primeiro ficheiro diário em que o link apareceu (None se não estiver em nenhum)"""
+        return data_do_ficheiro(self.primeiro_ficheiro.get(link) or '')
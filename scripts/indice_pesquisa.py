@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de pesquisa da interface web, gravado em data/ativos_pesquisa.json ao lado do
+ativos.json (sempre que este é escrito).
+
+A pesquisa do scripts.js juntava, em cada tecla, os campos de todos os procedimentos
+numa única string e procurava o termo nela. Com este índice:
+- vocabulario/posicoes: índice invertido dos tokens (minúsculas e sem acentos, como a
+  função foldText do scripts.js) dos campos pesquisáveis -> posições no ativos.json,
+  com o vocabulário ordenado para a pesquisa por prefixo ser uma pesquisa binária;
+- ordenacao: para cada coluna da tabela, a posição (rank) de cada procedimento na
+  ordenação ascendente, pelo que ordenar compara inteiros;
+- versao_ativos: versão do ativos.json de que o índice saiu (a página ignora o índice
+  se não corresponder ao que carregou).
+
+Uso:
+    cd scripts
+    python indice_pesquisa.py [--data-dir ../data]
+"""
+
+import argparse
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from normalizacao_datas import (CAMPO_PUBLICACAO_ISO, normalizar_data_publicacao,
+                                prazo_do_procedimento)
+from normalizacao_valores import CAMPO_PRECO_CENTIMOS, normalizar_preco
+
+INDICE_PESQUISA_FILE = 'ativos_pesquisa.json'
+VERSAO_INDICE = 2
+
+# Campos pesquisados pelo filtro de texto da interface web
+CAMPOS_PESQUISA = [
+    'descricao', 'designacao_contrato', 'entidade', 'entidade_adjudicante',
+    'plataforma_eletronica', 'preco_base', 'prazo_apresentacao_propostas', 'nipc',
+    'distrito', 'concelho', 'freguesia', 'site', 'email', 'numero_procedimento',
+    'prazo_execucao', 'fundos_eu', 'autor_nome', 'autor_cargo',
+]
+
+_TOKEN = re.compile(r'[^\W_]+')
+
+def dobrar_texto(texto: str) -> str:
+    """
+    Texto em minúsculas e sem acentos ("Câmara" -> "camara")
+    """
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+def tokens(texto: str) -> List[str]:
+    return _TOKEN.findall(dobrar_texto(texto))
+
+def data_publicacao(proc: Dict) -> Optional[str]:
+    return proc.get(CAMPO_PUBLICACAO_ISO) or normalizar_data_publicacao(proc.get('detalhes_completos'))
+
+def texto_pesquisavel(proc: Dict) -> str:
+    """
+    Campos pesquisáveis de um procedimento, incluindo a data de publicação como é mostrada (DD/MM/AAAA)
+    """
+    publicacao = data_publicacao(proc)
+    campos = [proc.get(campo) or '' for campo in CAMPOS_PESQUISA]
+    campos.append('/'.join(reversed(publicacao.split('-'))) if publicacao else '')
+    return ' '.join(campos)
+
+def _chave_prazo(proc: Dict) -> str:
+    prazo = prazo_do_procedimento(proc)
+    return prazo.strftime('%Y-%m-%dT%H:%M') if prazo else ''
+
+def _chave_preco(proc: Dict) -> int:
+    centimos = proc.get(CAMPO_PRECO_CENTIMOS)
+    if centimos is None:
+        centimos, _ = normalizar_preco(proc.get('preco_base'))
+    return centimos or 0
+
+# Chaves de ordenação de cada coluna (as mesmas de sortProcedimentos no scripts.js)
+CHAVES_ORDENACAO: Dict[str, Callable[[Dict], object]] = {
+    'descricao': lambda proc: (proc.get('descricao') or proc.get('designacao_contrato') or '').lower(),
+    'entidade': lambda proc: (proc.get('entidade') or proc.get('entidade_adjudicante') or '').lower(),
+    'plataforma': lambda proc: (proc.get('plataforma_eletronica') or '').lower(),
+    'publicacao': lambda proc: data_publicacao(proc) or '',
+    'prazo': _chave_prazo,
+    'preco': _chave_preco,
+}
+
+def versao_ativos(procedimentos: List[Dict]) -> str:
+    """
+    Versão do conjunto de ativos: FNV-1a (32 bits, sobre as unidades UTF-16) dos links
+    pela ordem do ativos.json, calculada da mesma forma por activeSetVersion no
+    scripts.js. Os registos de um link não mudam enquanto está ativo, pelo que a
+    versão identifica o conteúdo e o índice só é usado com o ativos.json de que saiu.
+    """
+    dados = '\n'.join(proc.get('link') or '' for proc in procedimentos).encode('utf-16-le')
+    versao = 0x811c9dc5
+    for i in range(0, len(dados), 2):
+        versao ^= dados[i] | (dados[i + 1] << 8)
+        versao = (versao * 0x01000193) & 0xffffffff
+    return f"{versao:08x}"
+
+def ranks(chaves: List) -> List[int]:
+    """
+    Rank de cada chave na ordem ascendente; chaves iguais têm o mesmo rank
+    """
+    rank_por_chave = {chave: rank for rank, chave in enumerate(sorted(set(chaves)))}
+    return [rank_por_chave[chave] for chave in chaves]
+
+def construir_indice_pesquisa(procedimentos: List[Dict]) -> Dict:
+    """
+    Índice invertido dos tokens e ranks de ordenação, por posição no ativos.json
+    """
+    posicoes = defaultdict(list)
+    for posicao, proc in enumerate(procedimentos):
+        for token in set(tokens(texto_pesquisavel(proc))):
+            posicoes[token].append(posicao)
+    vocabulario = sorted(posicoes)
+    return {
+        'versao': VERSAO_INDICE,
+        'total': len(procedimentos),
+        'versao_ativos': versao_ativos(procedimentos),
+        'vocabulario': vocabulario,
+        'posicoes': [posicoes[token] for token in vocabulario],
+        'ordenacao': {coluna: ranks([chave(proc) for proc in procedimentos])
+                      for coluna, chave in CHAVES_ORDENACAO.items()},
+    }
+
+def guardar_indice_pesquisa(procedimentos: List[Dict], data_dir: str) -> Optional[str]:
+    """
+    Escreve o ativos_pesquisa.json correspondente aos procedimentos do ativos.json
+    """
+    indice_file = os.path.join(data_dir, INDICE_PESQUISA_FILE)
+    try:
+        indice = construir_indice_pesquisa(procedimentos)
+        tmp_file = indice_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(indice, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, indice_file)
+    except Exception as e:
+        print(f"Erro ao salvar {INDICE_PESQUISA_FILE}: {e}")
+        return None
+    print(f"🔎 Índice de pesquisa atualizado: {indice_file} ({len(indice['vocabulario'])} tokens)")
+    return indice_file
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de pesquisa do ativos.json para a interface web")
+    parser.add_argument("--data-dir", default="../data")
+    args = parser.parse_args()
+
+    from gerir_ativos import load_existing_ativos
+    guardar_indice_pesquisa(load_existing_ativos(args.data_dir), args.data_dir)
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,21 @@
+import argparse
+import hashlib
+import html
+import io
 import json
-import re
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+from xml.sax.saxutils import XMLGenerator
 import os
 
+from armazenamento_data import ler_procedimentos
+from extracao_campos import extrair_campo, extrair_campos
+
 def extract_field_from_details(details_text: str, field_name: str) -> Optional[str]:
     """
     Extrai um campo específico do texto de detalhes usando regex
     """
-    patterns = {
-        'entidade_adjudicante': r'Designação da entidade adjudicante:\s*(.+?)(?:\n|$)',
-        'nipc': r'NIPC:\s*(\d+)',
-        'distrito': r'Distrito:\s*(.+?)(?:\n|$)',
-        'concelho': r'Concelho:\s*(.+?)(?:\n|$)',
-        'freguesia': r'Freguesia:\s*(.+?)(?:\n|$)',
-        'site': r'Endereço da Entidade \(URL\):\s*(.+?)(?:\n|$)',
-        'email': r'Endereço Eletrónico:\s*(.+?)(?:\n|$)',
-        'designacao_contrato': r'Designação do contrato:\s*(.+?)(?:\n|$)',
-        'descricao': r'Descrição:\s*(.+?)(?:\n|$)',
-        'preco_base': r'Preço base s/IVA:\s*(.+?)(?:\n|$)',
-        'prazo_execucao': r'Prazo de execução do contrato:\s*(.+?)(?:\n|$)',
-        'prazo_apresentacao_propostas': r'Prazo para apresentação das propostas:\s*(.+?)(?:\n|$)',
-        'fundos_eu': r'Têm fundos EU\?\s*(.+?)(?:\n|$)',
-        'plataforma_eletronica': r'Plataforma eletrónica utilizada pela entidade adjudicante:\s*(.+?)(?:\n|$)',
-        'url_procedimento': r'URL para Apresentação:\s*(.+?)(?:\n|$)',
-        'autor_nome': r'28 - IDENTIFICAÇÃO DO\(S\) AUTOR\(ES\) DE ANÚNCIO\nNome:\s*(.+?)(?:\n|$)',
-        'autor_cargo': r'Cargo:\s*(.+?)(?:\n|$)'
-    }
-    
-    if field_name not in patterns:
-        return None
-    
-    pattern = patterns[field_name]
-    match = re.search(pattern, details_text, re.MULTILINE | re.DOTALL)
-    
-    if match:
-        value = match.group(1).strip()
-        # Limpar quebras de linha e espaços extras
-        value = re.sub(r'\s+', ' ', value)
-        # Remover caracteres especiais HTML
-        value = value.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
-        return value
-    
-    return None
+    return extrair_campo(details_text, field_name, desescapar_html=True)
 
 def parse_procedimento(proc: Dict) -> Dict:
     """
@@ -82,18 +53,11 @@ def parse_procedimento(proc: Dict) -> Dict:
             'autor_cargo': proc.get('autor_cargo', 'N/A')
         }
     
-    # Extrair informações específicas do texto de detalhes
-    extracted_info = {}
-    fields = [
-        'entidade_adjudicante', 'nipc', 'distrito', 'concelho', 'freguesia',
-        'site', 'email', 'designacao_contrato', 'descricao', 'preco_base',
-        'prazo_execucao', 'prazo_apresentacao_propostas', 'fundos_eu', 'plataforma_eletronica', 'url_procedimento',
-        'autor_nome', 'autor_cargo'
-    ]
-    
-    for field in fields:
-        value = extract_field_from_details(detalhes_text, field)
-        extracted_info[field] = value if value else 'N/A'
+    # Extrair informações específicas do texto de detalhes (todos os campos de uma vez)
+    extracted_info = {
+        field: value if value else 'N/A'
+        for field, value in extrair_campos(detalhes_text, desescapar_html=True).items()
+    }
     
     return {
         'numero_procedimento': numero,
@@ -102,98 +66,328 @@ def parse_procedimento(proc: Dict) -> Dict:
         **extracted_info
     }
 
-def create_rss_feed(procedimentos: List[Dict]) -> str:
+# Informações do canal
+CANAL_TITULO = 'Feed RSS - Procedimentos DRE'
+CANAL_DESCRICAO = 'Feed RSS com procedimentos do Diário da República - Série II - Parte L'
+CANAL_LINK = 'https://joaodamiao.github.io/RSS-DRE/'
+CANAL_FEED = 'https://joaodamiao.github.io/RSS-DRE/feed_rss_procedimentos.xml'
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+# Feed History (RFC 5005), usado nas páginas de arquivo
+FH_NS = 'http://purl.org/syndication/history/1.0'
+
+# Cache dos itens já renderizados, guardada ao lado do feed
+CACHE_ITENS_FILE = 'cache_itens_rss.json'
+# Incrementar sempre que o formato dos itens mudar, para invalidar a cache
+CACHE_ITENS_VERSAO = 1
+
+def formatar_data_rss(data: Optional[datetime] = None) -> str:
     """
-    Cria um feed RSS a partir dos procedimentos processados
+    Data no formato RFC 822 usado pelo RSS (com fuso horário)
     """
-    # Criar elemento raiz do RSS
-    rss = ET.Element('rss', version='2.0')
-    rss.set('xmlns:atom', 'http://www.w3.org/2005/Atom')
-    
-    # Criar canal
-    channel = ET.SubElement(rss, 'channel')
-    
-    # Informações do canal
-    title = ET.SubElement(channel, 'title')
-    title.text = 'Feed RSS - Procedimentos DRE'
-    
-    description = ET.SubElement(channel, 'description')
-    description.text = 'Feed RSS com procedimentos do Diário da República - Série II - Parte L'
-    
-    link = ET.SubElement(channel, 'link')
-    link.text = 'https://joaodamiao.github.io/RSS-DRE/'
-    
-    # Link atom para auto-descoberta
-    atom_link = ET.SubElement(channel, '{http://www.w3.org/2005/Atom}link')
-    atom_link.set('href', 'https://joaodamiao.github.io/RSS-DRE/feed_rss_procedimentos.xml')
-    atom_link.set('rel', 'self')
-    atom_link.set('type', 'application/rss+xml')
-    
-    language = ET.SubElement(channel, 'language')
-    language.text = 'pt-PT'
-    
-    pub_date = ET.SubElement(channel, 'lastBuildDate')
-    pub_date.text = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
+    data = (data or datetime.now()).astimezone()
+    return data.strftime('%a, %d %b %Y %H:%M:%S %z')
+
+def descricao_html(proc: Dict) -> str:
+    """
+    Tabela HTML da descrição de um item; os valores são escapados para HTML
+    (o texto resultante é depois escapado outra vez como texto XML ao ser escrito)
+    """
+    def campo(nome: str, omissao: str = 'N/A') -> str:
+        return html.escape(str(proc.get(nome, omissao)))
     
-    # Adicionar cada procedimento como item
-    for i, proc in enumerate(procedimentos):
-        item = ET.SubElement(channel, 'item')
-        
-        # Título do item
-        item_title = ET.SubElement(item, 'title')
-        item_title.text = f"Procedimento {i+1}: {proc.get('designacao_contrato', proc.get('entidade', 'N/A'))}"
-        
-        # Link do item
-        item_link = ET.SubElement(item, 'link')
-        item_link.text = proc.get('link', '')
-        
-        # GUID
-        guid = ET.SubElement(item, 'guid')
-        guid.text = proc.get('link', f"proc_{proc.get('numero_procedimento', i)}")
-        guid.set('isPermaLink', 'true')
-        
-        # Data de publicação (usar data atual)
-        pub_date_item = ET.SubElement(item, 'pubDate')
-        pub_date_item.text = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
-        
-        # Descrição detalhada - apenas as informações específicas pedidas
-        description_text = f"""
+    return f"""
         <h3>Informações do Procedimento</h3>
         <table border="1" cellpadding="5" cellspacing="0" style="border-collapse: collapse; width: 100%;">
-            <tr><td><strong>Entidade Adjudicante:</strong></td><td>{proc.get('entidade_adjudicante', proc.get('entidade', 'N/A'))}</td></tr>
-            <tr><td><strong>NIPC:</strong></td><td>{proc.get('nipc', 'N/A')}</td></tr>
-            <tr><td><strong>Distrito:</strong></td><td>{proc.get('distrito', 'N/A')}</td></tr>
-            <tr><td><strong>Concelho:</strong></td><td>{proc.get('concelho', 'N/A')}</td></tr>
-            <tr><td><strong>Freguesia:</strong></td><td>{proc.get('freguesia', 'N/A')}</td></tr>
-            <tr><td><strong>Site:</strong></td><td><a href="{proc.get('site', '')}">{proc.get('site', 'N/A')}</a></td></tr>
-            <tr><td><strong>E-mail:</strong></td><td><a href="mailto:{proc.get('email', '')}">{proc.get('email', 'N/A')}</a></td></tr>
-            <tr><td><strong>Designação do contrato:</strong></td><td>{proc.get('designacao_contrato', 'N/A')}</td></tr>
-            <tr><td><strong>Descrição:</strong></td><td>{proc.get('descricao', 'N/A')}</td></tr>
-            <tr><td><strong>Preço base s/IVA:</strong></td><td>{proc.get('preco_base', 'N/A')}</td></tr>
-            <tr><td><strong>Prazo de execução:</strong></td><td>{proc.get('prazo_execucao', 'N/A')}</td></tr>
-            <tr><td><strong>Prazo para apresentação das propostas:</strong></td><td>{proc.get('prazo_apresentacao_propostas', 'N/A')}</td></tr>
-            <tr><td><strong>Tem fundos EU:</strong></td><td>{proc.get('fundos_eu', 'N/A')}</td></tr>
-            <tr><td><strong>Plataforma eletrónica:</strong></td><td>{proc.get('plataforma_eletronica', 'N/A')}</td></tr>
-            <tr><td><strong>URL procedimento:</strong></td><td><a href="{proc.get('url_procedimento', '')}">{proc.get('url_procedimento', 'N/A')}</a></td></tr>
-            <tr><td><strong>Autor do anúncio - Nome:</strong></td><td>{proc.get('autor_nome', 'N/A')}</td></tr>
-            <tr><td><strong>Autor do anúncio - Cargo:</strong></td><td>{proc.get('autor_cargo', 'N/A')}</td></tr>
+            <tr><td><strong>Entidade Adjudicante:</strong></td><td>{html.escape(str(proc.get('entidade_adjudicante', proc.get('entidade', 'N/A'))))}</td></tr>
+            <tr><td><strong>NIPC:</strong></td><td>{campo('nipc')}</td></tr>
+            <tr><td><strong>Distrito:</strong></td><td>{campo('distrito')}</td></tr>
+            <tr><td><strong>Concelho:</strong></td><td>{campo('concelho')}</td></tr>
+            <tr><td><strong>Freguesia:</strong></td><td>{campo('freguesia')}</td></tr>
+            <tr><td><strong>Site:</strong></td><td><a href="{campo('site', '')}">{campo('site')}</a></td></tr>
+            <tr><td><strong>E-mail:</strong></td><td><a href="mailto:{campo('email', '')}">{campo('email')}</a></td></tr>
+            <tr><td><strong>Designação do contrato:</strong></td><td>{campo('designacao_contrato')}</td></tr>
+            <tr><td><strong>Descrição:</strong></td><td>{campo('descricao')}</td></tr>
+            <tr><td><strong>Preço base s/IVA:</strong></td><td>{campo('preco_base')}</td></tr>
+            <tr><td><strong>Prazo de execução:</strong></td><td>{campo('prazo_execucao')}</td></tr>
+            <tr><td><strong>Prazo para apresentação das propostas:</strong></td><td>{campo('prazo_apresentacao_propostas')}</td></tr>
+            <tr><td><strong>Tem fundos EU:</strong></td><td>{campo('fundos_eu')}</td></tr>
+            <tr><td><strong>Plataforma eletrónica:</strong></td><td>{campo('plataforma_eletronica')}</td></tr>
+            <tr><td><strong>URL procedimento:</strong></td><td><a href="{campo('url_procedimento', '')}">{campo('url_procedimento')}</a></td></tr>
+            <tr><td><strong>Autor do anúncio - Nome:</strong></td><td>{campo('autor_nome')}</td></tr>
+            <tr><td><strong>Autor do anúncio - Cargo:</strong></td><td>{campo('autor_cargo')}</td></tr>
         </table>
         """
+
+class EscritorRSS:
+    """
+    Escreve um feed RSS diretamente num ficheiro, elemento a elemento (XMLGenerator),
+    sem construir a árvore do documento em memória.
+    Com `indentar=True` o resultado fica indentado com dois espaços por nível.
+    """
+
+    def __init__(self, out: TextIO, indentar: bool = True):
+        self._out = out
+        self._xml = XMLGenerator(out, encoding='utf-8', short_empty_elements=True)
+        self.indentar = indentar
+        self._nivel = 0
+
+    def _nova_linha(self):
+        if self.indentar:
+            self._xml.ignorableWhitespace('\n' + '  ' * self._nivel)
+
+    def abrir(self, nome: str, attrs: Optional[Dict[str, str]] = None):
+        self._nova_linha()
+        self._xml.startElement(nome, attrs or {})
+        self._nivel += 1
+
+    def fechar(self, nome: str):
+        self._nivel -= 1
+        self._nova_linha()
+        self._xml.endElement(nome)
+
+    def elemento(self, nome: str, texto: Optional[str] = None, attrs: Optional[Dict[str, str]] = None):
+        self._nova_linha()
+        self._xml.startElement(nome, attrs or {})
+        if texto:
+            # XMLGenerator escapa &, < e >, incluindo o HTML da descrição
+            self._xml.characters(texto)
+        self._xml.endElement(nome)
+
+    def iniciar_feed(self, titulo: str = CANAL_TITULO, descricao: str = CANAL_DESCRICAO,
+                     link: str = CANAL_LINK, links_atom: Optional[List[Dict[str, str]]] = None,
+                     last_build_date: Optional[str] = None, arquivo: bool = False):
+        """
+        Com `arquivo=True` o canal é marcado como documento de arquivo (<fh:archive/>, RFC 5005)
+        """
+        self._xml.startDocument()
+        attrs = {'version': '2.0', 'xmlns:atom': ATOM_NS}
+        if arquivo:
+            attrs['xmlns:fh'] = FH_NS
+        self._xml.startElement('rss', attrs)
+        self._nivel += 1
+        self.abrir('channel')
+        self.elemento('title', titulo)
+        self.elemento('description', descricao)
+        self.elemento('link', link)
+        # Links atom (auto-descoberta e, nos arquivos, navegação entre páginas)
+        for attrs in links_atom or [{'href': CANAL_FEED, 'rel': 'self', 'type': 'application/rss+xml'}]:
+            self.elemento('atom:link', attrs=attrs)
+        if arquivo:
+            self.elemento('fh:archive')
+        self.elemento('language', 'pt-PT')
+        self.elemento('lastBuildDate', last_build_date or formatar_data_rss())
+
+    def _escrever_corpo_item(self, proc: Dict, numero: int, pub_date: str):
+        self.elemento('link', proc.get('link', ''))
+        self.elemento('guid', proc.get('link', f"proc_{proc.get('numero_procedimento', numero - 1)}"), {'isPermaLink': 'true'})
+        self.elemento('pubDate', pub_date)
+        self.elemento('description', descricao_html(proc))
+
+    def renderizar_corpo_item(self, proc: Dict, numero: int, pub_date: str) -> str:
+        """
+        XML de um item sem o título (que depende da posição no feed), para a cache
+        """
+        out = io.StringIO()
+        escritor = EscritorRSS(out, self.indentar)
+        escritor._nivel = self._nivel + 1
+        escritor._escrever_corpo_item(proc, numero, pub_date)
+        return out.getvalue()
+
+    def escrever_item(self, proc: Dict, numero: int, pub_date: Optional[str] = None,
+                      corpo: Optional[str] = None):
+        """
+        Escreve um item; `corpo` é o XML já renderizado por renderizar_corpo_item
+        """
+        self.abrir('item')
+        self.elemento('title', f"Procedimento {numero}: {proc.get('designacao_contrato', proc.get('entidade', 'N/A'))}")
+        if corpo is None:
+            self._escrever_corpo_item(proc, numero, pub_date or formatar_data_rss())
+        else:
+            # O título já foi fechado, pelo que não há nenhuma tag do XMLGenerator pendente
+            self._out.write(corpo)
+        self.fechar('item')
+
+    def terminar_feed(self):
+        self.fechar('channel')
+        self._nivel -= 1
+        self._nova_linha()
+        self._xml.endElement('rss')
+        self._xml.ignorableWhitespace('\n')
+        self._xml.endDocument()
+
+class CacheItensRSS:
+    """
+    Cache persistente dos itens do feed, indexada pelo link, com o hash do conteúdo
+    do procedimento, a pubDate original e o XML renderizado do item (sem o título).
+    Itens sem alterações mantêm a pubDate da primeira publicação, pelo que não
+    aparecem como novos aos leitores do feed.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.itens = self._carregar()
+        self._usados = {}
+        self.reaproveitados = 0
+        self.renderizados = 0
+
+    def _carregar(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.filepath):
+            return {}
+        try:
+            with open(self.filepath, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Erro ao carregar {self.filepath}, os itens serão renderizados de novo: {e}")
+            return {}
+        if dados.get('versao') != CACHE_ITENS_VERSAO:
+            return {}
+        return dados.get('itens', {})
+
+    @staticmethod
+    def hash_conteudo(proc: Dict) -> str:
+        return hashlib.sha1(json.dumps(proc, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def corpo_item(self, escritor: EscritorRSS, proc: Dict, numero: int) -> str:
+        """
+        Devolve o XML do item (sem o título), reaproveitando-o se o conteúdo não mudou
+        """
+        link = proc.get('link', '')
+        chave = f"{link}\n{int(escritor.indentar)}"
+        hash_proc = self.hash_conteudo(proc)
+        registo = self.itens.get(chave)
+        if link and registo and registo['hash'] == hash_proc:
+            self.reaproveitados += 1
+        else:
+            # Item novo ou alterado: nova pubDate
+            registo = {'hash': hash_proc, 'pub_date': formatar_data_rss()}
+            registo['corpo'] = escritor.renderizar_corpo_item(proc, numero, registo['pub_date'])
+            self.renderizados += 1
+        if link:
+            self._usados[chave] = registo
+        return registo['corpo']
+
+    def guardar(self):
+        """Guardar só os itens do feed atual, para a cache não crescer sem limite"""
+        try:
+            os.makedirs(os.path.dirname(self.filepath) or '.', exist_ok=True)
+            tmp_file = self.filepath + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'versao': CACHE_ITENS_VERSAO, 'itens': self._usados}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.filepath)
+        except Exception as e:
+            print(f"Erro ao guardar cache dos itens do feed: {e}")
+
+def escrever_rss_feed(procedimentos: Iterable[Dict], out: TextIO, indentar: bool = True,
+                      cache: Optional[CacheItensRSS] = None):
+    """
+    Escreve o feed RSS dos procedimentos processados em `out`, item a item.
+    Com `cache`, só os itens novos ou alterados são renderizados.
+    """
+    escritor = EscritorRSS(out, indentar)
+    escritor.iniciar_feed()
+    for i, proc in enumerate(procedimentos):
+        corpo = cache.corpo_item(escritor, proc, i + 1) if cache is not None else None
+        escritor.escrever_item(proc, i + 1, corpo=corpo)
+    escritor.terminar_feed()
+
+def create_rss_feed(procedimentos: List[Dict]) -> str:
+    """
+    Cria um feed RSS a partir dos procedimentos processados
+    """
+    out = io.StringIO()
+    escrever_rss_feed(procedimentos, out)
+    return out.getvalue()
+
+def calcular_estatisticas(procedimentos_processados: List[Dict]) -> Dict[str, int]:
+    """
+    Contagens de campos preenchidos nos procedimentos processados
+    """
+    return {
+        'total': len(procedimentos_processados),
+        'com_entidade': len([p for p in procedimentos_processados if p.get('entidade') != 'N/A']),
+        'com_nipc': len([p for p in procedimentos_processados if p.get('nipc') != 'N/A']),
+        'com_preco': len([p for p in procedimentos_processados if p.get('preco_base') != 'N/A']),
+        'com_fundos_eu': len([p for p in procedimentos_processados if p.get('fundos_eu') and p.get('fundos_eu') != 'N/A']),
+    }
+
+def mostrar_estatisticas(estatisticas: Dict[str, int], titulo: str = "Estatísticas:"):
+    print(f"\n{titulo}")
+    print(f"- Procedimentos com entidade: {estatisticas['com_entidade']}")
+    print(f"- Procedimentos com NIPC: {estatisticas['com_nipc']}")
+    print(f"- Procedimentos com preço: {estatisticas['com_preco']}")
+    print(f"- Procedimentos com fundos EU: {estatisticas['com_fundos_eu']}")
+    if 'itens_reaproveitados' in estatisticas:
+        print(f"- Itens do feed reaproveitados da cache: {estatisticas['itens_reaproveitados']} "
+              f"(renderizados: {estatisticas['itens_renderizados']})")
+
+def converter_procedimentos(dados: List[Dict], output_file: Optional[str] = None,
+                            mostrar_progresso: bool = False, usar_cache: bool = True) -> Tuple[str, Dict[str, int]]:
+    """
+    Converte a lista de procedimentos (já em memória) num feed RSS.
+    Se output_file for indicado o feed é escrito diretamente no ficheiro e o XML devolvido é
+    None; caso contrário é devolvido o XML. Devolve também as estatísticas.
+    Ao escrever em output_file, os itens que não mudaram desde a última execução são
+    reaproveitados da cache (CACHE_ITENS_FILE, no diretório do feed) com a pubDate original.
+    """
+    # Processar cada procedimento
+    procedimentos_processados = []
+    for i, proc in enumerate(dados):
+        if mostrar_progresso:
+            print(f"Processando procedimento {i+1}/{len(dados)}...")
+        proc_processado = parse_procedimento(proc)
+        procedimentos_processados.append(proc_processado)
         
-        item_description = ET.SubElement(item, 'description')
-        item_description.text = description_text
+        # Mostrar exemplo do primeiro procedimento
+        if i == 0 and mostrar_progresso:
+            print(f"  Exemplo - Entidade: {proc_processado.get('entidade', 'N/A')}")
+            print(f"  Exemplo - NIPC: {proc_processado.get('nipc', 'N/A')}")
+            print(f"  Exemplo - Preço: {proc_processado.get('preco_base', 'N/A')}")
+    
+    rss_content = None
+    estatisticas = calcular_estatisticas(procedimentos_processados)
+    if output_file:
+        # Garantir que o diretório existe
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        cache = None
+        if usar_cache:
+            cache = CacheItensRSS(os.path.join(os.path.dirname(output_file), CACHE_ITENS_FILE))
+        
+        # Escrever num ficheiro temporário para não deixar o feed publicado a meio
+        tmp_file = output_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            escrever_rss_feed(procedimentos_processados, f, cache=cache)
+        os.replace(tmp_file, output_file)
+        
+        if cache is not None:
+            cache.guardar()
+            estatisticas['itens_reaproveitados'] = cache.reaproveitados
+            estatisticas['itens_renderizados'] = cache.renderizados
+    else:
+        rss_content = create_rss_feed(procedimentos_processados)
     
-    # Converter para string XML formatada
-    rough_string = ET.tostring(rss, encoding='unicode')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ")
+    return rss_content, estatisticas
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Lê as opções da linha de comandos
+    """
+    parser = argparse.ArgumentParser(description="Converte procedimentos_completos.json num feed RSS")
+    parser.add_argument("--entrada", default='../RSS/procedimentos_completos.json',
+                        help="ficheiro JSON com os procedimentos")
+    parser.add_argument("--saida", default='../RSS/feed_rss_procedimentos.xml',
+                        help="ficheiro do feed RSS a gerar")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="renderizar todos os itens de novo, com a data atual")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
     """
     Função principal
     """
+    args = parse_args(argv)
+    
     # Carregar dados do JSON
-    json_file = '../RSS/procedimentos_completos.json'
+    json_file = args.entrada
     
     if not os.path.exists(json_file):
         print(f"❌ Arquivo {json_file} não encontrado!")
@@ -201,49 +395,22 @@ def main():
         return
     
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            dados = json.load(f)
+        dados = ler_procedimentos(json_file)
     except Exception as e:
         print(f"❌ Erro ao carregar {json_file}: {e}")
         return
     
     print(f"Carregados {len(dados)} procedimentos do JSON")
     
-    # Processar cada procedimento
-    procedimentos_processados = []
-    for i, proc in enumerate(dados):
-        print(f"Processando procedimento {i+1}/{len(dados)}...")
-        proc_processado = parse_procedimento(proc)
-        procedimentos_processados.append(proc_processado)
-        
-        # Mostrar exemplo do primeiro procedimento
-        if i == 0:
-            print(f"  Exemplo - Entidade: {proc_processado.get('entidade', 'N/A')}")
-            print(f"  Exemplo - NIPC: {proc_processado.get('nipc', 'N/A')}")
-            print(f"  Exemplo - Preço: {proc_processado.get('preco_base', 'N/A')}")
-    
-    # Criar feed RSS
-    print("\nCriando feed RSS...")
-    rss_content = create_rss_feed(procedimentos_processados)
-    
-    # Salvar feed RSS
-    output_file = '../RSS/feed_rss_procedimentos.xml'
+    # Criar e salvar feed RSS
+    output_file = args.saida
     try:
-        # Garantir que o diretório existe
-        os.makedirs('../RSS', exist_ok=True)
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(rss_content)
+        _, estatisticas = converter_procedimentos(dados, output_file, mostrar_progresso=True,
+                                                  usar_cache=not args.sem_cache)
         
         print(f"Feed RSS criado com sucesso: {output_file}")
-        print(f"Total de procedimentos processados: {len(procedimentos_processados)}")
-        
-        # Estatísticas
-        print("\nEstatísticas:")
-        print(f"- Procedimentos com entidade: {len([p for p in procedimentos_processados if p.get('entidade') != 'N/A'])}")
-        print(f"- Procedimentos com NIPC: {len([p for p in procedimentos_processados if p.get('nipc') != 'N/A'])}")
-        print(f"- Procedimentos com preço: {len([p for p in procedimentos_processados if p.get('preco_base') != 'N/A'])}")
-        print(f"- Procedimentos com fundos EU: {len([p for p in procedimentos_processados if p.get('fundos_eu') and p.get('fundos_eu') != 'N/A'])}")
+        print(f"Total de procedimentos processados: {estatisticas['total']}")
+        mostrar_estatisticas(estatisticas)
         
     except Exception as e:
         print(f"❌ Erro ao salvar feed RSS: {e}")
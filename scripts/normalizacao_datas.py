@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Normalização das datas dos procedimentos para ISO 8601.
+
+- prazo_apresentacao_propostas -> prazo_apresentacao_propostas_iso (AAAA-MM-DDTHH:MM)
+- "Data de Envio do Anúncio" em detalhes_completos -> data_publicacao_iso (AAAA-MM-DD)
+
+O formato dominante ("13-08-2025 17:30") é testado primeiro, com uma expressão regular
+ancorada, e todos os resultados ficam em cache (os mesmos prazos repetem-se em muitos
+procedimentos). Os restantes formatos encontrados em data/:
+- datas sem hora ("25-08-2025", "25/08/2025"): o prazo termina às 23:59 desse dia;
+- prazos relativos ("21 dias a partir da data do envio do presente anúncio, até às
+  23 horas e 59 minutos", "até às 23:59 do 45.º dia ..."): contados a partir da data de
+  publicação (ou do dia em que o procedimento apareceu no feed), às 23:59 se não
+  indicarem a hora;
+- prazo ausente do campo mas presente em detalhes_completos com a etiqueta
+  "Prazo de apresentação das propostas:".
+
+Os registos gravados levam os campos *_iso, pelo que quem os lê (gerir_ativos,
+base_ativos, scripts.js) não volta a fazer parse das datas.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Optional
+
+CAMPO_PRAZO_ISO = 'prazo_apresentacao_propostas_iso'
+CAMPO_PUBLICACAO_ISO = 'data_publicacao_iso'
+
+# Hora usada nos prazos sem hora: o prazo termina no fim do dia
+HORA_FIM_DO_DIA = '23:59'
+
+_FORMATO_DOMINANTE = re.compile(r'^(\d{2})-(\d{2})-(\d{4}) (\d{2}):(\d{2})$')
+_DATA = re.compile(r'(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})')
+_DATA_ISO = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+# Minutos opcionais depois de "h"/"horas" ("17h", "17 horas" -> 17:00); depois de ":" são obrigatórios
+_HORA = re.compile(r'(?<!\d)([01]?\d|2[0-3])\s*(?::\s*(?=\d{2})|h(?![^\W\d])\s*|horas(?:\s+e)?\s*)(\d{2})?', re.IGNORECASE)
+_DIAS = re.compile(r'(\d+)\s*\.?\s*º?\s*dias?\b', re.IGNORECASE)
+_DATA_ENVIO = re.compile(r'Data de Envio do Anúncio:\s*(\d{1,2})-(\d{1,2})-(\d{4})')
+_ETIQUETA_PRAZO = re.compile(r'Prazo (?:para|de) (?:a )?apresentação das propostas:[ \t]*(\S[^\n]*)', re.IGNORECASE)
+
+def _iso(ano: int, mes: int, dia: int, hora: str = HORA_FIM_DO_DIA) -> Optional[str]:
+    try:
+        horas, minutos = map(int, hora.split(':'))
+        return datetime(ano, mes, dia, horas, minutos).strftime('%Y-%m-%dT%H:%M')
+    except ValueError:
+        return None
+
+def _sem(texto: str, match: re.Match) -> str:
+    # A hora pode vir antes ou depois da data ("17:30 do dia 13-08-2025")
+    return texto[:match.start()] + ' ' + texto[match.end():]
+
+def _hora(texto: str) -> str:
+    match = _HORA.search(texto)
+    return f"{int(match.group(1)):02d}:{match.group(2) or '00'}" if match else HORA_FIM_DO_DIA
+
+@lru_cache(maxsize=65536)
+def normalizar_prazo(texto: Optional[str], referencia: Optional[str] = None) -> Optional[str]:
+    """
+    Prazo em AAAA-MM-DDTHH:MM (ou None se não for reconhecido).
+    referencia: data de publicação (AAAA-MM-DD), usada nos prazos em dias.
+    """
+    if not texto or texto == 'N/A':
+        return None
+
+    match = _FORMATO_DOMINANTE.match(texto)
+    if match:
+        dia, mes, ano, horas, minutos = match.groups()
+        return _iso(int(ano), int(mes), int(dia), f"{horas}:{minutos}")
+
+    match = _DATA.search(texto)
+    if match:
+        dia, mes, ano = map(int, match.groups())
+        return _iso(ano, mes, dia, _hora(_sem(texto, match)))
+
+    match = _DATA_ISO.search(texto)
+    if match:
+        ano, mes, dia = map(int, match.groups())
+        return _iso(ano, mes, dia, _hora(_sem(texto, match)))
+
+    # Dias úteis dependem dos feriados: não são convertidos
+    match = _DIAS.search(texto)
+    if match and referencia and 'úteis' not in texto.lower():
+        prazo = date.fromisoformat(referencia) + timedelta(days=int(match.group(1)))
+        return _iso(prazo.year, prazo.month, prazo.day, _hora(texto))
+
+    return None
+
+def normalizar_data_publicacao(detalhes_completos: Optional[str]) -> Optional[str]:
+    """
+    "Data de Envio do Anúncio" em AAAA-MM-DD (ou None)
+    """
+    if not detalhes_completos:
+        return None
+    match = _DATA_ENVIO.search(detalhes_completos)
+    if not match:
+        return None
+    dia, mes, ano = map(int, match.groups())
+    try:
+        return date(ano, mes, dia).isoformat()
+    except ValueError:
+        return None
+
+def texto_prazo(proc: Dict) -> Optional[str]:
+    """
+    Texto do prazo: o campo extraído ou, se faltar, a linha equivalente de detalhes_completos
+    """
+    prazo = proc.get('prazo_apresentacao_propostas')
+    if prazo and prazo != 'N/A':
+        return prazo
+    match = _ETIQUETA_PRAZO.search(proc.get('detalhes_completos') or '')
+    return match.group(1).strip() if match else None
+
+def normalizar_datas_procedimento(proc: Dict, data_feed: Optional[date] = None) -> Dict:
+    """
+    Procedimento com os campos data_publicacao_iso e prazo_apresentacao_propostas_iso.
+    data_feed: dia em que o procedimento apareceu no feed, referência dos prazos em dias
+    quando detalhes_completos não tem a data de envio do anúncio.
+    """
+    publicacao = normalizar_data_publicacao(proc.get('detalhes_completos'))
+    referencia = publicacao or (data_feed.isoformat() if data_feed else None)
+    return {**proc,
+            CAMPO_PUBLICACAO_ISO: publicacao,
+            CAMPO_PRAZO_ISO: normalizar_prazo(texto_prazo(proc), referencia)}
+
+def prazo_do_procedimento(proc: Dict) -> Optional[datetime]:
+    """
+    Prazo de um procedimento como datetime: o valor ISO gravado ou, nos registos
+    antigos sem esse campo, o resultado da normalização
+    """
+    if CAMPO_PRAZO_ISO in proc:
+        prazo = proc[CAMPO_PRAZO_ISO]
+    else:
+        prazo = normalizar_datas_procedimento(proc)[CAMPO_PRAZO_ISO]
+    return datetime.fromisoformat(prazo) if prazo else None
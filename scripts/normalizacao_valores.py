@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Valores numéricos do preço base e do prazo de execução, gravados ao lado do texto.
+
+- preco_base ("116.242,68 EUR") -> preco_base_centimos (11624268) e preco_base_moeda ("EUR")
+- prazo_execucao ("90 DIAS", "120 MESES", "1 ANOS") -> prazo_execucao_dias (1 mês = 30 dias,
+  1 ano = 365 dias)
+
+Com preco_base_centimos a ordenação por preço (scripts.js e indice_pesquisa.py) compara
+inteiros em vez de voltar a limpar o texto em cada comparação; os restantes campos ficam
+gravados em data/ para quem lê os ficheiros. Os procedimentos de um dia são normalizados
+em lote: cada texto distinto é convertido uma única vez.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CAMPO_PRECO_CENTIMOS = 'preco_base_centimos'
+CAMPO_PRECO_MOEDA = 'preco_base_moeda'
+CAMPO_PRAZO_EXECUCAO_DIAS = 'prazo_execucao_dias'
+
+DIAS_POR_UNIDADE = {'dia': 1, 'semana': 7, 'mes': 30, 'mês': 30, 'ano': 365}
+
+MOEDAS = {'EUR': 'EUR', '€': 'EUR', 'USD': 'USD', '$': 'USD', 'GBP': 'GBP', '£': 'GBP', 'CHF': 'CHF'}
+
+# Valores no formato português (separador de milhares '.' e decimal ','), com a moeda antes
+# ou depois; os seguidos de '%' (taxas, como o IVA) são percentagens
+_MOEDA = '|'.join(re.escape(moeda) for moeda in MOEDAS)
+_PRECO = re.compile(rf'(?:({_MOEDA})\s*)?(?<![\d.,])(\d{{1,3}}(?:\.\d{{3}})+|\d+)(?:,(\d{{1,2}}))?'
+                    rf'(?:\s*(%)|\s*({_MOEDA})(?![A-Za-z]))?')
+_PRAZO_EXECUCAO = re.compile(r'(\d+)\s*(dia|semana|m[eê]s|ano)', re.IGNORECASE)
+
+@lru_cache(maxsize=8192)
+def normalizar_preco(texto: Optional[str]) -> Tuple[Optional[int], Optional[str]]:
+    """
+    (cêntimos, moeda) de um preço base; (None, None) se não for reconhecido.
+    Num texto com vários valores ("Lote 2: 15.000,00 EUR", "IVA 23%, 12.500 €") conta o
+    maior dos que têm moeda ou, se nenhum tiver, o maior dos que não são percentagens.
+    """
+    if not texto or texto == 'N/A':
+        return None, None
+    valores = []
+    for match in _PRECO.finditer(texto):
+        moeda_antes, inteiros, decimais, percentagem, moeda_depois = match.groups()
+        if percentagem:
+            continue
+        centimos = int(inteiros.replace('.', '')) * 100 + int((decimais or '0').ljust(2, '0'))
+        moeda = moeda_antes or moeda_depois
+        valores.append((moeda is not None, centimos, MOEDAS.get(moeda, 'EUR')))
+    if not valores:
+        return None, None
+    _, centimos, moeda = max(valores, key=lambda valor: valor[:2])
+    return centimos, moeda
+
+@lru_cache(maxsize=1024)
+def normalizar_prazo_execucao(texto: Optional[str]) -> Optional[int]:
+    """
+    Prazo de execução em dias; None se não for reconhecido
+    """
+    if not texto or texto == 'N/A':
+        return None
+    match = _PRAZO_EXECUCAO.search(texto)
+    if not match:
+        return None
+    unidade = match.group(2).lower()
+    return int(match.group(1)) * DIAS_POR_UNIDADE['mes' if unidade.startswith('m') else unidade]
+
+def normalizar_valores_procedimento(proc: Dict) -> Dict:
+    """
+    Procedimento com preco_base_centimos, preco_base_moeda e prazo_execucao_dias
+    """
+    centimos, moeda = normalizar_preco(proc.get('preco_base'))
+    return {**proc,
+            CAMPO_PRECO_CENTIMOS: centimos,
+            CAMPO_PRECO_MOEDA: moeda,
+            CAMPO_PRAZO_EXECUCAO_DIAS: normalizar_prazo_execucao(proc.get('prazo_execucao'))}
+
+def normalizar_valores_lote(procedimentos: Iterable[Dict]) -> List[Dict]:
+    """
+    Normaliza os procedimentos de um dia: converte cada preço e prazo distinto uma vez
+    e atribui os resultados a todos os procedimentos
+    """
+    procedimentos = list(procedimentos)
+    precos = {texto: normalizar_preco(texto) for texto in {proc.get('preco_base') for proc in procedimentos}}
+    prazos = {texto: normalizar_prazo_execucao(texto)
+              for texto in {proc.get('prazo_execucao') for proc in procedimentos}}
+    return [{**proc,
+             CAMPO_PRECO_CENTIMOS: precos[proc.get('preco_base')][0],
+             CAMPO_PRECO_MOEDA: precos[proc.get('preco_base')][1],
+             CAMPO_PRAZO_EXECUCAO_DIAS: prazos[proc.get('prazo_execucao')]}
+            for proc in procedimentos]
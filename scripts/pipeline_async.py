@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orquestrador asyncio do extrator: as etapas do processo correm em simultâneo, ligadas
+por filas limitadas, em vez de uma a seguir à outra.
+
+    feed ──► fila_detalhes ──► detalhes (N workers) ──► fila_saida ──► escrita
+      └──────────── procedimentos reaproveitados de data/ ─────────────┘
+
+- feed: lê os procedimentos do feed à medida que é descarregado (iter_rss_items)
+  e escreve procedimentos_basicos.json;
+- detalhes: obtém e extrai as páginas de detalhe (o trabalho bloqueante corre em threads);
+- escrita: repõe a ordem do feed e escreve procedimentos_completos.json e
+  data/DD-MM-YYYY.jsonl.gz à medida que os procedimentos chegam.
+
+Só o ativos.json e o feed RSS, que precisam de todos os procedimentos, são gerados no fim.
+Cada etapa regista os procedimentos processados, o débito e a profundidade da sua fila
+de entrada. As filas limitadas fazem com que uma etapa lenta trave as anteriores em vez
+de acumular trabalho em memória.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from armazenamento_data import EscritorSnapshot, e_snapshot
+from arquivo_feed import atualizar_arquivo_feed
+from feeds_seeds import gerar_feeds_seeds
+from indice_links import IndiceLinks
+from normalizacao_datas import normalizar_datas_procedimento
+from normalizacao_valores import normalizar_valores_procedimento
+from rss_dre_extractor import (FallbackBackend, HostRateLimiter, atualizar_ativos, caminho_ficheiro_data,
+                               cronometrar_iteracao, cronometro, extrair_detalhes_item, gerar_feed_rss,
+                               mostrar_estatisticas_backends, mostrar_ficheiros_gerados)
+
+# Capacidade de cada fila entre etapas
+TAMANHO_FILA = 32
+
+_FIM = None
+
+class EstatisticasEtapa:
+    """
+    Débito de uma etapa e profundidade da sua fila de entrada
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.processados = 0
+        self.inicio = None
+        self.fim = None
+        self.profundidades = []
+
+    def observar_fila(self, fila: asyncio.Queue):
+        self.profundidades.append(fila.qsize())
+
+    def registar(self):
+        agora = time.perf_counter()
+        if self.inicio is None:
+            self.inicio = agora
+        self.fim = agora
+        self.processados += 1
+
+    def resumo(self) -> Dict:
+        duracao = (self.fim - self.inicio) if self.inicio is not None else 0.0
+        return {
+            'etapa': self.nome,
+            'processados': self.processados,
+            'duracao': round(duracao, 3),
+            'por_segundo': round(self.processados / duracao, 1) if duracao > 0 else None,
+            'fila_media': round(sum(self.profundidades) / len(self.profundidades), 1) if self.profundidades else 0,
+            'fila_max': max(self.profundidades, default=0),
+        }
+
+def mostrar_estatisticas_etapas(etapas: List[EstatisticasEtapa]):
+    print("\n📈 Etapas do processo:")
+    print(f"  {'etapa':<10}{'procs.':>8}{'duração (s)':>13}{'procs./s':>10}{'fila média':>12}{'fila máx.':>11}")
+    for etapa in etapas:
+        r = etapa.resumo()
+        por_segundo = f"{r['por_segundo']:.1f}" if r['por_segundo'] is not None else '-'
+        print(f"  {r['etapa']:<10}{r['processados']:>8}{r['duracao']:>13.3f}{por_segundo:>10}"
+              f"{r['fila_media']:>12}{r['fila_max']:>11}")
+
+class EscritorJSONIncremental:
+    """
+    Escreve uma lista JSON elemento a elemento, com o mesmo formato de
+    json.dump(..., ensure_ascii=False, indent=2). O ficheiro só substitui o
+    anterior em fechar(), pelo que uma execução interrompida não o deixa truncado.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.tmp_path = filepath + '.tmp'
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        self._f = open(self.tmp_path, 'w', encoding='utf-8')
+        self._f.write('[')
+        self.escritos = 0
+
+    def escrever(self, item: Dict):
+        texto = json.dumps(item, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        self._f.write(('\n  ' if self.escritos == 0 else ',\n  ') + texto)
+        self.escritos += 1
+
+    def fechar(self) -> str:
+        self._f.write('\n]' if self.escritos else ']')
+        self._f.close()
+        os.replace(self.tmp_path, self.filepath)
+        print(f"Dados salvos com sucesso em {self.filepath}")
+        return self.filepath
+
+    def descartar(self):
+        self._f.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+async def executar_pipeline_async(itens: Iterable[Dict[str, str]], backend: FallbackBackend,
+                                  args: argparse.Namespace, rss_dir: str = '../RSS',
+                                  data_dir: str = '../data', tempos: Optional[Dict[str, float]] = None,
+                                  tamanho_fila: int = TAMANHO_FILA) -> Optional[Dict]:
+    """
+    Versão concorrente de rss_dre_extractor.run_pipeline, com o mesmo resultado
+    """
+    loop = asyncio.get_running_loop()
+    indice = IndiceLinks(data_dir)
+    indice.atualizar()
+    limiter = HostRateLimiter(args.intervalo_host, args.max_por_host)
+    workers = max(args.workers, 1)
+
+    fila_detalhes = asyncio.Queue(maxsize=tamanho_fila)
+    fila_saida = asyncio.Queue(maxsize=tamanho_fila)
+    etapas = {nome: EstatisticasEtapa(nome) for nome in ('feed', 'detalhes', 'escrita')}
+
+    # Os .tmp são apagados em qualquer falha (erro do feed, da rede ou de um escritor), para
+    # não ficarem em data/ e RSS/ e entrarem no commit do workflow; depois de fechar() não há .tmp
+    escritores = []
+    try:
+        def novo_escritor(classe, filepath: str):
+            escritor = classe(filepath)
+            escritores.append(escritor)
+            return escritor
+
+        basicos = novo_escritor(EscritorJSONIncremental, os.path.join(rss_dir, 'procedimentos_basicos.json'))
+        completos = novo_escritor(EscritorJSONIncremental, os.path.join(rss_dir, 'procedimentos_completos.json'))
+        caminho_do_dia = caminho_ficheiro_data(data_dir, args.formato_data)
+        do_dia = novo_escritor(EscritorSnapshot if e_snapshot(caminho_do_dia) else EscritorJSONIncremental,
+                               caminho_do_dia)
+        procedimentos_completos = []
+        reaproveitados = set()
+
+        async def ler_feed(executor_feed: ThreadPoolExecutor):
+            iterador = cronometrar_iteracao(itens, tempos, 'parse_rss')
+            i = 0
+            while True:
+                # Descarregar e fazer parse do feed não bloqueia o ciclo de eventos
+                item = await loop.run_in_executor(executor_feed, next, iterador, _FIM)
+                if item is _FIM:
+                    break
+                basicos.escrever(item)
+                registo = None if args.force else indice.obter_registo(item['link'])
+                etapas['feed'].registar()
+                if registo:
+                    reaproveitados.add(item['link'])
+                    await fila_saida.put((i, normalizar_datas_procedimento(registo, indice.data_feed(item['link']))))
+                else:
+                    await fila_detalhes.put((i, item))
+                i += 1
+            for _ in range(workers):
+                await fila_detalhes.put(_FIM)
+
+        async def extrair(executor_detalhes: ThreadPoolExecutor):
+            while True:
+                etapas['detalhes'].observar_fila(fila_detalhes)
+                entrada = await fila_detalhes.get()
+                if entrada is _FIM:
+                    return
+                i, item = entrada
+                proc = await loop.run_in_executor(executor_detalhes, extrair_detalhes_item,
+                                                  item, backend.fetch, limiter, str(i + 1))
+                etapas['detalhes'].registar()
+                await fila_saida.put((i, proc))
+
+        async def escrever():
+            # Os procedimentos chegam fora de ordem: esperar pelos anteriores antes de escrever
+            pendentes = {}
+            while True:
+                etapas['escrita'].observar_fila(fila_saida)
+                entrada = await fila_saida.get()
+                if entrada is _FIM:
+                    return
+                i, proc = entrada
+                pendentes[i] = proc
+                while len(procedimentos_completos) in pendentes:
+                    # Escrita em fluxo: sem o lote do dia, a cache de normalizacao_valores evita conversões repetidas
+                    proc = normalizar_valores_procedimento(pendentes.pop(len(procedimentos_completos)))
+                    completos.escrever(proc)
+                    do_dia.escrever(proc)
+                    procedimentos_completos.append(proc)
+                    etapas['escrita'].registar()
+
+        print(f"Backend: {backend.nome} | Workers em simultâneo: {workers} | Capacidade das filas: {tamanho_fila}")
+        with cronometro(tempos, 'detalhes'), \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='feed') as executor_feed, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix='detalhes') as executor_detalhes:
+            tarefa_escrita = asyncio.create_task(escrever())
+            produtores = [asyncio.create_task(ler_feed(executor_feed))]
+            produtores += [asyncio.create_task(extrair(executor_detalhes)) for _ in range(workers)]
+
+            async def produzir():
+                await asyncio.gather(*produtores)
+                await fila_saida.put(_FIM)
+
+            tarefas = [asyncio.create_task(produzir()), tarefa_escrita]
+            try:
+                # A falha de uma etapa termina o processo: as outras ficariam bloqueadas nas filas
+                await asyncio.wait(tarefas, return_when=asyncio.FIRST_EXCEPTION)
+                for tarefa in tarefas:
+                    if tarefa.done():
+                        tarefa.result()
+            except ET.ParseError as e:
+                print(f"Erro ao fazer parse do XML: {e}")
+                return None
+            except requests.RequestException as e:
+                print(f"Erro ao fazer fetch do RSS feed: {e}")
+                return None
+            finally:
+                for tarefa in produtores + tarefas:
+                    tarefa.cancel()
+
+        if not procedimentos_completos:
+            print("Nenhum dado foi extraído")
+            return None
+
+        with cronometro(tempos, 'guardar_json'):
+            for escritor in escritores:
+                escritor.fechar()
+            data_file_path = do_dia.filepath
+            indice.registar(procedimentos_completos, os.path.basename(data_file_path))
+            indice.guardar()
+    finally:
+        for escritor in escritores:
+            escritor.descartar()
+
+    print(f"Extraídos {len(procedimentos_completos)} procedimentos")
+    print(f"Procedimentos já extraídos anteriormente: {len(reaproveitados)} | "
+          f"extraídos agora: {len(procedimentos_completos) - len(reaproveitados)}")
+    mostrar_estatisticas_backends(backend, args)
+    mostrar_estatisticas_etapas(list(etapas.values()))
+
+    # O ativos.json e o feed RSS precisam do conjunto completo de procedimentos
+    with cronometro(tempos, 'ativos'):
+        atualizar_ativos(data_file_path, data_dir)
+
+    # Feeds filtrados de cada seed, a partir do ativos.json acabado de gravar
+    with cronometro(tempos, 'seeds'):
+        gerar_feeds_seeds(data_dir, rss_dir)
+
+    with cronometro(tempos, 'feed_rss'):
+        estatisticas_feed = gerar_feed_rss(procedimentos_completos, rss_dir)
+
+    # Páginas de arquivo (RFC 5005) das semanas terminadas e documento de subscrição
+    with cronometro(tempos, 'arquivo'):
+        atualizar_arquivo_feed(data_dir, rss_dir)
+
+    mostrar_ficheiros_gerados(len(procedimentos_completos), data_file_path, rss_dir, data_dir)
+
+    return {
+        'procedimentos': len(procedimentos_completos),
+        'reaproveitados': len(reaproveitados),
+        'data_file_path': data_file_path,
+        'feed_rss': estatisticas_feed,
+        'etapas': [etapa.resumo() for etapa in etapas.values()],
+    }
+
+def run_pipeline_async(itens: Iterable[Dict[str, str]], backend: FallbackBackend, args: argparse.Namespace,
+                       rss_dir: str = '../RSS', data_dir: str = '../data',
+                       tempos: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+    """
+    Ponto de entrada síncrono (mesma assinatura de rss_dre_extractor.run_pipeline)
+    """
+    return asyncio.run(executar_pipeline_async(itens, backend, args, rss_dir, data_dir, tempos,
+                                               getattr(args, 'tamanho_fila', TAMANHO_FILA)))
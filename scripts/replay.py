@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modo replay (offline) do extrator: corre o processo completo de rss_dre_extractor.py
+a partir de um feed RSS guardado e das páginas de detalhe guardadas, sem rede nem Chrome.
+
+Um corpus de replay é um diretório com:
+    feed.xml             XML do RSS feed
+    <chave>.html[.gz]    página de detalhe de cada procedimento (chave = chave_captura(link))
+
+Pode ser gravado numa execução real (rss_dre_extractor.py --gravar-replay DIR) ou gerado
+a partir de um ficheiro de data/ com páginas sintéticas (gerar-corpus).
+
+Uso:
+    cd scripts
+    python replay.py gerar-corpus --data-file ../data/01-08-2025.jsonl.gz --corpus ../replay_corpus
+    python replay.py reproduzir --corpus ../replay_corpus [--saida ../replay_saida] [--benchmark N]
+"""
+
+import argparse
+import gzip
+import html
+import json
+import os
+import shutil
+import statistics
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from armazenamento_data import iter_procedimentos
+from capturas_debug import chave_captura
+from rss_dre_extractor import (FEED_REPLAY, TAMANHO_BLOCO_FEED, FallbackBackend, TEXTOS_SECCAO,
+                               cronometro, executar_pipeline, extract_details_from_html,
+                               iter_rss_items, parse_args as parse_args_extrator)
+
+# Conteúdo repetido à volta da secção, para aproximar o tamanho das páginas reais
+_CABECALHO = """<!DOCTYPE html><html lang="pt"><head><meta charset="utf-8">
+<title>Diário da República</title>
+<style>.secao { margin: 0 } .campo { font-weight: bold }</style>
+<script>window.__config = {"versao": "1.0", "pesquisa": "IDENTIFICAÇÃO"};</script>
+</head><body><!-- cabeçalho --><header><nav>{menu}</nav></header>
+<main><div class="OSInline"><div id="conteudo">
+"""
+_MENU = ''.join(f'<a href="/dr/pesquisa/{i}">Item de menu {i}</a>\n' for i in range(300))
+_RODAPE = """</div></div></main><footer><div>{menu}</div>
+<script>var _paq = window._paq || []; _paq.push(['trackPageView']);</script>
+</footer></body></html>"""
+
+# Etapas do processo, pela ordem em que são apresentadas
+# (o parse do feed decorre em simultâneo com a extração e o seu tempo está incluído em 'detalhes')
+ETAPAS = ['parse_rss', 'detalhes', 'guardar_json', 'ativos', 'seeds', 'feed_rss', 'arquivo']
+
+# Ficheiro que marca um diretório de saída criado pelo replay (e que pode por isso ser apagado)
+MARCA_SAIDA = '.replay_saida'
+
+def gerar_pagina_sintetica(detalhes_completos: str) -> str:
+    """
+    Gera uma página HTML cuja secção do procedimento tem o texto detalhes_completos
+    """
+    partes = [_CABECALHO.replace('{menu}', _MENU), '<div class="detalhe">\n']
+    for linha in detalhes_completos.split('\n'):
+        if not linha:
+            partes.append('<!-- secção -->\n')
+        elif ':' in linha:
+            partes.append(f'<p>{html.escape(linha)}</p>\n')
+        else:
+            partes.append(f'<h4>{html.escape(linha)}</h4>\n')
+    partes.append('</div>')
+    partes.append(_RODAPE.replace('{menu}', _MENU))
+    return ''.join(partes)
+
+def gerar_feed_xml(procedimentos: List[Dict]) -> str:
+    """
+    Gera o XML de um RSS feed do DRE com um item por procedimento
+    """
+    partes = ['<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>\n',
+              '<title>Diário da República - 2.ª Série - Parte L</title>\n']
+    for proc in procedimentos:
+        partes.append(f"<item><title><![CDATA[{proc.get('entidade') or ''}]]></title>"
+                      f"<link>{escape(proc['link'])}</link>"
+                      f"<description><![CDATA[{proc.get('designacao_contrato') or ''}]]></description></item>\n")
+    partes.append('</channel></rss>\n')
+    return ''.join(partes)
+
+class ReplayBackend:
+    """
+    Backend de detalhes que lê as páginas guardadas num corpus de replay
+    """
+    nome = 'replay'
+
+    def __init__(self, html_dir: str):
+        self.html_dir = html_dir
+
+    def carregar(self, url: str) -> Optional[str]:
+        caminho = os.path.join(self.html_dir, chave_captura(url))
+        if os.path.exists(caminho + '.html.gz'):
+            with gzip.open(caminho + '.html.gz', 'rt', encoding='utf-8') as f:
+                return f.read()
+        if os.path.exists(caminho + '.html'):
+            with open(caminho + '.html', 'r', encoding='utf-8') as f:
+                return f.read()
+        return None
+
+    def fetch(self, url: str) -> Optional[Dict[str, str]]:
+        page_source = self.carregar(url)
+        if page_source is None:
+            print(f"Página não encontrada no corpus de replay: {url}")
+            return None
+        return extract_details_from_html(page_source, TEXTOS_SECCAO)
+
+    def close(self):
+        pass
+
+def gerar_corpus(data_file: str, corpus_dir: str, comprimir: bool = True):
+    """
+    Cria um corpus de replay (feed.xml e páginas sintéticas) a partir de um ficheiro de data/
+    """
+    procedimentos = [proc for proc in iter_procedimentos(data_file)
+                     if proc.get('link') and proc.get('detalhes_completos')]
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    with open(os.path.join(corpus_dir, FEED_REPLAY), 'w', encoding='utf-8') as f:
+        f.write(gerar_feed_xml(procedimentos))
+
+    for proc in procedimentos:
+        pagina = gerar_pagina_sintetica(proc['detalhes_completos'])
+        caminho = os.path.join(corpus_dir, chave_captura(proc['link']))
+        if comprimir:
+            with gzip.open(caminho + '.html.gz', 'wt', encoding='utf-8') as f:
+                f.write(pagina)
+        else:
+            with open(caminho + '.html', 'w', encoding='utf-8') as f:
+                f.write(pagina)
+
+    print(f"✅ Corpus de replay criado em {corpus_dir}: {len(procedimentos)} procedimentos")
+
+def preparar_saida(saida_dir: str) -> bool:
+    """
+    Esvazia saida_dir para uma nova execução. Só é apagado um diretório criado pelo replay
+    (com o ficheiro MARCA_SAIDA) ou vazio; qualquer outro é recusado.
+    """
+    marca = os.path.join(saida_dir, MARCA_SAIDA)
+    if os.path.isdir(saida_dir) and os.listdir(saida_dir):
+        if not os.path.exists(marca):
+            print(f"❌ {saida_dir} já existe, não está vazio e não foi criado pelo replay: "
+                  f"indique outro diretório em --saida")
+            return False
+        shutil.rmtree(saida_dir)
+    os.makedirs(saida_dir, exist_ok=True)
+    with open(marca, 'w', encoding='utf-8') as f:
+        f.write("Saída de replay.py reproduzir: este diretório é apagado no início de cada execução\n")
+    return True
+
+def reproduzir(corpus_dir: str, saida_dir: str, workers: int = 1, pipeline: str = 'async') -> Optional[Dict]:
+    """
+    Corre o processo completo sobre o corpus, escrevendo em saida_dir/RSS e saida_dir/data
+    (None se o corpus não tiver procedimentos ou saida_dir for recusado)
+    """
+    # Começar sempre de uma saída limpa para as execuções serem comparáveis
+    if not preparar_saida(saida_dir):
+        return None
+    args = parse_args_extrator(['--force', '--workers', str(workers), '--pipeline', pipeline])
+    backend = FallbackBackend([ReplayBackend(corpus_dir)])
+    tempos = {}
+    with cronometro(tempos, 'total'), open(os.path.join(corpus_dir, FEED_REPLAY), 'rb') as f:
+        # O feed é lido em blocos, como na execução real
+        blocos = iter(lambda: f.read(TAMANHO_BLOCO_FEED), b'')
+        resumo = executar_pipeline(iter_rss_items(blocos), backend, args,
+                                   rss_dir=os.path.join(saida_dir, 'RSS'),
+                                   data_dir=os.path.join(saida_dir, 'data'),
+                                   tempos=tempos)
+    if resumo is None:
+        return None
+    resumo['tempos'] = tempos
+    resumo['backends'] = backend.stats.contagens()
+    return resumo
+
+def mostrar_tempos(execucoes: List[Dict[str, float]], procedimentos: int):
+    print(f"\n⏱️ Tempos por etapa ({len(execucoes)} execuções, {procedimentos} procedimentos):")
+    print(f"  {'etapa':<14}{'mediana (s)':>13}{'mínimo (s)':>13}{'ms/proc.':>11}")
+    for etapa in ETAPAS + ['total']:
+        valores = [tempos.get(etapa, 0.0) for tempos in execucoes]
+        mediana = statistics.median(valores)
+        print(f"  {etapa:<14}{mediana:>13.3f}{min(valores):>13.3f}"
+              f"{mediana / max(procedimentos, 1) * 1000:>11.2f}")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Modo replay (offline) do extrator do DRE")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    corpus = subparsers.add_parser('gerar-corpus', help="criar um corpus sintético a partir de um ficheiro de data/")
+    corpus.add_argument("--data-file", required=True, help="ficheiro data/DD-MM-YYYY.jsonl.gz (ou .json)")
+    corpus.add_argument("--corpus", required=True, metavar="DIR")
+    corpus.add_argument("--sem-compressao", action="store_true", help="guardar as páginas como .html")
+
+    replay = subparsers.add_parser('reproduzir', help="correr o processo completo sobre um corpus")
+    replay.add_argument("--corpus", required=True, metavar="DIR")
+    replay.add_argument("--saida", default="../replay_saida", metavar="DIR",
+                        help="diretório onde são escritos RSS/ e data/ (é apagado no início; "
+                             "tem de não existir, estar vazio ou ter sido criado pelo replay)")
+    replay.add_argument("--workers", type=int, default=1)
+    replay.add_argument("--pipeline", choices=['async', 'sequencial'], default='async')
+    replay.add_argument("--benchmark", type=int, default=1, metavar="N",
+                        help="repetir o processo N vezes e mostrar os tempos de cada etapa")
+    replay.add_argument("--registo-tempos", metavar="FICHEIRO", help="guardar os tempos em JSON")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+
+    if args.comando == 'gerar-corpus':
+        gerar_corpus(args.data_file, args.corpus, comprimir=not args.sem_compressao)
+        return
+
+    if not preparar_saida(args.saida):
+        return
+
+    execucoes = []
+    resumo = None
+    for _ in range(max(args.benchmark, 1)):
+        resumo = reproduzir(args.corpus, args.saida, args.workers, args.pipeline)
+        if resumo is None:
+            print("❌ O corpus não tem procedimentos")
+            return
+        execucoes.append(resumo['tempos'])
+
+    mostrar_tempos(execucoes, resumo['procedimentos'])
+    print(f"📊 Páginas por backend: {resumo['backends']}")
+
+    if args.registo_tempos:
+        with open(args.registo_tempos, 'w', encoding='utf-8') as f:
+            json.dump({'procedimentos': resumo['procedimentos'], 'execucoes': execucoes}, f, indent=2)
+        print(f"Tempos guardados em {args.registo_tempos}")
+
+if __name__ == "__main__":
+    main()
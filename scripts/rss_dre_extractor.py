@@ -4,27 +4,192 @@ import json
 import re
 import time
 import os
-from typing import List, Dict
+import argparse
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from functools import lru_cache
+from urllib.parse import urlparse
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 
+from armazenamento_data import FORMATO_SNAPSHOT, FORMATOS_DATA, escrever_procedimentos, nome_ficheiro_data
+from capturas_debug import DebugCaptureStore, MAX_MB_CAPTURAS
+from extracao_campos import extrair_campos
+from indice_links import IndiceLinks
+from normalizacao_datas import normalizar_datas_procedimento
+from normalizacao_valores import normalizar_valores_lote
+
+# Número de páginas servidas por uma sessão do Chrome antes de ser reciclada
+MAX_PAGINAS_POR_SESSAO = 50
+
+# Espera pela secção de identificação da entidade adjudicante (em segundos)
+TIMEOUT_PRONTO = 15.0
+INTERVALO_POLLING = 0.25
+# Textos que identificam a secção com os detalhes do procedimento, por ordem de preferência
+TEXTOS_SECCAO = [
+    "1 - IDENTIFICAÇÃO E CONTACTOS DA ENTIDADE ADJUDICANTE",
+    "IDENTIFICAÇÃO E CONTACTOS DA ENTIDADE ADJUDICANTE",
+    "IDENTIFICAÇÃO"
+]
+# Só o cabeçalho completo da secção conta como "bloco presente" no HTML obtido sem browser
+TEXTOS_SECCAO_HTTP = TEXTOS_SECCAO[:2]
+XPATH_SECCAO_ENTIDADE = "//*[text()[contains(., 'IDENTIFICAÇÃO E CONTACTOS DA ENTIDADE ADJUDICANTE')]]"
+
+# Parser lxml: candidatos à secção numa só expressão XPath. O translate() passa para
+# maiúsculas todas as letras que re.IGNORECASE considera equivalentes às dos TEXTOS_SECCAO
+# (incluindo İ, ı e ſ); cada candidato é depois confirmado com a mesma regex do BeautifulSoup.
+_MINUSCULAS = 'abcdefghijklmnopqrstuvwxyzçãİıſ'
+_MAIUSCULAS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZÇÃIIS'
+XPATH_CANDIDATOS_SECCAO = etree.XPath(
+    f"(//text() | //comment())[contains(translate(., '{_MINUSCULAS}', '{_MAIUSCULAS}'), $texto)]"
+)
+# Texto visível de um elemento, como o get_text() do BeautifulSoup (sem scripts, estilos, etc.)
+XPATH_TEXTO_CONTEUDO = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template or ancestor::rt or ancestor::rp)]"
+)
+XPATH_DIV_MAIS_PROXIMO = etree.XPath("ancestor-or-self::div[1]")
+
+# Validadores HTTP (ETag/Last-Modified) da última versão processada do feed
+FEED_VALIDADORES_FILE = '../RSS/feed_validadores.json'
+
+# Nome do XML do feed dentro de um diretório de replay (ver replay.py)
+FEED_REPLAY = 'feed.xml'
+
+# Tamanho dos blocos em que o feed é descarregado e entregue ao parser
+TAMANHO_BLOCO_FEED = 16 * 1024
+
+def create_http_session(pool_size: int = 10, retries: int = 3, backoff: float = 1.0) -> requests.Session:
+    """
+    Cria uma sessão HTTP com keep-alive, pool de ligações e novas tentativas com backoff
+    exponencial para erros transitórios (falhas de ligação, 429 e 5xx)
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD']),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = 'Mozilla/5.0 (compatible; DRE-RSS)'
+    return session
+
+class RSSFeedFetcher:
+    """
+    Faz fetch do RSS feed com uma sessão persistente e pedidos condicionais.
+
+    Os validadores só são gravados com guardar_validadores(), depois de o feed ter
+    sido processado com sucesso, para que uma execução falhada não seja saltada
+    na execução seguinte.
+    """
+
+    def __init__(self, validadores_file: str = FEED_VALIDADORES_FILE, session: Optional[requests.Session] = None):
+        self.validadores_file = validadores_file
+        self.session = session or create_http_session(pool_size=1)
+        self.validadores = self._carregar_validadores()
+        self.nao_modificado = False
+        self._novos_validadores = {}
+
+    def _carregar_validadores(self) -> Dict[str, Dict[str, str]]:
+        if not os.path.exists(self.validadores_file):
+            return {}
+        try:
+            with open(self.validadores_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar {self.validadores_file}: {e}")
+            return {}
+
+    def _pedir(self, url: str, conditional: bool, stream: bool) -> Optional[requests.Response]:
+        self.nao_modificado = False
+        headers = {}
+        guardados = self.validadores.get(url, {})
+        if conditional:
+            if guardados.get('etag'):
+                headers['If-None-Match'] = guardados['etag']
+            if guardados.get('last_modified'):
+                headers['If-Modified-Since'] = guardados['last_modified']
+        
+        try:
+            response = self.session.get(url, headers=headers, timeout=30, stream=stream)
+            if response.status_code == 304:
+                self.nao_modificado = True
+                response.close()
+                return None
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Erro ao fazer fetch do RSS feed: {e}")
+            return None
+        
+        self._novos_validadores[url] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        return response
+
+    def fetch(self, url: str, conditional: bool = True) -> Optional[str]:
+        """
+        Devolve o XML do feed, ou None em caso de erro ou se o servidor responder
+        304 Not Modified (nesse caso self.nao_modificado fica a True)
+        """
+        response = self._pedir(url, conditional, stream=False)
+        return response.text if response is not None else None
+
+    def fetch_stream(self, url: str, conditional: bool = True,
+                     chunk_size: int = TAMANHO_BLOCO_FEED) -> Optional[Iterator[bytes]]:
+        """
+        Como fetch(), mas devolve o corpo da resposta em blocos à medida que é descarregado,
+        para ser entregue a iter_rss_items sem esperar pelo feed completo
+        """
+        response = self._pedir(url, conditional, stream=True)
+        if response is None:
+            return None
+        return response.iter_content(chunk_size=chunk_size)
+
+    def guardar_validadores(self):
+        """Grava os validadores dos feeds obtidos nesta execução"""
+        if not self._novos_validadores:
+            return
+        self.validadores.update(self._novos_validadores)
+        try:
+            os.makedirs(os.path.dirname(self.validadores_file) or '.', exist_ok=True)
+            with open(self.validadores_file, 'w', encoding='utf-8') as f:
+                json.dump(self.validadores, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Erro ao guardar validadores do feed: {e}")
+
 def fetch_rss_feed(url: str) -> str:
     """
     Faz fetch do conteúdo XML do RSS feed
     """
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
-        print(f"Erro ao fazer fetch do RSS feed: {e}")
-        return None
+    return RSSFeedFetcher(session=create_http_session(pool_size=1)).fetch(url, conditional=False)
+
+@lru_cache(maxsize=None)
+def get_chrome_driver_path() -> str:
+    """
+    Obtém (uma única vez por execução) o caminho do Chrome WebDriver via webdriver-manager
+    """
+    chrome_driver_path = ChromeDriverManager().install()
+    print(f"Usando Chrome WebDriver: {chrome_driver_path}")
+    return chrome_driver_path
 
 def setup_driver():
     """
@@ -45,20 +210,225 @@ def setup_driver():
  
     
     # Usar webdriver-manager para baixar a versão correta do Chrome WebDriver
-    chrome_driver_path = ChromeDriverManager().install()
-    print(f"Usando Chrome WebDriver: {chrome_driver_path}")
+    chrome_driver_path = get_chrome_driver_path()
     
     service = Service(chrome_driver_path)
     driver = webdriver.Chrome(service=service, options=chrome_options)
     return driver
 
-def fetch_procedure_details(url: str) -> Dict[str, str]:
+class DriverSession:
+    """
+    Sessão do Chrome reutilizada entre procedimentos.
+
+    O browser é iniciado apenas quando é pedido o primeiro driver e é reciclado
+    depois de servir `max_paginas` páginas ou quando o browser falha.
+    """
+
+    def __init__(self, max_paginas: int = MAX_PAGINAS_POR_SESSAO):
+        self.max_paginas = max_paginas
+        self.driver = None
+        self.paginas_servidas = 0
+        self.sessoes_iniciadas = 0
+
+    def get_driver(self):
+        """Devolve o driver ativo, iniciando ou reciclando a sessão se necessário"""
+        if self.driver is not None and self.max_paginas and self.paginas_servidas >= self.max_paginas:
+            print(f"♻️ Reciclando sessão do Chrome após {self.paginas_servidas} páginas")
+            self.quit()
+        
+        if self.driver is None:
+            self.driver = setup_driver()
+            self.paginas_servidas = 0
+            self.sessoes_iniciadas += 1
+        
+        self.paginas_servidas += 1
+        return self.driver
+
+    def recycle(self):
+        """Descarta a sessão atual (ex.: após uma falha); a próxima página inicia uma nova"""
+        print("♻️ Reiniciando sessão do Chrome após falha")
+        self.quit()
+
+    def quit(self):
+        """Termina o browser, ignorando erros de uma sessão que já não responde"""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"Erro ao terminar o Chrome: {e}")
+            finally:
+                self.driver = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.quit()
+
+class ReadinessStats:
+    """
+    Regista, por página, quanto tempo a secção do procedimento demorou a ficar disponível
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.registos = []
+
+    def registar(self, url: str, latencia: float, pronto: bool):
+        with self._lock:
+            self.registos.append({'link': url, 'latencia': round(latencia, 3), 'pronto': pronto})
+
+    def resumo(self) -> Dict[str, float]:
+        """Resumo das latências das páginas que ficaram prontas dentro do timeout"""
+        latencias = sorted(r['latencia'] for r in self.registos if r['pronto'])
+        resumo = {
+            'paginas': len(self.registos),
+            'timeouts': len(self.registos) - len(latencias),
+        }
+        if latencias:
+            resumo.update({
+                'min': latencias[0],
+                'mediana': statistics.median(latencias),
+                'p95': latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))],
+                'max': latencias[-1],
+            })
+        return resumo
+
+    def mostrar_resumo(self):
+        resumo = self.resumo()
+        print(f"⏱️ Prontidão das páginas: {resumo['paginas']} páginas, {resumo['timeouts']} timeouts")
+        if 'mediana' in resumo:
+            print(f"   min {resumo['min']:.2f}s | mediana {resumo['mediana']:.2f}s | "
+                  f"p95 {resumo['p95']:.2f}s | max {resumo['max']:.2f}s")
+
+    def guardar(self, filepath: str):
+        """Guarda as latências por página em JSON para afinar o timeout"""
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump({'resumo': self.resumo(), 'paginas': self.registos}, f, ensure_ascii=False, indent=2)
+            print(f"Latências guardadas em {filepath}")
+        except Exception as e:
+            print(f"Erro ao guardar latências: {e}")
+
+def wait_for_procedure_section(driver, url: str, timeout: float = TIMEOUT_PRONTO,
+                               intervalo_polling: float = INTERVALO_POLLING,
+                               stats: Optional[ReadinessStats] = None) -> bool:
+    """
+    Aguarda até a secção de identificação da entidade adjudicante estar renderizada.
+    Devolve False se o timeout expirar (a página é analisada na mesma).
+    """
+    inicio = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=intervalo_polling).until(
+            EC.presence_of_element_located((By.XPATH, XPATH_SECCAO_ENTIDADE))
+        )
+        pronto = True
+    except TimeoutException:
+        print(f"Secção do procedimento não apareceu em {timeout}s")
+        pronto = False
+    
+    if stats is not None:
+        stats.registar(url, time.monotonic() - inicio, pronto)
+    return pronto
+
+def _section_text_bs4(page_source: str, possible_texts: List[str]) -> Optional[str]:
+    """
+    Texto da secção do procedimento com BeautifulSoup ('html.parser')
+    """
+    soup = BeautifulSoup(page_source, 'html.parser')
+    
+    # Procurar pelo texto específico
+    target_element = None
+    for text in possible_texts:
+        target_element = soup.find(string=re.compile(text, re.IGNORECASE))
+        if target_element:
+            break
+    
+    if target_element:
+        # Encontrar o div pai que contém as informações
+        parent_div = target_element.find_parent('div')
+        if parent_div:
+            # Extrair todo o texto do div pai
+            return parent_div.get_text(separator='\n', strip=True)
+    
+    return None
+
+def _section_text_lxml(page_source: str, possible_texts: List[str]) -> Optional[str]:
     """
-    Extrai detalhes de um procedimento específico a partir da URL
+    Texto da secção do procedimento com lxml, idêntico ao de _section_text_bs4
     """
-    driver = None
     try:
-        driver = setup_driver()
+        root = lxml.html.document_fromstring(page_source)
+    except ValueError:
+        # Strings unicode com declaração de encoding têm de ser passadas em bytes
+        root = lxml.html.document_fromstring(page_source.encode('utf-8'))
+    except etree.ParserError:
+        return None
+    
+    for text in possible_texts:
+        pattern = re.compile(text, re.IGNORECASE)
+        for node in XPATH_CANDIDATOS_SECCAO(root, texto=text.upper()):
+            if isinstance(node, etree._Element):
+                # Comentário: o dono é o elemento onde está inserido
+                conteudo, dono = node.text or '', node.getparent()
+            else:
+                conteudo, dono = str(node), node.getparent()
+                if node.is_tail:
+                    dono = dono.getparent()
+            
+            if not pattern.search(conteudo):
+                continue
+            
+            # Primeira ocorrência encontrada: tal como no BeautifulSoup, não se tenta o texto seguinte
+            divs = XPATH_DIV_MAIS_PROXIMO(dono) if dono is not None else []
+            if not divs:
+                return None
+            stripped = (t.strip() for t in XPATH_TEXTO_CONTEUDO(divs[0]))
+            return '\n'.join(t for t in stripped if t)
+    
+    return None
+
+def extract_details_from_html(page_source: str, possible_texts: List[str] = TEXTOS_SECCAO,
+                              parser: str = 'lxml') -> Optional[Dict[str, str]]:
+    """
+    Extrai os detalhes do procedimento a partir do HTML de uma página de detalhe.
+    O parser 'lxml' (por omissão) produz o mesmo resultado que 'html.parser', mais depressa.
+    """
+    if parser == 'lxml':
+        details_text = _section_text_lxml(page_source, possible_texts)
+    else:
+        details_text = _section_text_bs4(page_source, possible_texts)
+    
+    if details_text is None:
+        return None
+    
+    # Extrair informações específicas (a entidade adjudicante fica em 'entidade')
+    extracted_info = {
+        ('entidade' if field == 'entidade_adjudicante' else field): value
+        for field, value in extrair_campos(details_text).items()
+    }
+    
+    return {
+        'detalhes_completos': details_text,
+        **extracted_info
+    }
+
+def fetch_procedure_details(url: str, session: Optional[DriverSession] = None,
+                            timeout_pronto: float = TIMEOUT_PRONTO,
+                            intervalo_polling: float = INTERVALO_POLLING,
+                            stats: Optional[ReadinessStats] = None,
+                            capturas: Optional[DebugCaptureStore] = None) -> Dict[str, str]:
+    """
+    Extrai detalhes de um procedimento específico a partir da URL.
+    Se não for indicada uma sessão, é usado um browser descartável só para esta página.
+    Com `capturas`, as páginas com extração falhada ou parcial são guardadas para debug.
+    """
+    own_session = session is None
+    if own_session:
+        session = DriverSession()
+    
+    try:
+        driver = session.get_driver()
         print(f"Acessando: {url}")
         
         driver.get(url)
@@ -68,86 +438,272 @@ def fetch_procedure_details(url: str) -> Dict[str, str]:
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
         
-        # Aguardar um pouco mais para garantir que o JavaScript carregou
-        time.sleep(5)
+        # Aguardar que o JavaScript renderize a secção do procedimento
+        wait_for_procedure_section(driver, url, timeout_pronto, intervalo_polling, stats)
         
         # Obter o HTML renderizado
         page_source = driver.page_source
         
-        # Salvar HTML para debug
-        with open('debug_page_rendered.html', 'w', encoding='utf-8') as f:
-            f.write(page_source)
-        
-        # Usar BeautifulSoup para parsear o HTML
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Procurar pelo texto específico
-        possible_texts = [
-            "1 - IDENTIFICAÇÃO E CONTACTOS DA ENTIDADE ADJUDICANTE",
-            "IDENTIFICAÇÃO E CONTACTOS DA ENTIDADE ADJUDICANTE",
-            "IDENTIFICAÇÃO"
-        ]
-        
-        target_element = None
-        for text in possible_texts:
-            target_element = soup.find(string=re.compile(text, re.IGNORECASE))
-            if target_element:
-                break
-        
-        if target_element:
-            # Encontrar o div pai que contém as informações
-            parent_div = target_element.find_parent('div')
-            if parent_div:
-                # Extrair todo o texto do div pai
-                details_text = parent_div.get_text(separator='\n', strip=True)
-                
-                # Extrair informações específicas usando regex
-                extracted_info = {}
-                
-                # Padrões para extrair informações específicas
-                patterns = {
-                    'entidade': r'Designação da entidade adjudicante:\s*(.+?)(?:\n|$)',
-                    'nipc': r'NIPC:\s*(\d+)',
-                    'distrito': r'Distrito:\s*(.+?)(?:\n|$)',
-                    'concelho': r'Concelho:\s*(.+?)(?:\n|$)',
-                    'freguesia': r'Freguesia:\s*(.+?)(?:\n|$)',
-                    'site': r'Endereço da Entidade \(URL\):\s*(.+?)(?:\n|$)',
-                    'email': r'Endereço Eletrónico:\s*(.+?)(?:\n|$)',
-                    'designacao_contrato': r'Designação do contrato:\s*(.+?)(?:\n|$)',
-                    'descricao': r'Descrição:\s*(.+?)(?:\n|$)',
-                    'preco_base': r'Preço base s/IVA:\s*(.+?)(?:\n|$)',
-                    'prazo_execucao': r'Prazo de execução do contrato:\s*(.+?)(?:\n|$)',
-                    'prazo_apresentacao_propostas': r'Prazo para apresentação das propostas:\s*(.+?)(?:\n|$)',
-                    'fundos_eu': r'Têm fundos EU\?\s*(.+?)(?:\n|$)',
-                    'plataforma_eletronica': r'Plataforma eletrónica utilizada pela entidade adjudicante:\s*(.+?)(?:\n|$)',
-                    'url_procedimento': r'URL para Apresentação:\s*(.+?)(?:\n|$)',
-                    'autor_nome': r'28 - IDENTIFICAÇÃO DO\(S\) AUTOR\(ES\) DE ANÚNCIO\nNome:\s*(.+?)(?:\n|$)',
-                    'autor_cargo': r'Cargo:\s*(.+?)(?:\n|$)'
-                }
-                
-                for field, pattern in patterns.items():
-                    match = re.search(pattern, details_text, re.MULTILINE | re.DOTALL)
-                    if match:
-                        value = match.group(1).strip()
-                        value = re.sub(r'\s+', ' ', value)
-                        extracted_info[field] = value
-                    else:
-                        extracted_info[field] = None
-                
-                return {
-                    'detalhes_completos': details_text,
-                    **extracted_info
-                }
+        details = extract_details_from_html(page_source)
+        if capturas is not None:
+            capturas.capturar_se_incompleto(url, page_source, details)
+        if details:
+            return details
         
         print("Não foi possível encontrar as informações específicas")
         return None
         
+    except TimeoutException as e:
+        print(f"Tempo esgotado ao carregar a página: {e}")
+        return None
+    except WebDriverException as e:
+        # O browser pode ter falhado; a próxima página usa uma sessão nova
+        print(f"Erro do Chrome ao extrair detalhes: {e}")
+        session.recycle()
+        return None
     except Exception as e:
         print(f"Erro ao extrair detalhes: {e}")
         return None
     finally:
-        if driver:
-            driver.quit()
+        if own_session:
+            session.quit()
+
+class HostRateLimiter:
+    """
+    Regras de cortesia por host: intervalo mínimo entre o início de pedidos
+    consecutivos e número máximo de pedidos em simultâneo (0 = sem limite).
+    """
+
+    def __init__(self, intervalo_minimo: float = 0.0, max_simultaneos: int = 0):
+        self.intervalo_minimo = intervalo_minimo
+        self.max_simultaneos = max_simultaneos
+        self._lock = threading.Lock()
+        self._proximo_pedido = {}
+        self._semaforos = {}
+
+    def _semaforo(self, host: str) -> Optional[threading.Semaphore]:
+        if not self.max_simultaneos:
+            return None
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.Semaphore(self.max_simultaneos)
+            return self._semaforos[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """Bloqueia até ser permitido fazer um pedido ao host do URL"""
+        host = urlparse(url).netloc
+        semaforo = self._semaforo(host)
+        if semaforo:
+            semaforo.acquire()
+        try:
+            if self.intervalo_minimo > 0:
+                # Reservar o próximo instante livre para este host e esperar por ele
+                with self._lock:
+                    agora = time.monotonic()
+                    inicio = max(agora, self._proximo_pedido.get(host, agora))
+                    self._proximo_pedido[host] = inicio + self.intervalo_minimo
+                if inicio > agora:
+                    time.sleep(inicio - agora)
+            yield
+        finally:
+            if semaforo:
+                semaforo.release()
+
+class SeleniumBackend:
+    """
+    Obtém detalhes com o Chrome, mantendo uma DriverSession por thread de trabalho
+    """
+    nome = 'selenium'
+
+    def __init__(self, max_paginas: int = MAX_PAGINAS_POR_SESSAO,
+                 timeout_pronto: float = TIMEOUT_PRONTO,
+                 intervalo_polling: float = INTERVALO_POLLING,
+                 capturas: Optional[DebugCaptureStore] = None):
+        self.max_paginas = max_paginas
+        self.timeout_pronto = timeout_pronto
+        self.intervalo_polling = intervalo_polling
+        self.capturas = capturas
+        self.readiness = ReadinessStats()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessoes = []
+
+    def _session(self) -> DriverSession:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = DriverSession(max_paginas=self.max_paginas)
+            self._local.session = session
+            with self._lock:
+                self._sessoes.append(session)
+        return session
+
+    @property
+    def sessoes_iniciadas(self) -> int:
+        return sum(session.sessoes_iniciadas for session in self._sessoes)
+
+    def fetch(self, url: str) -> Optional[Dict[str, str]]:
+        return fetch_procedure_details(url, self._session(), self.timeout_pronto,
+                                       self.intervalo_polling, self.readiness, self.capturas)
+
+    def close(self):
+        for session in self._sessoes:
+            session.quit()
+
+class HttpBackend:
+    """
+    Obtém a página de detalhe com `requests`, sem browser. Só devolve detalhes se o
+    bloco "1 - IDENTIFICAÇÃO..." vier já no HTML servido pelo site.
+    """
+    nome = 'http'
+
+    def __init__(self, timeout: float = 30, capturas: Optional[DebugCaptureStore] = None):
+        self.timeout = timeout
+        self.capturas = capturas
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # requests.Session não é thread-safe: uma sessão por thread de trabalho
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = create_http_session(pool_size=2)
+            self._local.session = session
+        return session
+
+    def fetch(self, url: str) -> Optional[Dict[str, str]]:
+        try:
+            response = self._session().get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Erro HTTP ao obter {url}: {e}")
+            return None
+        
+        details = extract_details_from_html(response.text, TEXTOS_SECCAO_HTTP)
+        # Sem entidade nem NIPC o bloco encontrado não é a secção renderizada
+        if details and (details.get('entidade') or details.get('nipc')):
+            # Páginas sem a secção não são capturadas: seguem para o backend seguinte
+            if self.capturas is not None:
+                self.capturas.capturar_se_incompleto(url, response.text, details)
+            return details
+        return None
+
+    def close(self):
+        pass
+
+class BackendStats:
+    """
+    Regista qual backend serviu cada página durante a execução
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.por_pagina = {}
+
+    def registar(self, url: str, backend: str):
+        with self._lock:
+            self.por_pagina[url] = backend
+
+    def contagens(self) -> Dict[str, int]:
+        contagens = {}
+        for backend in self.por_pagina.values():
+            contagens[backend] = contagens.get(backend, 0) + 1
+        return contagens
+
+    def mostrar_resumo(self):
+        total = len(self.por_pagina)
+        print(f"🧭 Páginas por backend ({total} no total):")
+        for backend, count in sorted(self.contagens().items()):
+            print(f"   {backend}: {count} ({count / total:.0%})")
+
+    def guardar(self, filepath: str):
+        """Guarda em JSON o backend que serviu cada página"""
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump({'resumo': self.contagens(), 'paginas': self.por_pagina}, f, ensure_ascii=False, indent=2)
+            print(f"Backends por página guardados em {filepath}")
+        except Exception as e:
+            print(f"Erro ao guardar backends por página: {e}")
+
+class FallbackBackend:
+    """
+    Tenta cada backend por ordem (ex.: HTTP e depois Selenium) e regista qual serviu a página
+    """
+
+    def __init__(self, backends: List):
+        self.backends = backends
+        self.nome = '+'.join(backend.nome for backend in backends)
+        self.stats = BackendStats()
+
+    def fetch(self, url: str) -> Optional[Dict[str, str]]:
+        for backend in self.backends:
+            details = backend.fetch(url)
+            if details:
+                self.stats.registar(url, backend.nome)
+                return details
+        self.stats.registar(url, 'falhou')
+        return None
+
+    def close(self):
+        for backend in self.backends:
+            backend.close()
+
+def create_backend(nome: str, args: argparse.Namespace) -> FallbackBackend:
+    """
+    Cria o backend de detalhes pedido: 'http', 'selenium' ou 'auto' (HTTP com Selenium de recurso)
+    """
+    capturas = None
+    if args.gravar_replay:
+        capturas = DebugCaptureStore(args.gravar_replay, max_mb=0, todas=True)
+    elif args.debug_capturas:
+        capturas = DebugCaptureStore(args.debug_capturas, args.debug_capturas_max_mb)
+    
+    backends = []
+    if nome in ('auto', 'http'):
+        backends.append(HttpBackend(capturas=capturas))
+    if nome in ('auto', 'selenium'):
+        backends.append(SeleniumBackend(args.max_paginas_sessao, args.timeout_pronto,
+                                        args.intervalo_polling, capturas))
+    return FallbackBackend(backends)
+
+def extrair_detalhes_item(item: Dict[str, str], fetch: Callable[[str], Optional[Dict[str, str]]],
+                          limiter: HostRateLimiter, posicao: str = "") -> Dict[str, str]:
+    """
+    Extrai os detalhes de um procedimento respeitando os limites por host
+    """
+    with limiter.slot(item['link']):
+        details = fetch(item['link'])
+    
+    if details:
+        # Combinar dados básicos com detalhes
+        print(f"  ✓ [{posicao}] {item['numero_procedimento']}: detalhes extraídos com sucesso")
+        return normalizar_datas_procedimento({**item, **details}, date.today())
+    
+    # Manter apenas dados básicos se não conseguir extrair detalhes
+    print(f"  ✗ [{posicao}] {item['numero_procedimento']}: não foi possível extrair detalhes")
+    return normalizar_datas_procedimento(item, date.today())
+
+def fetch_all_details(items: Iterable[Dict[str, str]], fetch: Callable[[str], Optional[Dict[str, str]]],
+                      workers: int = 1, limiter: Optional[HostRateLimiter] = None) -> List[Dict[str, str]]:
+    """
+    Extrai os detalhes de todos os procedimentos com `workers` pedidos em simultâneo.
+    Os resultados são devolvidos pela ordem original do feed.
+    `items` pode ser um gerador (ex.: iter_rss_items): cada procedimento começa a ser
+    extraído assim que é lido, enquanto o resto do feed ainda está a ser descarregado.
+    """
+    total = f"/{len(items)}" if hasattr(items, '__len__') else ""
+    limiter = limiter or HostRateLimiter()
+
+    def processar(indexed_item):
+        i, item = indexed_item
+        return extrair_detalhes_item(item, fetch, limiter, f"{i+1}{total}")
+
+    if workers <= 1:
+        return [processar(indexed_item) for indexed_item in enumerate(items)]
+    
+    # executor.map preserva a ordem de entrada, mantendo a saída determinística, e submete
+    # cada procedimento à medida que o iterável de entrada o produz
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='detalhes') as executor:
+        return list(executor.map(processar, enumerate(items)))
 
 def extract_procedure_info(title: str, description: str) -> Dict[str, str]:
     """
@@ -165,201 +721,381 @@ def extract_procedure_info(title: str, description: str) -> Dict[str, str]:
         "entidade": entidade
     }
 
-def parse_rss_to_json(xml_content: str) -> List[Dict[str, str]]:
+def _texto(elem: Optional[ET.Element]) -> str:
+    # O ElementTree já devolve o conteúdo das secções CDATA sem os delimitadores
+    return (elem.text or "") if elem is not None else ""
+
+def iter_rss_items(blocos: Iterable[Union[str, bytes]]) -> Iterator[Dict[str, str]]:
     """
-    Faz parse do XML do RSS feed e extrai informações dos procedimentos
+    Faz parse incremental do XML do RSS feed e devolve cada procedimento assim que o
+    respetivo <item> termina, sem esperar pelo resto do feed.
+    Os <item> já processados são descartados, pelo que a memória não cresce com o feed.
+    Lança ET.ParseError se o XML for inválido.
     """
-    try:
-        root = ET.fromstring(xml_content)
-        
-        # Namespace para RSS
-        ns = {'rss': 'http://purl.org/rss/1.0/'}
-        
-        extracted_data = []
-        
-        # Encontrar todos os items
-        for item in root.findall('.//item'):
-            title_elem = item.find('title')
-            description_elem = item.find('description')
-            link_elem = item.find('link')
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    pais = []
+    for bloco in blocos:
+        parser.feed(bloco)
+        for evento, elem in parser.read_events():
+            if evento == 'start':
+                pais.append(elem)
+                continue
             
+            pais.pop()
+            if elem.tag != 'item':
+                continue
+            
+            title_elem = elem.find('title')
+            link_elem = elem.find('link')
             if title_elem is not None and link_elem is not None:
-                title = title_elem.text or ""
-                description = description_elem.text if description_elem is not None else ""
-                link = link_elem.text or ""
-                
-                # Limpar CDATA se presente
-                title = re.sub(r'<!\[CDATA\[(.*?)\]\]>', r'\1', title)
-                description = re.sub(r'<!\[CDATA\[(.*?)\]\]>', r'\1', description)
-                
                 # Extrair informações do procedimento
-                procedure_info = extract_procedure_info(title, description)
+                procedure_info = extract_procedure_info(_texto(title_elem), _texto(elem.find('description')))
                 
-                item_data = {
+                yield {
                     "numero_procedimento": procedure_info["numero_procedimento"],
                     "entidade": procedure_info["entidade"],
-                    "link": link
+                    "link": link_elem.text or ""
                 }
-                
-                extracted_data.append(item_data)
-        
-        return extracted_data
-        
+            
+            elem.clear()
+            if pais:
+                pais[-1].remove(elem)
+    parser.close()
+
+def parse_rss_to_json(xml_content: str) -> List[Dict[str, str]]:
+    """
+    Faz parse do XML do RSS feed e extrai informações dos procedimentos
+    """
+    try:
+        return list(iter_rss_items([xml_content]))
     except ET.ParseError as e:
         print(f"Erro ao fazer parse do XML: {e}")
         return []
 
-def save_to_json(data: List[Dict[str, str]], filename: str = "procedimentos_dre.json"):
+def save_to_json(data: List[Dict[str, str]], filename: str = "procedimentos_dre.json", rss_dir: str = '../RSS'):
     """
     Salva os dados extraídos em formato JSON
     """
     try:
         # Garantir que o diretório RSS existe
-        os.makedirs('../RSS', exist_ok=True)
+        os.makedirs(rss_dir, exist_ok=True)
         
-        filepath = os.path.join('../RSS', filename)
+        filepath = os.path.join(rss_dir, filename)
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
         print(f"Dados salvos com sucesso em {filepath}")
     except Exception as e:
         print(f"Erro ao salvar arquivo JSON: {e}")
 
-def save_to_json_with_date(data: List[Dict[str, str]]):
+def caminho_ficheiro_data(data_dir: str = '../data', formato: str = FORMATO_SNAPSHOT) -> str:
+    """
+    Caminho do ficheiro data/DD-MM-YYYY.<formato> do dia atual
+    """
+    from datetime import datetime
+    
+    # Obter data atual no formato DD-MM-YYYY
+    return os.path.join(data_dir, nome_ficheiro_data(datetime.now(), formato))
+
+def save_to_json_with_date(data: List[Dict[str, str]], data_dir: str = '../data',
+                           formato: str = FORMATO_SNAPSHOT):
     """
-    Salva os dados extraídos em formato JSON na pasta data/ com nome baseado na data atual
+    Salva os dados extraídos na pasta data/ com nome baseado na data atual
+    (por omissão num snapshot comprimido, ver armazenamento_data)
     """
     try:
-        from datetime import datetime
-        
         # Garantir que o diretório data existe
-        os.makedirs('../data', exist_ok=True)
+        os.makedirs(data_dir, exist_ok=True)
         
-        # Obter data atual no formato DD-MM-YYYY
-        current_date = datetime.now().strftime('%d-%m-%Y')
-        filename = f"{current_date}.json"
-        
-        filepath = os.path.join('../data', filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"Dados salvos com sucesso em {filepath}")
-        return filepath
+        return escrever_procedimentos(data, caminho_ficheiro_data(data_dir, formato))
     except Exception as e:
         print(f"Erro ao salvar arquivo JSON com data: {e}")
         return None
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """
-    Função principal que executa todo o processo
+    Lê as opções da linha de comandos
     """
-    rss_url = "https://files.diariodarepublica.pt/rss/serie2&parte=l-html.xml"
-    
-    print("Fazendo fetch do RSS feed do Diário da República...")
-    xml_content = fetch_rss_feed(rss_url)
-    
-    if xml_content is None:
-        print("Não foi possível obter o conteúdo do RSS feed")
-        return
-    
-    print("Extraindo informações dos procedimentos...")
-    extracted_data = parse_rss_to_json(xml_content)
+    parser = argparse.ArgumentParser(description="Extrai procedimentos do RSS feed do Diário da República")
+    parser.add_argument("--max-paginas-sessao", type=int, default=MAX_PAGINAS_POR_SESSAO,
+                        help="páginas servidas por uma sessão do Chrome antes de a reciclar (0 = nunca)")
+    parser.add_argument("--backend", choices=['auto', 'http', 'selenium'], default='auto',
+                        help="como obter as páginas de detalhe: 'auto' tenta HTTP e recorre ao Chrome")
+    parser.add_argument("--registo-backends", metavar="FICHEIRO",
+                        help="guardar em JSON o backend que serviu cada página")
+    parser.add_argument("--debug-capturas", metavar="DIR",
+                        help="guardar (comprimidas) as páginas cuja extração falhou ou ficou incompleta")
+    parser.add_argument("--debug-capturas-max-mb", type=float, default=MAX_MB_CAPTURAS,
+                        help="tamanho máximo das capturas de debug; as mais antigas são removidas")
+    parser.add_argument("--gravar-replay", metavar="DIR",
+                        help="guardar o feed e todas as páginas de detalhe em DIR para o replay.py")
+    parser.add_argument("--force", action="store_true",
+                        help="ignorar o pedido condicional ao feed e voltar a extrair os detalhes "
+                             "de procedimentos já guardados em data/")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="número de páginas de detalhe obtidas em simultâneo")
+    parser.add_argument("--pipeline", choices=['async', 'sequencial'], default='async',
+                        help="'async' corre as etapas em simultâneo ligadas por filas (pipeline_async.py); "
+                             "'sequencial' corre-as uma a seguir à outra")
+    parser.add_argument("--tamanho-fila", type=int, default=32,
+                        help="capacidade de cada fila entre etapas no pipeline 'async'")
+    parser.add_argument("--formato-data", choices=FORMATOS_DATA, default=FORMATO_SNAPSHOT,
+                        help="formato do ficheiro diário em data/: snapshot JSON Lines comprimido "
+                             "(jsonl.gz) ou lista JSON indentada (json)")
+    parser.add_argument("--intervalo-host", type=float, default=0.0,
+                        help="segundos mínimos entre pedidos consecutivos ao mesmo host")
+    parser.add_argument("--max-por-host", type=int, default=0,
+                        help="máximo de pedidos em simultâneo ao mesmo host (0 = sem limite)")
+    parser.add_argument("--timeout-pronto", type=float, default=TIMEOUT_PRONTO,
+                        help="segundos máximos à espera da secção do procedimento em cada página")
+    parser.add_argument("--intervalo-polling", type=float, default=INTERVALO_POLLING,
+                        help="intervalo (s) entre verificações da secção do procedimento")
+    parser.add_argument("--registo-latencias", metavar="FICHEIRO",
+                        help="guardar em JSON a latência de prontidão de cada página")
+    return parser.parse_args(argv)
+
+@contextmanager
+def cronometro(tempos: Optional[Dict[str, float]], etapa: str):
+    """
+    Acumula em tempos[etapa] a duração do bloco (se tempos não for None)
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        if tempos is not None:
+            tempos[etapa] = tempos.get(etapa, 0.0) + time.perf_counter() - inicio
+
+def cronometrar_iteracao(iteravel: Iterable, tempos: Optional[Dict[str, float]], etapa: str) -> Iterator:
+    """
+    Percorre iteravel contando em tempos[etapa] só o tempo passado a produzir cada elemento
+    """
+    iterador = iter(iteravel)
+    while True:
+        with cronometro(tempos, etapa):
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                return
+        yield elemento
+
+def run_pipeline(itens: Iterable[Dict[str, str]], backend: FallbackBackend, args: argparse.Namespace,
+                 rss_dir: str = '../RSS', data_dir: str = '../data',
+                 tempos: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+    """
+    Executa o processo a partir dos procedimentos do feed (ex.: iter_rss_items): extração
+    de detalhes, gravação dos JSON, atualização do ativos.json e geração do feed RSS.
+    A extração de detalhes começa enquanto o feed ainda está a ser lido.
+    Devolve um resumo da execução (ou None se o feed não tiver procedimentos).
+    """
+    print("Extraindo informações e detalhes de cada procedimento...")
+    with cronometro(tempos, 'detalhes'):
+        # Reaproveitar procedimentos já extraídos em execuções anteriores
+        indice = IndiceLinks(data_dir)
+        indice.atualizar()
+        extracted_data = []
+        reaproveitados = {}
+        
+        def por_extrair():
+            for item in cronometrar_iteracao(itens, tempos, 'parse_rss'):
+                extracted_data.append(item)
+                registo = None if args.force else indice.obter_registo(item['link'])
+                if registo:
+                    # Registos antigos podem ainda não ter as datas em ISO
+                    reaproveitados[item['link']] = normalizar_datas_procedimento(registo, indice.data_feed(item['link']))
+                else:
+                    yield item
+        
+        limiter = HostRateLimiter(args.intervalo_host, args.max_por_host)
+        print(f"Backend: {backend.nome} | Workers em simultâneo: {args.workers}")
+        try:
+            extraidos = iter(fetch_all_details(por_extrair(), backend.fetch, args.workers, limiter))
+        except ET.ParseError as e:
+            print(f"Erro ao fazer parse do XML: {e}")
+            return None
+        except requests.RequestException as e:
+            # O feed é descarregado enquanto é lido: a ligação pode falhar a meio
+            print(f"Erro ao fazer fetch do RSS feed: {e}")
+            return None
+        
+        # Repor a ordem original do feed
+        procedimentos_completos = [reaproveitados.get(item['link']) or next(extraidos) for item in extracted_data]
+        # Preço em cêntimos e prazo de execução em dias, convertidos uma vez por texto distinto do dia
+        procedimentos_completos = normalizar_valores_lote(procedimentos_completos)
     
     if not extracted_data:
         print("Nenhum dado foi extraído")
-        return
+        return None
     
     print(f"Extraídos {len(extracted_data)} procedimentos")
+    print(f"Procedimentos já extraídos anteriormente: {len(reaproveitados)} | "
+          f"extraídos agora: {len(extracted_data) - len(reaproveitados)}")
     
     # Salvar dados básicos em JSON
-    save_to_json(extracted_data, "procedimentos_basicos.json")
+    with cronometro(tempos, 'guardar_json'):
+        save_to_json(extracted_data, "procedimentos_basicos.json", rss_dir)
     
-    # Extrair detalhes de cada procedimento
-    print("\nExtraindo detalhes de cada procedimento...")
-    procedimentos_completos = []
+    mostrar_estatisticas_backends(backend, args)
     
-    for i, item in enumerate(extracted_data):
-        print(f"\nProcessando procedimento {i+1}/{len(extracted_data)}: {item['numero_procedimento']}")
-        
-        # Extrair detalhes do procedimento
-        details = fetch_procedure_details(item['link'])
+    with cronometro(tempos, 'guardar_json'):
+        # Salvar dados completos em JSON
+        save_to_json(procedimentos_completos, "procedimentos_completos.json", rss_dir)
         
-        if details:
-            # Combinar dados básicos com detalhes
-            item_completo = {**item, **details}
-            procedimentos_completos.append(item_completo)
-            print(f"  ✓ Detalhes extraídos com sucesso")
-        else:
-            # Manter apenas dados básicos se não conseguir extrair detalhes
-            procedimentos_completos.append(item)
-            print(f"  ✗ Não foi possível extrair detalhes")
+        # Salvar dados completos em JSON com data na pasta data/
+        print("\n📅 Salvando dados com data atual...")
+        data_file_path = save_to_json_with_date(procedimentos_completos, data_dir, args.formato_data)
+        if data_file_path:
+            indice.registar(procedimentos_completos, os.path.basename(data_file_path))
+            indice.guardar()
+    
+    with cronometro(tempos, 'ativos'):
+        atualizar_ativos(data_file_path, data_dir)
     
-    # Salvar dados completos em JSON
-    save_to_json(procedimentos_completos, "procedimentos_completos.json")
+    # Feeds filtrados de cada seed, a partir do ativos.json acabado de gravar
+    with cronometro(tempos, 'seeds'):
+        from feeds_seeds import gerar_feeds_seeds
+        gerar_feeds_seeds(data_dir, rss_dir)
     
-    # Salvar dados completos em JSON com data na pasta data/
-    print("\n📅 Salvando dados com data atual...")
-    data_file_path = save_to_json_with_date(procedimentos_completos)
+    with cronometro(tempos, 'feed_rss'):
+        estatisticas_feed = gerar_feed_rss(procedimentos_completos, rss_dir)
     
-    # Atualizar arquivo ativos.json
+    # Páginas de arquivo (RFC 5005) das semanas terminadas e documento de subscrição
+    with cronometro(tempos, 'arquivo'):
+        from arquivo_feed import atualizar_arquivo_feed
+        atualizar_arquivo_feed(data_dir, rss_dir)
+    
+    mostrar_ficheiros_gerados(len(procedimentos_completos), data_file_path, rss_dir, data_dir)
+    
+    return {
+        'procedimentos': len(procedimentos_completos),
+        'reaproveitados': len(reaproveitados),
+        'data_file_path': data_file_path,
+        'feed_rss': estatisticas_feed,
+    }
+
+def mostrar_estatisticas_backends(backend: FallbackBackend, args: argparse.Namespace):
+    """
+    Mostra (e grava, se pedido) que backend serviu cada página e a prontidão do Chrome
+    """
+    print()
+    backend.stats.mostrar_resumo()
+    if args.registo_backends:
+        backend.stats.guardar(args.registo_backends)
+    for selenium_backend in backend.backends:
+        if isinstance(selenium_backend, SeleniumBackend):
+            print(f"Sessões do Chrome iniciadas: {selenium_backend.sessoes_iniciadas}")
+            selenium_backend.readiness.mostrar_resumo()
+            if args.registo_latencias:
+                selenium_backend.readiness.guardar(args.registo_latencias)
+
+def atualizar_ativos(data_file_path: Optional[str], data_dir: str = '../data'):
+    """
+    Atualiza o ativos.json com os procedimentos ativos do ficheiro de data acabado de gravar
+    """
     print("\n🔄 Atualizando arquivo ativos.json...")
     try:
-        from gerir_ativos import update_ativos_from_date_file, merge_with_existing_ativos, save_ativos
+        from base_ativos import atualizar_base_ativos
         
         if data_file_path:
-            # Obter procedimentos ativos do arquivo de data
-            procedimentos_ativos = update_ativos_from_date_file(data_file_path)
-            
-            # Combinar com procedimentos ativos existentes
-            ativos_finais = merge_with_existing_ativos(procedimentos_ativos)
-            
-            # Salvar arquivo ativos.json
-            ativos_file_path = save_ativos(ativos_finais)
+            # Juntar os ativos do arquivo de data à base SQLite e exportar o ativos.json
+            total_ativos = atualizar_base_ativos(data_file_path, data_dir)
             
-            if ativos_file_path:
-                print(f"✅ Arquivo ativos.json atualizado com sucesso!")
-                print(f"📊 Total de procedimentos ativos: {len(ativos_finais)}")
-            else:
-                print("❌ Erro ao salvar arquivo ativos.json")
+            print(f"✅ Arquivo ativos.json atualizado com sucesso!")
+            print(f"📊 Total de procedimentos ativos: {total_ativos}")
         else:
             print("❌ Não foi possível obter caminho do arquivo de data")
             
     except Exception as e:
         print(f"❌ Erro ao atualizar ativos.json: {e}")
-    
-    # Gerar automaticamente o feed RSS
+
+def gerar_feed_rss(procedimentos: List[Dict[str, str]], rss_dir: str = '../RSS') -> Optional[Dict[str, int]]:
+    """
+    Gera o feed RSS diretamente a partir dos procedimentos em memória.
+    Devolve as estatísticas do conversor (ou None em caso de erro).
+    """
     print("\n🔄 Gerando feed RSS automaticamente...")
+    feed_file = os.path.join(rss_dir, 'feed_rss_procedimentos.xml')
     try:
-        import subprocess
-        import sys
+        from json_to_rss_converter import converter_procedimentos, mostrar_estatisticas
         
-        print("Executando conversor JSON para RSS...")
-        result = subprocess.run([sys.executable, "json_to_rss_converter.py"], 
-                              capture_output=True, text=True, check=True)
+        _, estatisticas = converter_procedimentos(procedimentos, feed_file)
         
         print("✅ Feed RSS gerado com sucesso!")
-        print("📄 Arquivo criado: ../RSS/feed_rss_procedimentos.xml")
+        print(f"📄 Arquivo criado: {feed_file}")
         
         # Mostrar estatísticas do feed RSS
-        if "Total de procedimentos processados:" in result.stdout:
-            print("\n📊 Estatísticas do Feed RSS:")
-            for line in result.stdout.split('\n'):
-                if "Estatísticas:" in line or "procedimentos" in line:
-                    print(f"  {line}")
-                    
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Erro ao gerar feed RSS: {e}")
-        print(f"Erro: {e.stderr}")
-    except Exception as e:
-        print(f"❌ Erro inesperado ao gerar feed RSS: {e}")
+        mostrar_estatisticas(estatisticas, f"📊 Estatísticas do Feed RSS ({estatisticas['total']} procedimentos):")
+        return estatisticas
     
+    except Exception as e:
+        print(f"❌ Erro ao gerar feed RSS: {e}")
+        return None
+
+def mostrar_ficheiros_gerados(total: int, data_file_path: Optional[str], rss_dir: str, data_dir: str):
     print(f"\n🎉 Processo completo finalizado!")
-    print(f"Procedimentos processados: {len(procedimentos_completos)}")
+    print(f"Procedimentos processados: {total}")
     print(f"📁 Arquivos gerados:")
-    print(f"  - ../RSS/procedimentos_basicos.json (dados do RSS)")
-    print(f"  - ../RSS/procedimentos_completos.json (dados + detalhes)")
+    print(f"  - {os.path.join(rss_dir, 'procedimentos_basicos.json')} (dados do RSS)")
+    print(f"  - {os.path.join(rss_dir, 'procedimentos_completos.json')} (dados + detalhes)")
     if data_file_path:
         print(f"  - {data_file_path} (dados completos com data)")
-    print(f"  - ../data/ativos.json (procedimentos ativos)")
-    print(f"  - ../RSS/feed_rss_procedimentos.xml (feed RSS completo)")
+    print(f"  - {os.path.join(data_dir, 'ativos.json')} (procedimentos ativos)")
+    print(f"  - {os.path.join(rss_dir, 'feed_rss_procedimentos.xml')} (feed RSS completo)")
+    print(f"  - {os.path.join(rss_dir, 'arquivo')}/ (feed RSS paginado e arquivado)")
+
+def executar_pipeline(itens: Iterable[Dict[str, str]], backend: FallbackBackend, args: argparse.Namespace,
+                      rss_dir: str = '../RSS', data_dir: str = '../data',
+                      tempos: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+    """
+    Corre o processo com o pipeline escolhido em args.pipeline
+    """
+    if args.pipeline == 'async':
+        from pipeline_async import run_pipeline_async
+        return run_pipeline_async(itens, backend, args, rss_dir, data_dir, tempos)
+    return run_pipeline(itens, backend, args, rss_dir, data_dir, tempos)
+
+def _gravar_blocos(blocos: Iterable[bytes], filepath: str) -> Iterator[bytes]:
+    # Copiar o feed para filepath à medida que é descarregado
+    with open(filepath, 'wb') as f:
+        for bloco in blocos:
+            f.write(bloco)
+            yield bloco
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Função principal que executa todo o processo
+    """
+    args = parse_args(argv)
+    rss_url = "https://files.diariodarepublica.pt/rss/serie2&parte=l-html.xml"
+    
+    print("Fazendo fetch do RSS feed do Diário da República...")
+    feed_fetcher = RSSFeedFetcher()
+    blocos = feed_fetcher.fetch_stream(rss_url, conditional=not args.force)
+    
+    if feed_fetcher.nao_modificado:
+        print("✅ RSS feed não foi modificado desde a última execução (304), nada a extrair")
+        # O extrator corre de hora a hora: retirar do ativos.json os procedimentos que expiraram
+        from base_ativos import refrescar_ativos
+        refrescar_ativos()
+        return
+    
+    if blocos is None:
+        print("Não foi possível obter o conteúdo do RSS feed")
+        return
+    
+    if args.gravar_replay:
+        # Guardar o feed e todas as páginas de detalhe para reproduzir a execução offline
+        os.makedirs(args.gravar_replay, exist_ok=True)
+        blocos = _gravar_blocos(blocos, os.path.join(args.gravar_replay, FEED_REPLAY))
+    
+    backend = create_backend(args.backend, args)
+    try:
+        resumo = executar_pipeline(iter_rss_items(blocos), backend, args)
+    finally:
+        backend.close()
+    
+    # Só agora o feed conta como processado para os próximos pedidos condicionais
+    if resumo and resumo['data_file_path']:
+        feed_fetcher.guardar_validadores()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,42 @@
+import json
+
+from base_ativos import BaseAtivos, atualizar_base_ativos
+
+
+def procedimento(link, prazo='2099-01-01T23:59'):
+    return {'link': link, 'descricao': f"Procedimento {link}", 'prazo_apresentacao_propostas_iso': prazo}
+
+
+def escrever_json(caminho, procedimentos):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(procedimentos, f, ensure_ascii=False, indent=2)
+
+
+def links_ativos(data_dir):
+    with open(data_dir / 'ativos.json', encoding='utf-8') as f:
+        return [proc['link'] for proc in json.load(f)]
+
+
+def test_base_antiga_e_sincronizada_com_ativos_json_mais_recente(tmp_path):
+    escrever_json(tmp_path / 'ativos.json', [procedimento('a')])
+    escrever_json(tmp_path / '01-09-2025.json', [procedimento('b')])
+    atualizar_base_ativos(str(tmp_path / '01-09-2025.json'), str(tmp_path))
+    assert links_ativos(tmp_path) == ['a', 'b']
+
+    # Um git pull traz um ativos.json escrito noutro lado (GitHub Actions) com mais procedimentos
+    escrever_json(tmp_path / 'ativos.json', [procedimento('a'), procedimento('b'), procedimento('c')])
+    escrever_json(tmp_path / '02-09-2025.json', [procedimento('d')])
+    atualizar_base_ativos(str(tmp_path / '02-09-2025.json'), str(tmp_path))
+    assert links_ativos(tmp_path) == ['a', 'b', 'c', 'd']
+
+
+def test_base_sincronizada_nao_e_reconstruida(tmp_path):
+    escrever_json(tmp_path / 'ativos.json', [procedimento('a'), procedimento('b', '2000-01-01T23:59')])
+    with BaseAtivos(str(tmp_path)) as base:
+        assert base.sincronizar() == 2
+        base.remover_expirados()
+        base.exportar_ativos()
+    with BaseAtivos(str(tmp_path)) as base:
+        assert base.sincronizar() is None
+        assert base.total() == 1
+    assert links_ativos(tmp_path) == ['a']
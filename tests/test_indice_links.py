@@ -0,0 +1,66 @@
+import json
+from datetime import datetime
+
+from feeds_seeds import pub_dates_originais
+from indice_links import IndiceLinks
+
+
+def escrever_dia(data_dir, filename, links):
+    procedimentos = [{'link': link, 'detalhes_completos': f"Anúncio {link}"} for link in links]
+    with open(data_dir / filename, 'w', encoding='utf-8') as f:
+        json.dump(procedimentos, f)
+    return procedimentos
+
+
+def test_link_repetido_mantem_o_primeiro_dia(tmp_path):
+    escrever_dia(tmp_path, '01-09-2025.json', ['a', 'b'])
+    indice = IndiceLinks(str(tmp_path))
+    indice.atualizar()
+    indice.guardar()
+
+    # O extrator volta a registar o procedimento reaproveitado no ficheiro do dia seguinte
+    indice = IndiceLinks(str(tmp_path))
+    indice.registar(escrever_dia(tmp_path, '02-09-2025.json', ['a', 'c']), '02-09-2025.json')
+    indice.guardar()
+
+    indice = IndiceLinks(str(tmp_path))
+    assert indice.links['a'] == '02-09-2025.json'
+    assert indice.data_primeiro_ficheiro('a') == datetime(2025, 9, 1)
+    assert indice.data_primeiro_ficheiro('c') == datetime(2025, 9, 2)
+    assert indice.data_primeiro_ficheiro('d') is None
+
+    pub_dates = pub_dates_originais([{'link': 'a'}, {'link': 'c'}], str(tmp_path), str(tmp_path / 'RSS'))
+    assert pub_dates['a'].startswith('Mon, 01 Sep 2025 00:00:00')
+    assert pub_dates['c'].startswith('Tue, 02 Sep 2025 00:00:00')
+
+
+def test_ficheiros_indexados_fora_de_ordem(tmp_path):
+    indice = IndiceLinks(str(tmp_path))
+    indice.registar([{'link': 'a', 'detalhes_completos': 'x'}], '05-09-2025.json')
+    indice.registar([{'link': 'a', 'detalhes_completos': 'x'}], '03-09-2025.json')
+    assert indice.data_primeiro_ficheiro('a') == datetime(2025, 9, 3)
+
+
+def test_indice_sem_versao_e_reconstruido(tmp_path):
+    escrever_dia(tmp_path, '01-09-2025.json', ['a'])
+    escrever_dia(tmp_path, '02-09-2025.json', ['a'])
+    with open(tmp_path / 'indice_links.json', 'w', encoding='utf-8') as f:
+        json.dump({'ficheiros': ['01-09-2025.json', '02-09-2025.json'], 'links': {'a': '02-09-2025.json'}}, f)
+
+    indice = IndiceLinks(str(tmp_path))
+    indice.atualizar()
+    assert indice.data_primeiro_ficheiro('a') == datetime(2025, 9, 1)
+
+
+def test_prazo_em_dias_nao_avanca_quando_o_procedimento_reaparece(tmp_path):
+    from normalizacao_datas import CAMPO_PRAZO_ISO, normalizar_datas_procedimento
+
+    registo = {'link': 'a', 'detalhes_completos': 'Anúncio sem data de envio',
+               'prazo_apresentacao_propostas': '21 dias a partir da data do envio do anúncio'}
+    indice = IndiceLinks(str(tmp_path))
+    indice.registar([registo], '01-09-2025.json')
+    indice.registar([registo], '02-09-2025.json')
+    indice.registar([registo], '03-09-2025.json')
+
+    reaproveitado = normalizar_datas_procedimento(registo, indice.data_feed('a'))
+    assert reaproveitado[CAMPO_PRAZO_ISO] == '2025-09-22T23:59'
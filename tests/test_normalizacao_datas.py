@@ -0,0 +1,29 @@
+from datetime import date
+
+import pytest
+
+from normalizacao_datas import CAMPO_PRAZO_ISO, normalizar_datas_procedimento, normalizar_prazo
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('25-08-2025 17:30', '2025-08-25T17:30'),
+    ('até às 17h do dia 25-08-2025', '2025-08-25T17:00'),
+    ('até às 17 horas do dia 25-08-2025', '2025-08-25T17:00'),
+    ('até às 17h30 do dia 25-08-2025', '2025-08-25T17:30'),
+    ('23 horas e 59 minutos do dia 25-08-2025', '2025-08-25T23:59'),
+    ('25/08/2025', '2025-08-25T23:59'),
+    ('48 horas após 25-08-2025', '2025-08-25T23:59'),
+])
+def test_normalizar_prazo_hora(texto, esperado):
+    assert normalizar_prazo(texto) == esperado
+
+
+def test_prazo_em_dias_usa_data_feed_sem_data_de_envio():
+    proc = {'prazo_apresentacao_propostas': '10 dias', 'detalhes_completos': ''}
+    assert normalizar_datas_procedimento(proc, date(2025, 8, 1))[CAMPO_PRAZO_ISO] == '2025-08-11T23:59'
+    assert normalizar_datas_procedimento(proc)[CAMPO_PRAZO_ISO] is None
+
+
+def test_prazo_em_dias_uteis_nao_e_convertido():
+    proc = {'prazo_apresentacao_propostas': '10 dias úteis', 'detalhes_completos': ''}
+    assert normalizar_datas_procedimento(proc, date(2025, 8, 1))[CAMPO_PRAZO_ISO] is None
@@ -0,0 +1,45 @@
+import pytest
+
+from normalizacao_valores import (CAMPO_PRECO_CENTIMOS, CAMPO_PRAZO_EXECUCAO_DIAS, normalizar_preco,
+                                  normalizar_prazo_execucao, normalizar_valores_lote,
+                                  normalizar_valores_procedimento)
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('116.242,68 EUR', (11624268, 'EUR')),
+    ('999,9 EUR', (99990, 'EUR')),
+    ('Lote 2: 15.000,00 EUR', (1500000, 'EUR')),
+    ('IVA 23% incluído, 12.500 €', (1250000, 'EUR')),
+    ('€ 1.234,50', (123450, 'EUR')),
+    ('Lote 1: 5.000 EUR; Lote 2: 7.500,50 EUR', (750050, 'EUR')),
+    ('Lote 2: 15.000', (1500000, 'EUR')),
+    ('1.000 USD', (100000, 'USD')),
+    ('23%', (None, None)),
+    ('N/A', (None, None)),
+    (None, (None, None)),
+])
+def test_normalizar_preco(texto, esperado):
+    assert normalizar_preco(texto) == esperado
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('90 DIAS', 90),
+    ('2 semanas', 14),
+    ('120 MESES', 3600),
+    ('1 ANOS', 365),
+    ('N/A', None),
+])
+def test_normalizar_prazo_execucao(texto, esperado):
+    assert normalizar_prazo_execucao(texto) == esperado
+
+
+def test_lote_igual_a_procedimento_a_procedimento():
+    procedimentos = [
+        {'preco_base': 'Lote 2: 15.000,00 EUR', 'prazo_execucao': '90 DIAS'},
+        {'preco_base': 'IVA 23% incluído, 12.500 €', 'prazo_execucao': '1 ANOS'},
+        {'preco_base': 'Lote 2: 15.000,00 EUR', 'prazo_execucao': 'N/A'},
+    ]
+    lote = normalizar_valores_lote(procedimentos)
+    assert lote == [normalizar_valores_procedimento(proc) for proc in procedimentos]
+    assert [proc[CAMPO_PRECO_CENTIMOS] for proc in lote] == [1500000, 1250000, 1500000]
+    assert [proc[CAMPO_PRAZO_EXECUCAO_DIAS] for proc in lote] == [90, 365, None]